@@ -0,0 +1,143 @@
+"""
+Monthly attendance report: one /attendance/stats call per employee vs. one /attendance/stats/all.
+
+Seeds a company into the in-process stand-in with a month of attendance
+(some days without check-out, some absences) and approved leaves. Checks
+that /stats and /stats/all, which read the attendance_monthly rollup, agree
+with stats computed straight from the raw records, then compares wall time
+and database calls for building the whole report.
+
+Usage:
+    cd backend
+    python -m benchmarks.attendance_report [--employees 1000] [--latency-ms 5] [--concurrency 20]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.e30.benchmark")
+
+import httpx
+
+import utils.db
+from benchmarks.endpoints import db_calls, load_standin, seed_rows, token_for
+from benchmarks.standin import StandIn
+from config import DEFAULT_WEEKEND_DAYS
+from utils.workdays import WorkCalendar
+
+
+def add_month(rows: dict, rng: random.Random, month_start: date) -> None:
+    """Replace today's check-ins with a month of attendance and add approved leaves"""
+    rows["attendance"] = []
+    for user in rows["users"]:
+        day = month_start
+        while day.month == month_start.month and day <= date.today():
+            if day.weekday() < 5 and rng.random() < 0.85:
+                check_in = datetime.combine(day, datetime.min.time()).replace(hour=9, minute=rng.randint(0, 59))
+                row = {
+                    "attendance_id": len(rows["attendance"]) + 1,
+                    "user_id": user["user_id"],
+                    "attendance_date": day,
+                    "check_in": check_in,
+                }
+                if rng.random() < 0.9:
+                    row["check_out"] = check_in + timedelta(hours=rng.uniform(6, 11))
+                rows["attendance"].append(row)
+            day += timedelta(days=1)
+
+    for leave in rows["leave_requests"]:
+        if rng.random() < 0.3:
+            start = month_start + timedelta(days=rng.randint(0, 20))
+            leave.update(status="approved", start_date=start, end_date=start + timedelta(days=1))
+
+
+def expected_stats(rows: dict, month_start: date) -> dict:
+    """Per-user stats computed from the raw attendance and leave rows"""
+    month = month_start.strftime("%Y-%m")
+    last_day = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    working = WorkCalendar(DEFAULT_WEEKEND_DAYS).working_days(month_start, min(last_day, date.today()))
+    present, hours, leave = {}, {}, {}
+    for a in rows["attendance"]:
+        if a["attendance_date"].strftime("%Y-%m") == month and a.get("check_in"):
+            present[a["user_id"]] = present.get(a["user_id"], 0) + 1
+            if a.get("check_out"):
+                seconds = (a["check_out"] - a["check_in"]).total_seconds()
+                hours[a["user_id"]] = hours.get(a["user_id"], 0.0) + round(seconds / 3600, 4)
+    for l in rows["leave_requests"]:
+        if l["status"] == "approved" and l["start_date"].strftime("%Y-%m") == month:
+            leave[l["user_id"]] = leave.get(l["user_id"], 0) + l["days_requested"]
+
+    expected = {}
+    for user in rows["users"]:
+        user_id = user["user_id"]
+        days_present, days_leave = present.get(user_id, 0), int(leave.get(user_id, 0))
+        expected[user_id] = {
+            "days_present": days_present,
+            "days_absent": max(0, working - days_present - days_leave),
+            "days_leave": days_leave,
+            "total_working_days": working,
+            "extra_hours": round(max(hours.get(user_id, 0.0) - days_present * 8, 0), 2),
+        }
+    return expected
+
+
+async def main(args):
+    rng = random.Random(args.seed)
+    month_start = date.today().replace(day=1)
+    rows = seed_rows(args.employees, 4, rng)
+    add_month(rows, rng, month_start)
+    store = StandIn()
+    load_standin(store, rows)
+    store.latency = args.latency_ms / 1000
+    utils.db.supabase = store
+    print(f"{args.employees} employees, {len(rows['attendance'])} attendance rows, "
+          f"{args.latency_ms} ms per database call")
+
+    from main import app
+    admin = token_for(rows["users"][0])
+    params = {"month": month_start.month, "year": month_start.year}
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            async def one(user):
+                async with semaphore:
+                    response = await client.get("/attendance/stats", params=params, headers=token_for(user))
+                    return user["user_id"], response.json()
+
+            calls = db_calls()
+            start = time.perf_counter()
+            per_employee = dict(await asyncio.gather(*(one(u) for u in rows["users"])))
+            per_employee_time, per_employee_calls = time.perf_counter() - start, db_calls() - calls
+
+            calls = db_calls()
+            start = time.perf_counter()
+            report = (await client.get("/attendance/stats/all", params=params, headers=admin)).json()
+            grouped_time, grouped_calls = time.perf_counter() - start, db_calls() - calls
+
+    grouped = {
+        e["user_id"]: {k: e[k] for k in ("days_present", "days_absent", "days_leave", "total_working_days",
+                                         "extra_hours")}
+        for e in report["employees"]
+    }
+    expected = expected_stats(rows, month_start)
+    assert per_employee == expected, "/stats differs from the raw records"
+    assert grouped == expected, "/stats/all differs from the raw records"
+    print("/stats and /stats/all match the raw records for every employee")
+    print(f"{'per employee':<14} {per_employee_time * 1000:>10.1f} ms   {per_employee_calls:>6} db calls")
+    print(f"{'stats/all':<14} {grouped_time * 1000:>10.1f} ms   {grouped_calls:>6} db calls   "
+          f"({per_employee_time / grouped_time:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="simulated round trip per database call")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,48 @@
+"""
+Per-request authentication cost with and without the verified-token cache.
+
+Times the work get_current_user does for a valid bearer token: a full
+python-jose decode and signature check versus a cache lookup.
+
+Usage:
+    cd backend
+    python -m benchmarks.auth_cache [--iterations 20000]
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.e30.benchmark")
+
+from utils.auth_utils import create_access_token, decode_token, decode_token_cached, token_cache
+
+
+def per_call_us(fn, token: str, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(token)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(iterations: int):
+    token = create_access_token({
+        "user_id": 1, "email": "bench@dayflow.in", "employee_id": "DFBE20250001", "role": "employee"
+    })
+    
+    uncached = per_call_us(decode_token, token, iterations)
+    token_cache.clear()
+    cached = per_call_us(decode_token_cached, token, iterations)
+    
+    print(f"{iterations} authentications of one token")
+    print(f"  jose decode + verify : {uncached:8.2f} us/request")
+    print(f"  verified-token cache : {cached:8.2f} us/request ({uncached / cached:.1f}x faster)")
+    print(f"  cache stats          : {token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.iterations)
@@ -0,0 +1,138 @@
+"""
+Morning check-in burst: direct writes vs. the write-behind buffer.
+
+Simulates N employees checking in over a short window against a database
+stand-in with fixed per-call latency, calling the check-in handler
+directly, and reports acknowledgement latency percentiles for both modes.
+
+Usage:
+    cd backend
+    python -m benchmarks.checkin_burst [--users 5000] [--window 2.0] [--latency-ms 20]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.e30.benchmark")
+
+import utils.db
+import utils.write_behind
+from routers.attendance import check_in
+from utils.write_behind import CheckInBuffer
+
+
+class SlowDatabase:
+    """Answers the calls check-in makes after a fixed round-trip delay"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.rows = set()
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def _call(self, apply):
+        db = self
+
+        class Call:
+            def execute(self):
+                time.sleep(db.latency)
+                with db.lock:
+                    db.calls += 1
+
+                    class Result:
+                        data = apply()
+                    return Result()
+        return Call()
+
+    def rpc(self, name: str, params: dict):
+        def apply():
+            key = (params["p_user_id"], params["p_date"])
+            if key in self.rows:
+                return "already_checked_in"
+            self.rows.add(key)
+            return "checked_in"
+        return self._call(apply)
+
+    def table(self, name: str):
+        db = self
+
+        class Table:
+            def upsert(self, rows, **kwargs):
+                return db._call(lambda: [db.rows.add((r["user_id"], r["attendance_date"])) for r in rows])
+
+            def select(self, columns):
+                return Lookup()
+
+        class Lookup:
+            # select("user_id, check_in").eq("attendance_date", d).in_("user_id", ids), as the buffer asks
+            def eq(self, column, value):
+                self.attendance_date = value
+                return self
+
+            def in_(self, column, user_ids):
+                return db._call(lambda: [
+                    {"user_id": u, "check_in": "stored"} for u in user_ids if (u, self.attendance_date) in db.rows
+                ])
+        return Table()
+
+
+def percentile(values, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+async def burst(users: int, window: float) -> list:
+    """Fire one check-in per user at evenly spread arrival times; return latencies"""
+    latencies = []
+    start = time.perf_counter()
+
+    async def one(user_id: int):
+        await asyncio.sleep(start + window * user_id / users - time.perf_counter())
+        sent = time.perf_counter()
+        await check_in(current_user={"user_id": user_id})
+        latencies.append(time.perf_counter() - sent)
+
+    await asyncio.gather(*(one(i) for i in range(users)))
+    return latencies
+
+
+def report(label: str, latencies: list, db: SlowDatabase):
+    ms = [l * 1000 for l in latencies]
+    print(f"{label:<14} p50 {statistics.median(ms):8.1f} ms   p99 {percentile(ms, 0.99):8.1f} ms   "
+          f"max {max(ms):8.1f} ms   db calls {db.calls}")
+
+
+async def main(users: int, window: float, latency_ms: float, flush_ms: float):
+    print(f"{users} check-ins over {window}s, {latency_ms} ms per database call")
+
+    db = SlowDatabase(latency_ms / 1000)
+    utils.db.supabase = db
+    report("direct", await burst(users, window), db)
+
+    db = SlowDatabase(latency_ms / 1000)
+    utils.db.supabase = db
+    with tempfile.TemporaryDirectory() as tmp:
+        buffer = CheckInBuffer(os.path.join(tmp, "journal.ndjson"), flush_ms / 1000, 1000)
+        utils.write_behind.checkin_buffer = buffer
+        await buffer.start()
+        latencies = await burst(users, window)
+        await buffer.stop()
+        utils.write_behind.checkin_buffer = None
+    report("write-behind", latencies, db)
+    print(f"rows stored after flush: {len(db.rows)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--window", type=float, default=2.0)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--flush-ms", type=float, default=200.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.window, args.latency_ms, args.flush_ms))
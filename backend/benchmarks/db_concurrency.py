@@ -0,0 +1,72 @@
+"""
+Concurrency benchmark for the database access layer.
+
+Simulates PostgREST round trips with a fixed latency and compares calling
+the blocking client inline (what the routers used to do) against
+utils.db.execute, at increasing numbers of in-flight requests.
+
+Usage:
+    cd backend
+    python -m benchmarks.db_concurrency [--latency-ms 20] [--requests 200]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+# The Supabase client is created on import; it never gets called here
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.e30.benchmark")
+
+from utils.db import execute
+
+
+class FakeQuery:
+    """Query builder stand-in whose execute() blocks like a network call"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def execute(self):
+        time.sleep(self.latency)
+        return {"data": []}
+
+
+async def handler_inline(latency: float):
+    return FakeQuery(latency).execute()
+
+
+async def handler_offloaded(latency: float):
+    return await execute(FakeQuery(latency))
+
+
+async def run(handler, latency: float, total: int, in_flight: int) -> float:
+    """Run `total` handler calls with at most `in_flight` at once; return req/s"""
+    semaphore = asyncio.Semaphore(in_flight)
+
+    async def one():
+        async with semaphore:
+            await handler(latency)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return total / (time.perf_counter() - start)
+
+
+async def main(latency_ms: float, total: int):
+    latency = latency_ms / 1000
+    print(f"Simulated query latency: {latency_ms} ms, {total} requests per run")
+    print(f"{'in-flight':>10} {'inline req/s':>14} {'offloaded req/s':>16}")
+    for in_flight in (1, 4, 16, 32, 64):
+        inline = await run(handler_inline, latency, total, in_flight)
+        offloaded = await run(handler_offloaded, latency, total, in_flight)
+        print(f"{in_flight:>10} {inline:>14.1f} {offloaded:>16.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.latency_ms, args.requests))
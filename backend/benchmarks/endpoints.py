@@ -0,0 +1,299 @@
+"""
+Endpoint benchmark suite against the in-process PostgREST stand-in.
+
+Seeds a company of --employees people (with salary structures, pending
+leaves and a share of today's check-ins), then drives the FastAPI app
+in-process with --concurrency requests in flight. Reports throughput and
+p50/p99 latency for login, check-in, list employees, leave approval, salary
+and profile reads and one company-wide payroll run, and writes the results
+as JSON for tracking regressions.
+
+Usage:
+    cd backend
+    python -m benchmarks.endpoints [--employees 1000] [--requests 200] [--concurrency 20]
+                                   [--latency-ms 5] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+from datetime import date, datetime, timedelta
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.e30.benchmark")
+
+import httpx
+
+import utils.db
+from benchmarks.standin import StandIn
+from utils.auth_utils import create_access_token, hash_password
+from utils.metrics import db_latency
+from utils.postgres import to_json_value
+
+PASSWORD = "bench1234"
+PREFIX = "OIBE"
+
+
+def seed_rows(employees: int, bcrypt_rounds: int, rng: random.Random) -> dict:
+    """
+    Rows per table for a company of `employees` people plus an admin: salary
+    structures for everyone, a pending leave each, ~30% already checked in today.
+    Ids are explicit and values use native date types, so the same rows can be
+    loaded into the stand-in or copied into Postgres.
+    """
+    password_hash = hash_password(PASSWORD, rounds=bcrypt_rounds)
+    today = date.today()
+    now = datetime.now()
+    rows = {table: [] for table in ("company", "users", "employees", "salary_structure", "attendance",
+                                    "leave_requests")}
+    rows["company"].append({"company_id": 1, "name": "Benchmark Inc", "prefix": "OI", "created_at": now})
+
+    for i in range(employees + 1):
+        user_id = i + 1
+        role = "admin" if i == 0 else "employee"
+        wage = rng.randint(20000, 200000)
+        rows["users"].append({
+            "user_id": user_id,
+            "email": f"user{i}@bench.in",
+            "employee_id": f"{PREFIX}{2020 + i % 5}{user_id:04d}",
+            "password_hash": password_hash,
+            "role": role,
+            "is_verified": True,
+            "created_at": now,
+            "updated_at": now,
+        })
+        rows["employees"].append({
+            "employee_id": user_id,
+            "user_id": user_id,
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "department": rng.choice(["Engineering", "Sales", "HR", "Finance"]),
+            "job_title": "Staff",
+            "join_date": today - timedelta(days=rng.randint(30, 2000)),
+            "base_salary": wage,
+            "created_at": now,
+            "updated_at": now,
+        })
+        rows["salary_structure"].append({
+            "id": user_id,
+            "employee_id": user_id,
+            "monthly_wage": wage,
+            "updated_at": now,
+        })
+        if role == "admin":
+            continue
+        if rng.random() < 0.3:
+            rows["attendance"].append({
+                "attendance_id": len(rows["attendance"]) + 1,
+                "user_id": user_id,
+                "attendance_date": today,
+                "check_in": now.replace(hour=9, minute=rng.randint(0, 59)),
+            })
+        start = today + timedelta(days=rng.randint(1, 60))
+        rows["leave_requests"].append({
+            "leave_id": len(rows["leave_requests"]) + 1,
+            "user_id": user_id,
+            "leave_type": rng.choice(["paid", "sick", "unpaid"]),
+            "start_date": start,
+            "end_date": start + timedelta(days=1),
+            "days_requested": 2,
+            "status": "pending",
+            "created_at": now,
+            "updated_at": now,
+        })
+    return rows
+
+
+def load_standin(store: StandIn, rows: dict) -> None:
+    """Load seed rows the way PostgREST would hand them back (ISO strings for dates)"""
+    for table, table_rows in rows.items():
+        store.write(table, [{k: to_json_value(v) for k, v in row.items()} for row in table_rows], None, False)
+
+
+def token_for(user: dict) -> dict:
+    token = create_access_token({
+        "user_id": user["user_id"],
+        "email": user["email"],
+        "employee_id": user["employee_id"],
+        "role": user["role"]
+    })
+    return {"Authorization": f"Bearer {token}"}
+
+
+def db_calls() -> int:
+    """Database calls made so far, as counted by utils.db.execute for /metrics"""
+    return sum(histogram.count for histogram in db_latency.children.values())
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+async def run_scenario(client: httpx.AsyncClient, name: str, requests: list, concurrency: int,
+                       ok_status=(200,)) -> dict:
+    """Issue (method, url, kwargs) requests with bounded concurrency and summarize latencies"""
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+    calls_before = db_calls()
+
+    async def one(method: str, url: str, kwargs: dict):
+        nonlocal errors
+        async with semaphore:
+            sent = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - sent)
+            if response.status_code not in ok_status:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(*request) for request in requests))
+    elapsed = time.perf_counter() - start
+
+    ms = [l * 1000 for l in latencies]
+    result = {
+        "scenario": name,
+        "requests": len(requests),
+        "errors": errors,
+        "throughput_rps": round(len(requests) / elapsed, 1),
+        "p50_ms": round(statistics.median(ms), 2),
+        "p99_ms": round(percentile(ms, 0.99), 2),
+        "mean_ms": round(statistics.fmean(ms), 2),
+        "db_calls_per_request": round((db_calls() - calls_before) / len(requests), 2),
+    }
+    print(f"{name:<16} {result['throughput_rps']:>9.1f} req/s   p50 {result['p50_ms']:>8.2f} ms   "
+          f"p99 {result['p99_ms']:>8.2f} ms   db calls/req {result['db_calls_per_request']:>5}   "
+          f"errors {errors}")
+    return result
+
+
+async def run_payroll(client: httpx.AsyncClient, admin_headers: dict) -> dict:
+    """Start one company-wide payroll run and wait for it to finish"""
+    period = date.today().strftime("%Y-%m")
+    calls_before = db_calls()
+    start = time.perf_counter()
+    response = await client.post(f"/salary/runs/{period}", headers=admin_headers)
+    run = response.json()
+    while run.get("status") == "running":
+        await asyncio.sleep(0.01)
+        run = (await client.get(f"/salary/runs/{period}", headers=admin_headers)).json()
+    elapsed = time.perf_counter() - start
+    result = {
+        "scenario": "payroll_run",
+        "status": run.get("status"),
+        "rows_written": run.get("written"),
+        "duration_ms": round(elapsed * 1000, 2),
+        "rows_per_second": round((run.get("written") or 0) / elapsed, 1),
+        "db_calls": db_calls() - calls_before,
+    }
+    print(f"{'payroll_run':<16} {result['rows_written']} rows in {result['duration_ms']:.1f} ms   "
+          f"({result['rows_per_second']:.0f} rows/s, {result['db_calls']} db calls, {result['status']})")
+    return result
+
+
+async def run_suite(rows: dict, requests: int, concurrency: int, page_size: int) -> list:
+    """Run every scenario against whatever utils.db.supabase currently is"""
+    from main import app
+
+    users = {u["user_id"]: u for u in rows["users"]}
+    admin = token_for(rows["users"][0])
+    employees = [{**users[e["user_id"]], "employee_pk": e["employee_id"]}
+                 for e in rows["employees"] if users[e["user_id"]]["role"] != "admin"]
+    sample = [employees[i % len(employees)] for i in range(requests)]
+    checked_in = {a["user_id"] for a in rows["attendance"]}
+    not_checked_in = [e for e in employees if e["user_id"] not in checked_in]
+
+    transport = httpx.ASGITransport(app=app)
+    results = []
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            results.append(await run_scenario(client, "login", [
+                ("POST", "/auth/login", {"json": {"identifier": e["email"], "password": PASSWORD}})
+                for e in sample
+            ], concurrency))
+            results.append(await run_scenario(client, "check_in", [
+                ("POST", "/attendance/check-in", {"headers": token_for(e)})
+                for e in not_checked_in[:requests]
+            ], concurrency))
+            results.append(await run_scenario(client, "list_employees", [
+                ("GET", f"/employees?limit={page_size}", {"headers": admin})
+                for _ in range(requests)
+            ], concurrency))
+            results.append(await run_scenario(client, "approve_leave", [
+                ("PUT", f"/leaves/{leave['leave_id']}/approve", {"headers": admin})
+                for leave in rows["leave_requests"][:requests]
+            ], concurrency))
+            results.append(await run_scenario(client, "salary_read", [
+                ("GET", f"/salary/{e['employee_pk']}", {"headers": token_for(e)})
+                for e in sample
+            ], concurrency))
+            # A hot set of profiles read repeatedly, as dashboards and /auth/me do
+            results.append(await run_scenario(client, "profile_read", [
+                ("GET", f"/employees/{e['user_id']}", {"headers": token_for(e)})
+                for e in sample[:20] * (requests // 20 or 1)
+            ], concurrency))
+            results.append(await run_payroll(client, admin))
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write_report(path: str, suite: str, config: dict, results) -> None:
+    report = {
+        "suite": suite,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "config": config,
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {path}")
+
+
+async def main(args):
+    print(f"Seeding {args.employees} employees...")
+    rows = seed_rows(args.employees, args.bcrypt_rounds, random.Random(args.seed))
+    store = StandIn()
+    load_standin(store, rows)
+    store.latency = args.latency_ms / 1000
+    utils.db.supabase = store
+
+    print(f"{args.requests} requests per scenario, {args.concurrency} in flight, "
+          f"{args.latency_ms} ms per database call")
+    results = await run_suite(rows, args.requests, args.concurrency, args.page_size)
+    write_report(args.output, "endpoints", {
+        "employees": args.employees,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "latency_ms": args.latency_ms,
+        "bcrypt_rounds": args.bcrypt_rounds,
+        "page_size": args.page_size,
+        "seed": args.seed,
+    }, results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="simulated round trip per database call")
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="benchmark-results.json")
+    asyncio.run(main(parser.parse_args()))
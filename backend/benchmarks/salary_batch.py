@@ -0,0 +1,70 @@
+"""
+Vectorized salary components vs. the scalar path.
+
+Generates random salary structures (plus known rounding edge cases) and
+times calculate_salary_components over them one by one against one call
+to calculate_salary_components_batch. tests/test_salary_batch.py checks
+the two return bit-identical values.
+
+Usage:
+    cd backend
+    python -m benchmarks.salary_batch [--rows 100000] [--seed 7]
+"""
+
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.e30.benchmark")
+
+from routers.payroll import calculate_salary_components, calculate_salary_components_batch
+
+PERCENT_FIELDS = ("basic_percent", "hra_percent", "da_percent", "bonus_percent", "lta_percent", "pf_percent")
+
+# Values whose x * 100 sits on or next to a .5 tie
+EDGE_WAGES = [0.0, 0.005, 1.005, 2.675, 1.115, 10.125, 1234.565, 99999.995, 0.015, 8.345]
+
+
+def random_structures(rows: int, rng: random.Random) -> list:
+    structures = []
+    for i in range(rows):
+        if i < len(EDGE_WAGES):
+            wage = EDGE_WAGES[i]
+        elif rng.random() < 0.2:
+            wage = rng.uniform(0, 500000)
+        else:
+            wage = rng.randint(0, 50000000) / 100
+        structure = {field: rng.randint(0, 10000) / 100 for field in PERCENT_FIELDS}
+        structure["prof_tax"] = rng.choice([0.0, 200.0, rng.randint(0, 50000) / 100])
+        structures.append((wage, structure))
+    return structures
+
+
+def main(rows: int, seed: int):
+    structures = random_structures(rows, random.Random(seed))
+    columns = {"monthly_wage": [wage for wage, _ in structures]}
+    for field in PERCENT_FIELDS + ("prof_tax",):
+        columns[field] = [structure[field] for _, structure in structures]
+    
+    start = time.perf_counter()
+    for wage, structure in structures:
+        calculate_salary_components(wage, structure)
+    scalar_elapsed = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    calculate_salary_components_batch(**columns)
+    batch_elapsed = time.perf_counter() - start
+    
+    print(f"{rows} salary structures")
+    print(f"  scalar : {scalar_elapsed * 1000:9.1f} ms")
+    print(f"  batch  : {batch_elapsed * 1000:9.1f} ms ({scalar_elapsed / batch_elapsed:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    main(args.rows, args.seed)
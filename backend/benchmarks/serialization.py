@@ -0,0 +1,110 @@
+"""
+Response serialization: per-row models + stdlib json vs. batch TypeAdapter + orjson.
+
+Builds a page of employee rows (as list_employees does) and of leave rows
+(as get_all_leaves does), checks both paths produce the same JSON, then
+times each.
+
+Usage:
+    cd backend
+    python -m benchmarks.serialization [--rows 5000] [--repeat 20]
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.e30.benchmark")
+
+from fastapi.encoders import jsonable_encoder
+
+from models.schemas import EmployeeResponse, EmployeePage, EmployeeList
+from utils.responses import dumps, validate_rows
+
+
+def stdlib_json(payload) -> bytes:
+    """What JSONResponse did before: jsonable_encoder + json.dumps"""
+    return json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def employee_rows(rows: int, rng: random.Random) -> list:
+    return [{
+        "user_id": i,
+        "employee_id": f"OIJODO2024{i:04d}",
+        "email": f"user{i}@odoo.in",
+        "role": "employee",
+        "first_name": "John",
+        "last_name": f"Doe {i}",
+        "phone": f"98{rng.randint(10000000, 99999999)}",
+        "department": rng.choice(["Engineering", "Sales", "HR", None]),
+        "job_title": "Developer",
+        "profile_picture_url": None,
+        "join_date": (date(2020, 1, 1) + timedelta(days=rng.randint(0, 1800))).isoformat(),
+        "today_status": rng.choice(["present", "absent", "leave"])
+    } for i in range(rows)]
+
+
+def leave_rows(rows: int, rng: random.Random) -> list:
+    start = datetime(2025, 1, 1, 9, 30)
+    return [{
+        "leave_id": i,
+        "user_id": rng.randint(1, 5000),
+        "leave_type": rng.choice(["paid", "sick", "unpaid"]),
+        "start_date": date(2025, 3, 1),
+        "end_date": date(2025, 3, 3),
+        "days_requested": 3.0,
+        "description": "Family function",
+        "status": "pending",
+        "created_at": start + timedelta(minutes=i),
+        "employee_id": f"OIJODO2024{i:04d}",
+        "employee_name": "John Doe"
+    } for i in range(rows)]
+
+
+def before_employees(rows: list) -> bytes:
+    items = [EmployeeResponse(**row) for row in rows]
+    return stdlib_json(EmployeePage(items=items, next_cursor="abc"))
+
+
+def after_employees(rows: list) -> bytes:
+    return dumps({"items": validate_rows(EmployeeList, rows), "next_cursor": "abc"})
+
+
+def timed(fn, arg, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(rows: int, repeat: int, seed: int):
+    rng = random.Random(seed)
+    employees = employee_rows(rows, rng)
+    leaves = {"items": leave_rows(rows, rng), "next_cursor": None}
+
+    cases = [
+        ("employees page", before_employees, after_employees, employees),
+        ("leaves page", stdlib_json, dumps, leaves),
+    ]
+    for name, before, after, data in cases:
+        if json.loads(before(data)) != json.loads(after(data)):
+            raise SystemExit(f"{name}: outputs differ")
+        before_ms = timed(before, data, repeat)
+        after_ms = timed(after, data, repeat)
+        print(f"{name:15} ({rows} rows): before {before_ms:8.2f} ms   after {after_ms:8.2f} ms   "
+              f"x{before_ms / after_ms:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    main(args.rows, args.repeat, args.seed)
@@ -0,0 +1,412 @@
+"""
+In-process stand-in for the PostgREST subset the routers use.
+
+Implements table queries (select with embedded relations and count, eq, neq,
+gt, gte, lt, lte, like, in_, is_, or_, order, limit, insert, upsert, update,
+delete) and the SQL functions from db/scehma.sql, over plain Python lists.
+Every call can be delayed by a fixed round-trip latency so timings reflect
+how many calls an endpoint makes, not just how fast Python runs.
+
+Not a database: no transactions, no constraints beyond upsert conflict keys.
+The attendance_monthly rollup, which triggers maintain in Postgres, is
+recomputed on the next read after attendance or leave_requests change.
+"""
+
+import copy
+import re
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Tuple
+
+PRIMARY_KEYS = {
+    "company": "company_id",
+    "users": "user_id",
+    "employees": "employee_id",
+    "salary_structure": "id",
+    "attendance": "attendance_id",
+    "leave_requests": "leave_id",
+    "payroll": "payroll_id",
+    "payroll_runs": None,
+    "employee_documents": "id",
+    "employee_id_sequences": None,
+    "company_holidays": None,
+    "attendance_monthly": None,
+}
+
+# Tables whose writes the attendance_monthly triggers react to
+ROLLUP_SOURCES = ("attendance", "leave_requests")
+
+# (table, embedded table) -> (local column, remote column); all embeds used are to-one
+RELATIONS = {
+    ("users", "employees"): ("user_id", "user_id"),
+    ("employees", "users"): ("user_id", "user_id"),
+    ("employees", "salary_structure"): ("employee_id", "employee_id"),
+    ("salary_structure", "employees"): ("employee_id", "employee_id"),
+    ("attendance", "users"): ("user_id", "user_id"),
+    ("leave_requests", "users"): ("user_id", "user_id"),
+    ("payroll", "users"): ("user_id", "user_id"),
+}
+
+Row = dict
+Predicate = Callable[[Row], bool]
+
+
+class Result:
+    def __init__(self, data, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+def split_top_level(text: str) -> List[str]:
+    """Split on commas that are not inside parentheses"""
+    parts, depth, current = [], 0, []
+    for ch in text:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    if "".join(current).strip():
+        parts.append("".join(current).strip())
+    return parts
+
+
+def _comparable(value, like):
+    """Coerce a filter value given as text to the column's type"""
+    if isinstance(value, str) and isinstance(like, bool):
+        return value.lower() == "true"
+    if isinstance(value, str) and isinstance(like, (int, float)):
+        return type(like)(value)
+    return value
+
+
+def _compare(op: str, column_value, value) -> bool:
+    if op == "eq":
+        return column_value is not None and column_value == _comparable(value, column_value)
+    if op == "neq":
+        return column_value is not None and column_value != _comparable(value, column_value)
+    if column_value is None:
+        return False
+    value = _comparable(value, column_value)
+    if op == "gt":
+        return column_value > value
+    if op == "gte":
+        return column_value >= value
+    if op == "lt":
+        return column_value < value
+    if op == "lte":
+        return column_value <= value
+    raise ValueError(f"Unsupported operator: {op}")
+
+
+def _parse_logic(kind: str, expr: str) -> Predicate:
+    """Parse an or_()/and() filter string such as 'a.lt.1,and(a.eq.1,b.lt."x")'"""
+    predicates = []
+    for part in split_top_level(expr):
+        nested = re.fullmatch(r"(and|or)\((.*)\)", part, re.S)
+        if nested:
+            predicates.append(_parse_logic(nested.group(1), nested.group(2)))
+            continue
+        column, op, value = part.split(".", 2)
+        if len(value) >= 2 and value[0] == value[-1] == '"':
+            value = value[1:-1]
+        predicates.append(lambda row, c=column, o=op, v=value: _compare(o, row.get(c), v))
+    combine = all if kind == "and" else any
+    return lambda row: combine(p(row) for p in predicates)
+
+
+class Query:
+    """One PostgREST request being built; execute() runs it against the store"""
+
+    def __init__(self, store: "StandIn", table: str):
+        self.store = store
+        self.table = table
+        # Lets utils.metrics label calls by table as it does for the real client
+        self.request = SimpleNamespace(path=f"http://stand-in/rest/v1/{table}")
+        self.op = "select"
+        self.columns = "*"
+        self.count: Optional[str] = None
+        self.payload = None
+        self.on_conflict: Optional[str] = None
+        self.ignore_duplicates = False
+        self.filters: List[Predicate] = []
+        self.orders: List[Tuple[str, bool]] = []
+        self.row_limit: Optional[int] = None
+
+    # Operations
+    def select(self, columns: str = "*", count: Optional[str] = None) -> "Query":
+        self.columns, self.count = columns, count
+        return self
+
+    def insert(self, rows) -> "Query":
+        self.op, self.payload = "insert", rows
+        return self
+
+    def upsert(self, rows, on_conflict: Optional[str] = None, ignore_duplicates: bool = False) -> "Query":
+        self.op, self.payload = "upsert", rows
+        self.on_conflict, self.ignore_duplicates = on_conflict, ignore_duplicates
+        return self
+
+    def update(self, values: dict) -> "Query":
+        self.op, self.payload = "update", values
+        return self
+
+    def delete(self) -> "Query":
+        self.op = "delete"
+        return self
+
+    # Filters
+    def _where(self, predicate: Predicate) -> "Query":
+        self.filters.append(predicate)
+        return self
+
+    def eq(self, column: str, value) -> "Query":
+        return self._where(lambda row: _compare("eq", row.get(column), value))
+
+    def neq(self, column: str, value) -> "Query":
+        return self._where(lambda row: _compare("neq", row.get(column), value))
+
+    def gt(self, column: str, value) -> "Query":
+        return self._where(lambda row: _compare("gt", row.get(column), value))
+
+    def gte(self, column: str, value) -> "Query":
+        return self._where(lambda row: _compare("gte", row.get(column), value))
+
+    def lt(self, column: str, value) -> "Query":
+        return self._where(lambda row: _compare("lt", row.get(column), value))
+
+    def lte(self, column: str, value) -> "Query":
+        return self._where(lambda row: _compare("lte", row.get(column), value))
+
+    def like(self, column: str, pattern: str) -> "Query":
+        regex = re.compile("^" + re.escape(pattern).replace("%", ".*").replace("_", ".") + "$")
+        return self._where(lambda row: row.get(column) is not None and bool(regex.match(str(row.get(column)))))
+
+    def in_(self, column: str, values) -> "Query":
+        wanted = list(values)
+        return self._where(lambda row: any(_compare("eq", row.get(column), v) for v in wanted))
+
+    def is_(self, column: str, value) -> "Query":
+        if value in (None, "null"):
+            return self._where(lambda row: row.get(column) is None)
+        return self.eq(column, value)
+
+    def or_(self, expr: str) -> "Query":
+        return self._where(_parse_logic("or", expr))
+
+    # Modifiers
+    def order(self, column: str, desc: bool = False) -> "Query":
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, size: int) -> "Query":
+        self.row_limit = size
+        return self
+
+    def execute(self) -> Result:
+        if self.store.latency:
+            time.sleep(self.store.latency)
+        with self.store.lock:
+            self.store.calls += 1
+            if self.table in ROLLUP_SOURCES and self.op != "select":
+                self.store.rollup_dirty = True
+            elif self.table == "attendance_monthly" and self.store.rollup_dirty:
+                self.store._attendance_rollup_rebuild()
+            if self.op in ("insert", "upsert"):
+                return Result(self.store.write(self.table, self.payload, self.op == "upsert" and self.on_conflict,
+                                               self.ignore_duplicates))
+            rows = self.store.tables.setdefault(self.table, [])
+            matched = [row for row in rows if all(p(row) for p in self.filters)]
+            if self.op == "update":
+                for row in matched:
+                    row.update(self.payload)
+                return Result(copy.deepcopy(matched))
+            if self.op == "delete":
+                doomed = {id(row) for row in matched}
+                self.store.tables[self.table] = [row for row in rows if id(row) not in doomed]
+                return Result(copy.deepcopy(matched))
+
+            for column, desc in reversed(self.orders):
+                # NULLs sort last ascending and first descending, as in Postgres
+                matched.sort(key=lambda row: (row.get(column) is None,
+                                              0 if row.get(column) is None else row.get(column)), reverse=desc)
+            total = len(matched)
+            limits = [n for n in (self.row_limit, self.store.max_rows) if n is not None]
+            if limits:
+                matched = matched[:min(limits)]
+            return Result(self.store.project(self.table, matched, self.columns),
+                          count=total if self.count else None)
+
+
+class StandIn:
+    """
+    Tables as lists of dicts plus the rpc functions the routers call.
+    Drop-in for the Supabase client: `utils.db.supabase = StandIn()`.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, max_rows: Optional[int] = None):
+        self.latency = latency_ms / 1000
+        # PostgREST's db-max-rows: selects silently return at most this many rows
+        self.max_rows = max_rows
+        self.tables: Dict[str, List[Row]] = {table: [] for table in PRIMARY_KEYS}
+        self.sequences: Dict[str, int] = {}
+        self.calls = 0
+        self.lock = threading.RLock()
+        self.rollup_dirty = False
+        self.functions = {
+            "allocate_employee_serials": self._allocate_employee_serials,
+            "attendance_check_in": self._attendance_check_in,
+            "attendance_check_out": self._attendance_check_out,
+            "attendance_rollup_rebuild": self._attendance_rollup_rebuild,
+        }
+
+    def table(self, name: str) -> Query:
+        return Query(self, name)
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[dict] = None):
+        store = self
+
+        class Call:
+            request = SimpleNamespace(path=f"http://stand-in/rest/v1/rpc/{fn}")
+
+            def execute(self):
+                if store.latency:
+                    time.sleep(store.latency)
+                with store.lock:
+                    store.calls += 1
+                    return Result(store.functions[fn](**(params or {})))
+        return Call()
+
+    # Storage
+    def _next_id(self, table: str) -> int:
+        self.sequences[table] = self.sequences.get(table, 0) + 1
+        return self.sequences[table]
+
+    def write(self, table: str, payload, conflict_columns, ignore_duplicates: bool) -> List[Row]:
+        if table in ROLLUP_SOURCES:
+            self.rollup_dirty = True
+        rows = self.tables.setdefault(table, [])
+        pk = PRIMARY_KEYS.get(table)
+        keys = [k.strip() for k in conflict_columns.split(",")] if conflict_columns else None
+        existing = {tuple(row.get(k) for k in keys): row for row in rows} if keys else {}
+        written = []
+        for item in payload if isinstance(payload, list) else [payload]:
+            item = dict(item)
+            if keys:
+                current = existing.get(tuple(item.get(k) for k in keys))
+                if current is not None:
+                    if not ignore_duplicates:
+                        current.update(item)
+                        written.append(copy.deepcopy(current))
+                    continue
+            if pk and item.get(pk) is None:
+                item[pk] = self._next_id(table)
+            elif pk:
+                self.sequences[table] = max(self.sequences.get(table, 0), item[pk])
+            item.setdefault("created_at", datetime.now().isoformat())
+            rows.append(item)
+            if keys:
+                existing[tuple(item.get(k) for k in keys)] = item
+            written.append(copy.deepcopy(item))
+        return written
+
+    def project(self, table: str, rows: List[Row], columns: str) -> List[Row]:
+        """Apply a select list, resolving embedded relations with one index per relation"""
+        parts = split_top_level(columns)
+        embeds = {}
+        for part in parts:
+            match = re.fullmatch(r"(\w+)(?:!\w+)?\((.*)\)", part, re.S)
+            if match:
+                name, inner = match.group(1), match.group(2)
+                local, remote = RELATIONS[(table, name)]
+                index = {}
+                for related in self.tables.get(name, []):
+                    index.setdefault(related.get(remote), related)
+                embeds[part] = (name, inner, local, index)
+
+        projected = []
+        for row in rows:
+            out = {}
+            for part in parts:
+                if part in embeds:
+                    name, inner, local, index = embeds[part]
+                    related = index.get(row.get(local))
+                    out[name] = self.project(name, [related], inner)[0] if related is not None else None
+                elif part == "*":
+                    out.update(copy.deepcopy(row))
+                else:
+                    out[part] = copy.deepcopy(row.get(part))
+            projected.append(out)
+        return projected
+
+    # SQL functions (db/scehma.sql)
+    def _allocate_employee_serials(self, p_prefix: str, p_count: int = 1) -> int:
+        rows = self.tables["employee_id_sequences"]
+        row = next((r for r in rows if r["prefix"] == p_prefix), None)
+        if row is None:
+            row = {"prefix": p_prefix, "last_serial": 0}
+            rows.append(row)
+        row["last_serial"] += p_count
+        return row["last_serial"] - p_count + 1
+
+    def _attendance_row(self, user_id: int, attendance_date: str) -> Optional[Row]:
+        return next((r for r in self.tables["attendance"]
+                     if r["user_id"] == user_id and r["attendance_date"] == attendance_date), None)
+
+    def _attendance_check_in(self, p_user_id: int, p_date: str, p_time: str) -> str:
+        self.rollup_dirty = True
+        row = self._attendance_row(p_user_id, p_date)
+        if row is None:
+            self.write("attendance", {"user_id": p_user_id, "attendance_date": p_date, "check_in": p_time}, None, False)
+            return "checked_in"
+        if row.get("check_in") is None:
+            row["check_in"] = p_time
+            return "checked_in"
+        return "already_checked_in"
+
+    def _attendance_check_out(self, p_user_id: int, p_date: str, p_time: str) -> str:
+        self.rollup_dirty = True
+        row = self._attendance_row(p_user_id, p_date)
+        if row is None or row.get("check_in") is None:
+            return "not_checked_in"
+        if row.get("check_out"):
+            return "already_checked_out"
+        row["check_out"] = p_time
+        return "checked_out"
+
+    def _attendance_rollup_rebuild(self, p_month: Optional[str] = None) -> int:
+        """Every month's rollup from scratch (the stand-in ignores p_month and rebuilds all)"""
+        rollup: Dict[Tuple[int, str], Row] = {}
+
+        def month_row(user_id: int, day: str) -> Row:
+            key = (user_id, f"{str(day)[:7]}-01")
+            if key not in rollup:
+                rollup[key] = {"user_id": user_id, "month": key[1], "days_present": 0, "work_hours": 0.0,
+                               "leave_days": 0.0}
+            return rollup[key]
+
+        for a in self.tables["attendance"]:
+            if a.get("check_in") is None:
+                continue
+            row = month_row(a["user_id"], a["attendance_date"])
+            row["days_present"] += 1
+            if a.get("check_out"):
+                seconds = (datetime.fromisoformat(a["check_out"]) - datetime.fromisoformat(a["check_in"])).total_seconds()
+                row["work_hours"] += round(seconds / 3600, 4)
+        for leave in self.tables["leave_requests"]:
+            if leave.get("status") == "approved":
+                month_row(leave["user_id"], leave["start_date"])["leave_days"] += float(leave["days_requested"])
+
+        for row in rollup.values():
+            row["overtime_hours"] = max(row["work_hours"] - row["days_present"] * 8, 0)
+        self.tables["attendance_monthly"] = list(rollup.values())
+        self.rollup_dirty = False
+        return len(rollup)
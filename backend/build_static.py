@@ -0,0 +1,90 @@
+"""
+Build the static frontend for production serving.
+
+Copies frontend/ to STATIC_BUILD_DIR, renames CSS/JS to content-hashed names
+(styles.<hash>.css), rewrites the HTML references, and writes precompressed
+.gz (and .br, when the `brotli` package is installed) next to each text file.
+
+Usage (from backend/):
+    python build_static.py
+"""
+import gzip
+import hashlib
+import os
+import shutil
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from config import STATIC_BUILD_DIR
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+FRONTEND_DIR = os.path.join(os.path.dirname(__file__), '..', 'frontend')
+HASHED_EXTENSIONS = ('.css', '.js')
+COMPRESSED_EXTENSIONS = ('.html', '.css', '.js', '.json', '.svg', '.txt')
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def hashed_name(rel_path: str, data: bytes) -> str:
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{content_hash(data)}{ext}"
+
+
+def write_compressed(path: str, data: bytes):
+    """Write .gz / .br siblings, keeping only those smaller than the original"""
+    variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=11)
+    for suffix, compressed in variants.items():
+        if len(compressed) < len(data):
+            with open(path + suffix, "wb") as f:
+                f.write(compressed)
+
+
+def build(source: str = FRONTEND_DIR, target: str = STATIC_BUILD_DIR):
+    source, target = os.path.abspath(source), os.path.abspath(target)
+    if os.path.exists(target):
+        shutil.rmtree(target)
+
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(source):
+        # Don't copy a previous build into itself
+        dirnames[:] = [d for d in dirnames if os.path.join(dirpath, d) != target]
+        for name in filenames:
+            full = os.path.join(dirpath, name)
+            with open(full, "rb") as f:
+                files[os.path.relpath(full, source).replace(os.sep, "/")] = f.read()
+
+    renames = {
+        rel: hashed_name(rel, data)
+        for rel, data in files.items() if rel.endswith(HASHED_EXTENSIONS)
+    }
+
+    for rel, data in files.items():
+        if rel.endswith(".html"):
+            text = data.decode("utf-8")
+            for old, new in renames.items():
+                text = text.replace(f'"{old}"', f'"{new}"')
+            data = text.encode("utf-8")
+        out = os.path.join(target, renames.get(rel, rel))
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        with open(out, "wb") as f:
+            f.write(data)
+        if out.endswith(COMPRESSED_EXTENSIONS):
+            write_compressed(out, data)
+
+    return renames
+
+
+if __name__ == "__main__":
+    renames = build()
+    for old, new in sorted(renames.items()):
+        print(f"{old} -> {new}")
+    print(f"Built {STATIC_BUILD_DIR}" + ("" if brotli else " (gzip only; install brotli for .br files)"))
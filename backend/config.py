@@ -9,3 +9,80 @@ SUPABASE_KEY = os.getenv('SUPABASE_KEY')
 JWT_SECRET = os.getenv('JWT_SECRET', 'dayflow-secret-key-change-in-production')
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_HOURS = 24
+
+# Max number of Supabase calls running in worker threads at once
+DB_MAX_CONCURRENCY = int(os.getenv('DB_MAX_CONCURRENCY', '40'))
+
+# Keyset pagination for list endpoints
+DEFAULT_PAGE_SIZE = int(os.getenv('DEFAULT_PAGE_SIZE', '50'))
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', '500'))
+
+# Password hashing (bcrypt runs in a dedicated process pool)
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+PASSWORD_WORKERS = int(os.getenv('PASSWORD_WORKERS', str(os.cpu_count() or 2)))
+PASSWORD_MAX_PENDING = int(os.getenv('PASSWORD_MAX_PENDING', '64'))
+# Pool workers bulk hashing (imports) may hold at once; the rest stay free for logins
+PASSWORD_BULK_WORKERS = int(os.getenv('PASSWORD_BULK_WORKERS', str(max(1, PASSWORD_WORKERS // 2))))
+# Passwords hashed per bulk pool job
+PASSWORD_BULK_CHUNK = int(os.getenv('PASSWORD_BULK_CHUNK', '16'))
+
+# Verified JWT payloads kept in memory
+TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', '10000'))
+
+# Bulk employee import
+BULK_IMPORT_BATCH_SIZE = int(os.getenv('BULK_IMPORT_BATCH_SIZE', '500'))
+
+# Company-wide payroll runs
+PAYROLL_BATCH_SIZE = int(os.getenv('PAYROLL_BATCH_SIZE', '1000'))
+# A run marked running that saved no progress for this long is taken to have died with its worker
+PAYROLL_RUN_STALE_SECONDS = int(os.getenv('PAYROLL_RUN_STALE_SECONDS', '300'))
+
+# Write-behind check-ins: acknowledge after a local journal append, flush to the DB in batches
+ATTENDANCE_WRITE_BEHIND = os.getenv('ATTENDANCE_WRITE_BEHIND', 'false').lower() in ('1', 'true', 'yes')
+ATTENDANCE_JOURNAL_PATH = os.getenv(
+    'ATTENDANCE_JOURNAL_PATH',
+    os.path.join(os.path.dirname(__file__), 'data', 'attendance-journal.ndjson')
+)
+ATTENDANCE_FLUSH_INTERVAL_MS = int(os.getenv('ATTENDANCE_FLUSH_INTERVAL_MS', '200'))
+ATTENDANCE_FLUSH_BATCH_SIZE = int(os.getenv('ATTENDANCE_FLUSH_BATCH_SIZE', '1000'))
+
+# users.last_login is written in the background, coalesced across logins
+LAST_LOGIN_FLUSH_INTERVAL_MS = int(os.getenv('LAST_LOGIN_FLUSH_INTERVAL_MS', '1000'))
+
+# Rows fetched per round trip by streaming exports
+EXPORT_PAGE_SIZE = int(os.getenv('EXPORT_PAGE_SIZE', '1000'))
+
+# Live attendance board (server-sent events)
+LIVE_KEEPALIVE_SECONDS = float(os.getenv('LIVE_KEEPALIVE_SECONDS', '15'))
+
+# Static frontend: build output of build_static.py, served in place of frontend/ when present
+STATIC_BUILD_DIR = os.getenv(
+    'STATIC_BUILD_DIR',
+    os.path.join(os.path.dirname(__file__), '..', 'frontend', 'dist')
+)
+# API responses at least this large are gzipped on the fly
+GZIP_MIN_SIZE = int(os.getenv('GZIP_MIN_SIZE', '1024'))
+
+# Development/CI query recorder: off, warn (log requests over budget) or raise (fail them)
+QUERY_RECORDER = os.getenv('QUERY_RECORDER', 'off').lower()
+QUERY_BUDGET = int(os.getenv('QUERY_BUDGET', '10'))
+# Same table and filter shape issued more than this many times in one request looks like N+1
+QUERY_REPEAT_LIMIT = int(os.getenv('QUERY_REPEAT_LIMIT', '3'))
+
+# Database backend: "supabase" (PostgREST over HTTPS) or "postgres" (asyncpg pool straight to Postgres)
+DB_BACKEND = os.getenv('DB_BACKEND', 'supabase').lower()
+DATABASE_URL = os.getenv('DATABASE_URL')
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '2'))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', str(DB_MAX_CONCURRENCY)))
+# Prepared statements kept per connection; set 0 behind a transaction-mode pooler (e.g. PgBouncer)
+DB_STATEMENT_CACHE_SIZE = int(os.getenv('DB_STATEMENT_CACHE_SIZE', '100'))
+
+# Assembled employee profiles (GET /employees/{id}, /auth/me), invalidated on writes
+PROFILE_CACHE_SIZE = int(os.getenv('PROFILE_CACHE_SIZE', '10000'))
+PROFILE_CACHE_TTL = float(os.getenv('PROFILE_CACHE_TTL', '60'))
+# Postgres NOTIFY channel shared by all workers for invalidations (needs DATABASE_URL); empty = per-worker only
+PROFILE_CACHE_CHANNEL = os.getenv('PROFILE_CACHE_CHANNEL', '')
+
+# Working-day calendar: weekend days (0 = Monday ... 6 = Sunday) for companies without their own
+DEFAULT_WEEKEND_DAYS = tuple(int(d) for d in os.getenv('DEFAULT_WEEKEND_DAYS', '5,6').split(',') if d.strip())
+CALENDAR_CACHE_TTL = float(os.getenv('CALENDAR_CACHE_TTL', '300'))
@@ -0,0 +1,54 @@
+import os
+import random
+
+import pytest
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.e30.benchmark")
+# Fail requests that go over their query budget, as CI should
+os.environ.setdefault("QUERY_RECORDER", "raise")
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """The in-process PostgREST stand-in, installed as the app's database"""
+    import utils.db
+    from benchmarks.standin import StandIn
+    from utils.profile_cache import profile_cache
+
+    store = StandIn()
+    monkeypatch.setattr(utils.db, "supabase", store)
+    profile_cache.clear()
+    return store
+
+
+@pytest.fixture
+def company(store):
+    """Seed rows of a 100-person company, loaded into the stand-in"""
+    from benchmarks.endpoints import load_standin, seed_rows
+
+    rows = seed_rows(100, 4, random.Random(7))
+    load_standin(store, rows)
+    return rows
+
+
+@pytest.fixture
+def client(company):
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Assert the queries an endpoint issues stay within budget:
+
+        def test_list_employees(client, query_budget):
+            with query_budget(3):
+                client.get("/employees")
+    """
+    from utils.query_recorder import assert_query_budget
+    return assert_query_budget
@@ -1,14 +1,49 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.middleware.gzip import GZipMiddleware
 from pathlib import Path
 
 from routers import auth, employees, attendance, leaves, payroll
+from utils.db import open_db, close_db
+from utils.auth_utils import shutdown_password_pool, password_queue_depth, token_cache
+from utils.write_behind import (
+    start_checkin_buffer, stop_checkin_buffer, get_checkin_buffer, start_last_login_updater, stop_last_login_updater
+)
+from utils.broadcaster import attendance_events
+from utils.metrics import MetricsMiddleware, render_metrics, gauge, counter
+from utils.etag import etag_stats
+from utils.profile_cache import (
+    profile_cache, profile_cache_age, profile_invalidations, start_profile_invalidation, stop_profile_invalidation
+)
+from utils.static_files import PrecompressedStaticFiles
+from utils.responses import ORJSONResponse
+from utils.query_recorder import QueryRecorderMiddleware
+from config import STATIC_BUILD_DIR, GZIP_MIN_SIZE, QUERY_RECORDER
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background resources"""
+    await open_db()
+    await start_checkin_buffer()
+    await start_last_login_updater()
+    await start_profile_invalidation()
+    yield
+    await stop_profile_invalidation()
+    await stop_last_login_updater()
+    await stop_checkin_buffer()
+    shutdown_password_pool()
+    await close_db()
+
 
 app = FastAPI(
     title="DayFlow HRMS API",
     description="Human Resource Management System - Every workday, perfectly aligned.",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware for frontend
@@ -20,6 +55,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger API responses (static files arrive precompressed, event streams are skipped)
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE)
+
+# Development/CI: flag requests with too many or repeated queries
+if QUERY_RECORDER != "off":
+    app.add_middleware(QueryRecorderMiddleware)
+
+# Request latency, in-flight and DB call metrics for /metrics (outermost, so it times everything)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(employees.router, prefix="/employees", tags=["Employees"])
@@ -27,16 +72,45 @@ app.include_router(attendance.router, prefix="/attendance", tags=["Attendance"])
 app.include_router(leaves.router, prefix="/leaves", tags=["Leaves"])
 app.include_router(payroll.router, prefix="/salary", tags=["Salary"])
 
-# Serve static frontend files
-frontend_path = Path(__file__).parent.parent / "frontend"
+# Serve static frontend files, preferring the hashed and precompressed build
+frontend_path = Path(STATIC_BUILD_DIR)
+if not (frontend_path / "index.html").exists():
+    frontend_path = Path(__file__).parent.parent / "frontend"
 if frontend_path.exists():
-    app.mount("/static", StaticFiles(directory=str(frontend_path), html=True), name="static")
+    app.mount("/static", PrecompressedStaticFiles(directory=str(frontend_path), html=True), name="static")
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "DayFlow HRMS"}
+    return {"status": "healthy", "service": "DayFlow HRMS", "conditional_get": etag_stats}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition"""
+    token_stats = token_cache.stats()
+    profile_stats = profile_cache.stats()
+    buffer = get_checkin_buffer()
+    return PlainTextResponse(render_metrics([
+        gauge("dayflow_password_queue_depth", "bcrypt jobs running or waiting for a worker",
+              [((), password_queue_depth())]),
+        gauge("dayflow_cache_entries", "Entries held in in-memory caches",
+              [((("cache", "token"),), token_stats["size"]), ((("cache", "profile"),), profile_stats["size"])]),
+        counter("dayflow_cache_hits_total", "Lookups answered from in-memory caches",
+                [((("cache", "token"),), token_stats["hits"]), ((("cache", "profile"),), profile_stats["hits"])]),
+        counter("dayflow_cache_misses_total", "Lookups in-memory caches could not answer",
+                [((("cache", "token"),), token_stats["misses"]), ((("cache", "profile"),), profile_stats["misses"])]),
+        profile_cache_age.render(),
+        profile_invalidations.render(),
+        gauge("dayflow_conditional_get_ratio", "Share of conditional GETs answered 304, by route",
+              [((("route", route),), stats["not_modified"] / stats["requests"])
+               for route, stats in sorted(etag_stats.items()) if stats["requests"]]),
+        gauge("dayflow_checkin_buffer_pending", "Check-ins accepted but not yet written to the database",
+              [((), len(buffer.pending) + len(buffer.inflight) if buffer else 0)]),
+        gauge("dayflow_live_subscribers", "Connected live attendance board streams",
+              [((), attendance_events.subscriber_count)]),
+    ]), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 @app.get("/")
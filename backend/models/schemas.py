@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, TypeAdapter
 from typing import Optional, List
 from datetime import date, datetime
 from enum import Enum
@@ -84,6 +84,15 @@ class EmployeeResponse(BaseModel):
     today_status: Optional[str] = None  # present, absent, leave
 
 
+class EmployeePage(BaseModel):
+    items: List[EmployeeResponse]
+    next_cursor: Optional[str] = None
+
+
+# Validates a whole page of employee rows in one call
+EmployeeList = TypeAdapter(List[EmployeeResponse])
+
+
 class UpdateEmployeeRequest(BaseModel):
     first_name: Optional[str] = None
     last_name: Optional[str] = None
@@ -125,6 +134,11 @@ class AttendanceStats(BaseModel):
     extra_hours: float
 
 
+class HolidayRequest(BaseModel):
+    holiday_date: date
+    name: str
+
+
 # ============ Leave Schemas ============
 class CreateLeaveRequest(BaseModel):
     leave_type: LeaveType
@@ -0,0 +1,41 @@
+"""
+Rebuild the attendance_monthly rollup from attendance and leave_requests.
+
+Triggers keep the rollup current on every write; run this after bulk edits
+made with triggers disabled, or to check it against the raw records. Goes
+through the configured backend (Supabase or DB_BACKEND=postgres).
+
+Usage (from backend/):
+    python rebuild_rollup.py              # every month
+    python rebuild_rollup.py --month 2025-12
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from utils.db import get_db, execute, open_db, close_db
+
+
+async def rebuild(month: str = None) -> int:
+    """Recompute one month (YYYY-MM) or all of them; returns the rollup rows written"""
+    params = {}
+    if month:
+        params["p_month"] = datetime.strptime(month, "%Y-%m").date().isoformat()
+    await open_db()
+    try:
+        result = await execute(get_db().rpc("attendance_rollup_rebuild", params))
+    finally:
+        await close_db()
+    return result.data
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--month", help="YYYY-MM (default: every month)")
+    args = parser.parse_args()
+    rows = asyncio.run(rebuild(args.month))
+    print(f"Rebuilt {rows} rollup rows" + (f" for {args.month}" if args.month else ""))
@@ -1,12 +1,36 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
-from typing import Optional, List
-from models.schemas import AttendanceRecord, AttendanceStats
-from utils.db import get_db
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Callable, Optional, List
+from models.schemas import AttendanceRecord, AttendanceStats, HolidayRequest
+from utils.db import get_db, execute
 from utils.auth_utils import get_current_user, require_admin_or_hr
+from utils.pagination import decode_cursor, after, after_pair, paginate
+from utils.write_behind import get_checkin_buffer
+from utils.broadcaster import attendance_events, format_sse
+from utils.etag import conditional_response
+from utils.query_recorder import detach
+from utils.workdays import get_calendar, invalidate_calendar
+from routers.employees import merge_today_status
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, EXPORT_PAGE_SIZE, LIVE_KEEPALIVE_SECONDS
 from datetime import datetime, date, timedelta
+import asyncio
+import csv
+import io
+import json
 
 router = APIRouter()
 
+EXPORT_COLUMNS = ["attendance_date", "employee_id", "name", "check_in", "check_out", "work_hours", "remarks"]
+
+
+def compute_work_hours(check_in: Optional[str], check_out: Optional[str]) -> Optional[float]:
+    """Hours between two ISO timestamps, rounded to 2 decimals"""
+    if not check_in or not check_out:
+        return None
+    start = datetime.fromisoformat(check_in.replace("Z", "+00:00"))
+    end = datetime.fromisoformat(check_out.replace("Z", "+00:00"))
+    return round((end - start).total_seconds() / 3600, 2)
+
 
 @router.post("/check-in")
 async def check_in(current_user: dict = Depends(get_current_user)):
@@ -15,29 +39,35 @@ async def check_in(current_user: dict = Depends(get_current_user)):
     today = date.today().isoformat()
     now = datetime.now().isoformat()
     
-    # Check if already checked in today
-    existing = db.table("attendance").select("*").eq(
-        "user_id", current_user["user_id"]
-    ).eq("attendance_date", today).execute()
-    
-    if existing.data:
-        if existing.data[0].get("check_in"):
+    # Write-behind mode: acknowledge once journaled, the buffer inserts it later
+    buffer = get_checkin_buffer()
+    if buffer is not None:
+        if not await buffer.record(current_user["user_id"], today, now):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Already checked in today"
             )
-        # Update existing record
-        db.table("attendance").update({
-            "check_in": now
-        }).eq("attendance_id", existing.data[0]["attendance_id"]).execute()
-    else:
-        # Create new record
-        db.table("attendance").insert({
-            "user_id": current_user["user_id"],
-            "attendance_date": today,
-            "check_in": now
-        }).execute()
+        attendance_events.publish("check_in", {
+            "user_id": current_user["user_id"], "attendance_date": today, "check_in": now
+        })
+        return {"message": "Checked in successfully", "time": now}
     
+    # Insert today's row, or fill in check_in on a row that has none, in one call
+    result = await execute(db.rpc("attendance_check_in", {
+        "p_user_id": current_user["user_id"],
+        "p_date": today,
+        "p_time": now
+    }))
+    
+    if result.data != "checked_in":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Already checked in today"
+        )
+    
+    attendance_events.publish("check_in", {
+        "user_id": current_user["user_id"], "attendance_date": today, "check_in": now
+    })
     return {"message": "Checked in successfully", "time": now}
 
 
@@ -48,28 +78,37 @@ async def check_out(current_user: dict = Depends(get_current_user)):
     today = date.today().isoformat()
     now = datetime.now().isoformat()
     
-    # Get today's attendance
-    existing = db.table("attendance").select("*").eq(
-        "user_id", current_user["user_id"]
-    ).eq("attendance_date", today).execute()
+    # A buffered check-in must reach the table before it can be checked out
+    buffer = get_checkin_buffer()
+    if buffer is not None and not await buffer.flush_key(current_user["user_id"], today):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Check-in is still being saved, please retry",
+            headers={"Retry-After": "1"}
+        )
+    
+    # Set check_out only if checked in and not yet checked out, in one call
+    result = await execute(db.rpc("attendance_check_out", {
+        "p_user_id": current_user["user_id"],
+        "p_date": today,
+        "p_time": now
+    }))
     
-    if not existing.data or not existing.data[0].get("check_in"):
+    if result.data == "not_checked_in":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="You haven't checked in today"
         )
     
-    if existing.data[0].get("check_out"):
+    if result.data != "checked_out":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Already checked out today"
         )
     
-    # Update with check-out time
-    db.table("attendance").update({
-        "check_out": now
-    }).eq("attendance_id", existing.data[0]["attendance_id"]).execute()
-    
+    attendance_events.publish("check_out", {
+        "user_id": current_user["user_id"], "attendance_date": today, "check_out": now
+    })
     return {"message": "Checked out successfully", "time": now}
 
 
@@ -77,9 +116,11 @@ async def check_out(current_user: dict = Depends(get_current_user)):
 async def get_attendance(
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get own attendance records"""
+    """Get own attendance records, newest first"""
     db = get_db()
     
     query = db.table("attendance").select("*").eq("user_id", current_user["user_id"])
@@ -88,144 +129,424 @@ async def get_attendance(
         query = query.gte("attendance_date", start_date)
     if end_date:
         query = query.lte("attendance_date", end_date)
+    query = after(query, decode_cursor(cursor), "attendance_date", desc=True)
     
-    result = query.order("attendance_date", desc=True).execute()
+    result = await execute(query.order("attendance_date", desc=True).limit(limit + 1))
+    page = paginate(result.data, limit, lambda r: {"attendance_date": r["attendance_date"]})
     
-    records = []
-    for r in result.data:
-        work_hours = None
-        if r.get("check_in") and r.get("check_out"):
-            check_in = datetime.fromisoformat(r["check_in"].replace("Z", "+00:00"))
-            check_out = datetime.fromisoformat(r["check_out"].replace("Z", "+00:00"))
-            work_hours = round((check_out - check_in).total_seconds() / 3600, 2)
-        
-        records.append({
-            **r,
-            "work_hours": work_hours
-        })
+    # Check-ins still in the write-behind buffer belong at the top of the first page
+    buffer = get_checkin_buffer()
+    if buffer is not None and cursor is None:
+        stored = {r["attendance_date"] for r in page["items"]}
+        buffered = [
+            r for r in buffer.buffered(user_id=current_user["user_id"])
+            if r["attendance_date"] not in stored
+            and (not start_date or r["attendance_date"] >= start_date)
+            and (not end_date or r["attendance_date"] <= end_date)
+        ]
+        page["items"] = buffered + page["items"]
     
-    return records
+    records = [
+        {**r, "work_hours": compute_work_hours(r.get("check_in"), r.get("check_out"))}
+        for r in page["items"]
+    ]
+    
+    return {"items": records, "next_cursor": page["next_cursor"]}
 
 
 @router.get("/all")
 async def get_all_attendance(
+    http_request: Request,
     attendance_date: Optional[str] = Query(None, description="Date (YYYY-MM-DD), defaults to today"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     current_user: dict = Depends(require_admin_or_hr)
 ):
-    """Get all employees' attendance for a date (Admin/HR only)"""
+    """Get employees' attendance for a date, one page of employees at a time (Admin/HR only)"""
     db = get_db()
     
     target_date = attendance_date or date.today().isoformat()
     
-    # Get all employees
-    users_result = db.table("users").select(
+    # Get one page of employees
+    users_query = db.table("users").select(
         "user_id, employee_id, employees(first_name, last_name)"
-    ).execute()
+    )
+    users_query = after(users_query, decode_cursor(cursor), "user_id")
+    users_result = await execute(users_query.order("user_id").limit(limit + 1))
+    page = paginate(users_result.data, limit, lambda u: {"user_id": u["user_id"]})
     
-    # Get attendance for the date
-    attendance_result = db.table("attendance").select("*").eq(
+    # Get attendance for the date, for this page's employees only
+    attendance_result = await execute(db.table("attendance").select("*").eq(
         "attendance_date", target_date
-    ).execute()
+    ).in_("user_id", [u["user_id"] for u in page["items"]]))
     
     attendance_map = {a["user_id"]: a for a in attendance_result.data}
     
+    # Include check-ins still in the write-behind buffer
+    buffer = get_checkin_buffer()
+    if buffer is not None:
+        for row in buffer.buffered(attendance_date=target_date):
+            attendance_map.setdefault(row["user_id"], row)
+    
     records = []
-    for user in users_result.data:
+    for user in page["items"]:
         emp = user.get("employees", {}) or {}
         att = attendance_map.get(user["user_id"], {})
         
-        work_hours = None
-        if att.get("check_in") and att.get("check_out"):
-            check_in = datetime.fromisoformat(att["check_in"].replace("Z", "+00:00"))
-            check_out = datetime.fromisoformat(att["check_out"].replace("Z", "+00:00"))
-            work_hours = round((check_out - check_in).total_seconds() / 3600, 2)
-        
         records.append({
             "user_id": user["user_id"],
             "employee_id": user["employee_id"],
             "name": f"{emp.get('first_name', '')} {emp.get('last_name', '')}".strip(),
             "check_in": att.get("check_in"),
             "check_out": att.get("check_out"),
-            "work_hours": work_hours,
+            "work_hours": compute_work_hours(att.get("check_in"), att.get("check_out")),
             "remarks": att.get("remarks")
         })
     
-    return {"date": target_date, "records": records}
+    return conditional_response(
+        http_request, "GET /attendance/all",
+        {"date": target_date, "records": records, "next_cursor": page["next_cursor"]}
+    )
 
 
 @router.get("/today")
-async def get_today_attendance(current_user: dict = Depends(require_admin_or_hr)):
+async def get_today_attendance(
+    http_request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_user: dict = Depends(require_admin_or_hr)
+):
     """Get today's attendance summary (Admin/HR only)"""
-    return await get_all_attendance(date.today().isoformat(), current_user)
+    return await get_all_attendance(http_request, date.today().isoformat(), limit, cursor, current_user)
 
 
-@router.get("/stats")
-async def get_attendance_stats(
-    month: Optional[int] = Query(None, description="Month (1-12)"),
-    year: Optional[int] = Query(None, description="Year"),
-    current_user: dict = Depends(get_current_user)
-):
-    """Get attendance statistics for current user"""
+async def build_board_snapshot(target_date: str) -> List[dict]:
+    """
+    Every employee with their status for the date. Users, the date's
+    attendance and the approved leaves covering it are each read as a keyset
+    scan, so the queries issued don't grow with headcount.
+    """
+    db = get_db()
+    attendance, leaves = await asyncio.gather(
+        scan(lambda: db.table("attendance").select("attendance_id, user_id, check_in, check_out").eq(
+            "attendance_date", target_date
+        ), "attendance_id"),
+        scan(lambda: db.table("leave_requests").select("leave_id, user_id, leave_type").eq(
+            "status", "approved"
+        ).lte("start_date", target_date).gte("end_date", target_date), "leave_id")
+    )
+    statuses = merge_today_status(target_date, attendance, leaves)
+    
+    board = []
+    last_user_id = 0
+    
+    while True:
+        users = await execute(db.table("users").select(
+            "user_id, employee_id, employees(first_name, last_name, job_title)"
+        ).neq("role", "admin").gt("user_id", last_user_id).order("user_id").limit(EXPORT_PAGE_SIZE))
+        if not users.data:
+            break
+        last_user_id = users.data[-1]["user_id"]
+        
+        for user in users.data:
+            emp = user.get("employees", {}) or {}
+            board.append({
+                "user_id": user["user_id"],
+                "employee_id": user["employee_id"],
+                "name": f"{emp.get('first_name', '')} {emp.get('last_name', '')}".strip(),
+                "job_title": emp.get("job_title"),
+                **statuses.get(user["user_id"], {"status": "absent"})
+            })
+        
+        if len(users.data) < EXPORT_PAGE_SIZE:
+            break
+    
+    return board
+
+
+@router.get("/live")
+async def live_attendance(current_user: dict = Depends(require_admin_or_hr)):
+    """
+    Live attendance board as server-sent events (Admin/HR only).
+    Sends one `snapshot` of today's statuses, then `check_in`, `check_out`,
+    `leave_approved` and `leave_rejected` events as they happen.
+    """
+    today = date.today().isoformat()
+    
+    # Subscribe first so nothing published while the snapshot loads is lost
+    queue = attendance_events.subscribe()
+    try:
+        snapshot = await build_board_snapshot(today)
+    except Exception:
+        attendance_events.unsubscribe(queue)
+        raise
+    
+    async def events():
+        try:
+            yield format_sse("snapshot", {"date": today, "employees": snapshot})
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=LIVE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if item is None:
+                    break
+                yield format_sse(*item)
+        finally:
+            attendance_events.unsubscribe(queue)
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+
+async def iter_export_rows(start: date, end: date) -> AsyncIterator[List[dict]]:
+    """Yield attendance in [start, end] one page at a time, joined with employee names"""
     db = get_db()
+    cursor = None
+    
+    while True:
+        query = db.table("attendance").select(
+            "*, users(employee_id, employees(first_name, last_name))"
+        ).gte("attendance_date", start.isoformat()).lte("attendance_date", end.isoformat())
+        query = after_pair(query, cursor, "attendance_date", "attendance_id", desc=False)
+        result = await execute(query.order("attendance_date").order("attendance_id").limit(EXPORT_PAGE_SIZE))
+        
+        rows = []
+        for a in result.data:
+            user = a.get("users", {}) or {}
+            emp = user.get("employees", {}) or {}
+            rows.append({
+                "attendance_date": a["attendance_date"],
+                "employee_id": user.get("employee_id"),
+                "name": f"{emp.get('first_name', '')} {emp.get('last_name', '')}".strip(),
+                "check_in": a.get("check_in"),
+                "check_out": a.get("check_out"),
+                "work_hours": compute_work_hours(a.get("check_in"), a.get("check_out")),
+                "remarks": a.get("remarks")
+            })
+        if rows:
+            yield rows
+        
+        if len(result.data) < EXPORT_PAGE_SIZE:
+            break
+        last = result.data[-1]
+        cursor = {"attendance_date": last["attendance_date"], "attendance_id": last["attendance_id"]}
+
+
+async def stream_csv(pages: AsyncIterator[List[dict]]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    async for rows in pages:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    yield buffer.getvalue()
+
+
+async def stream_ndjson(pages: AsyncIterator[List[dict]]) -> AsyncIterator[str]:
+    async for rows in pages:
+        yield "".join(json.dumps(row) + "\n" for row in rows)
+
+
+@router.get("/export")
+async def export_attendance(
+    start: date = Query(..., description="First date (YYYY-MM-DD)"),
+    end: date = Query(..., description="Last date (YYYY-MM-DD)"),
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    current_user: dict = Depends(require_admin_or_hr)
+):
+    """
+    Export attendance for a date range as CSV or NDJSON (Admin/HR only).
+    Rows are fetched and written one page at a time, so memory use doesn't
+    depend on the size of the range.
+    """
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before or equal to end"
+        )
+    
+    pages = iter_export_rows(start, end)
+    if format == "csv":
+        body, media_type = stream_csv(pages), "text/csv"
+    else:
+        body, media_type = stream_ndjson(pages), "application/x-ndjson"
     
-    # Default to current month
+    return StreamingResponse(detach(body), media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="attendance_{start}_{end}.{format}"'
+    })
+
+
+def month_range(month: Optional[int], year: Optional[int]) -> tuple:
+    """First and last day of a month (the current one by default)"""
     now = date.today()
     target_month = month or now.month
     target_year = year or now.year
     
-    # Calculate date range
     start_date = date(target_year, target_month, 1)
     if target_month == 12:
         end_date = date(target_year + 1, 1, 1) - timedelta(days=1)
     else:
         end_date = date(target_year, target_month + 1, 1) - timedelta(days=1)
+    return start_date, end_date
+
+
+def rollup_stats(rollup: Optional[dict], total_working_days: int) -> dict:
+    """Stats from a user's attendance_monthly row (None when nothing was recorded that month)"""
+    rollup = rollup or {}
+    days_present = rollup.get("days_present") or 0
+    days_leave = int(float(rollup.get("leave_days") or 0))
     
-    # Get attendance records
-    attendance = db.table("attendance").select("*").eq(
-        "user_id", current_user["user_id"]
-    ).gte("attendance_date", start_date.isoformat()).lte(
-        "attendance_date", end_date.isoformat()
-    ).execute()
-    
-    # Get approved leaves
-    leaves = db.table("leave_requests").select("*").eq(
-        "user_id", current_user["user_id"]
-    ).eq("status", "approved").gte(
-        "start_date", start_date.isoformat()
-    ).lte("end_date", end_date.isoformat()).execute()
-    
-    # Calculate stats
-    days_present = 0
-    total_work_hours = 0
-    
-    for a in attendance.data:
-        if a.get("check_in"):
-            days_present += 1
-            if a.get("check_out"):
-                check_in = datetime.fromisoformat(a["check_in"].replace("Z", "+00:00"))
-                check_out = datetime.fromisoformat(a["check_out"].replace("Z", "+00:00"))
-                total_work_hours += (check_out - check_in).total_seconds() / 3600
-    
-    days_leave = sum(l.get("days_requested", 0) for l in leaves.data)
-    
-    # Calculate working days (excluding weekends)
-    total_working_days = 0
-    current = start_date
-    while current <= min(end_date, now):
-        if current.weekday() < 5:  # Monday to Friday
-            total_working_days += 1
-        current += timedelta(days=1)
-    
-    days_absent = max(0, total_working_days - days_present - int(days_leave))
-    
-    # Extra hours (assuming 8 hours workday)
-    expected_hours = days_present * 8
-    extra_hours = round(max(0, total_work_hours - expected_hours), 2)
-    
-    return AttendanceStats(
-        days_present=days_present,
-        days_absent=days_absent,
-        days_leave=int(days_leave),
-        total_working_days=total_working_days,
-        extra_hours=extra_hours
-    )
+    return {
+        "days_present": days_present,
+        "days_absent": max(0, total_working_days - days_present - days_leave),
+        "days_leave": days_leave,
+        "total_working_days": total_working_days,
+        # Hours beyond 8 per present day
+        "extra_hours": round(float(rollup.get("overtime_hours") or 0), 2)
+    }
+
+
+@router.get("/stats")
+async def get_attendance_stats(
+    month: Optional[int] = Query(None, description="Month (1-12)"),
+    year: Optional[int] = Query(None, description="Year"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get attendance statistics for current user"""
+    db = get_db()
+    start_date, end_date = month_range(month, year)
+    
+    # One rollup row, kept current by triggers on attendance and leave_requests
+    rollup = await execute(db.table("attendance_monthly").select(
+        "days_present, leave_days, overtime_hours"
+    ).eq("user_id", current_user["user_id"]).eq("month", start_date.isoformat()))
+    
+    # Working days so far this period (company weekend days and holidays excluded)
+    calendar = await get_calendar(db)
+    total_working_days = calendar.working_days(start_date, min(end_date, date.today()))
+    
+    return AttendanceStats(**rollup_stats(rollup.data[0] if rollup.data else None, total_working_days))
+
+
+async def scan(query_factory: Callable[[], Any], key: str) -> List[dict]:
+    """Every row of a filtered query, read EXPORT_PAGE_SIZE rows at a time in key order"""
+    rows, cursor = [], None
+    while True:
+        result = await execute(after(query_factory(), cursor, key).order(key).limit(EXPORT_PAGE_SIZE))
+        rows.extend(result.data)
+        if len(result.data) < EXPORT_PAGE_SIZE:
+            return rows
+        cursor = {key: result.data[-1][key]}
+
+
+@router.get("/stats/all")
+async def get_all_attendance_stats(
+    http_request: Request,
+    month: Optional[int] = Query(None, description="Month (1-12)"),
+    year: Optional[int] = Query(None, description="Year"),
+    current_user: dict = Depends(require_admin_or_hr)
+):
+    """
+    Attendance statistics for every employee for a month (Admin/HR only).
+    Reads every user and the month's attendance_monthly rollup rows once,
+    instead of a query per employee.
+    """
+    db = get_db()
+    start_date, end_date = month_range(month, year)
+    
+    users = await scan(lambda: db.table("users").select(
+        "user_id, employee_id, employees(first_name, last_name)"
+    ), "user_id")
+    rollups = await scan(lambda: db.table("attendance_monthly").select(
+        "user_id, days_present, leave_days, overtime_hours"
+    ).eq("month", start_date.isoformat()), "user_id")
+    rollup_by_user = {r["user_id"]: r for r in rollups}
+    
+    calendar = await get_calendar(db)
+    total_working_days = calendar.working_days(start_date, min(end_date, date.today()))
+    
+    employees = []
+    for user in users:
+        emp = user.get("employees", {}) or {}
+        employees.append({
+            "user_id": user["user_id"],
+            "employee_id": user["employee_id"],
+            "name": f"{emp.get('first_name', '')} {emp.get('last_name', '')}".strip(),
+            **rollup_stats(rollup_by_user.get(user["user_id"]), total_working_days)
+        })
+    
+    return conditional_response(http_request, "GET /attendance/stats/all", {
+        "month": start_date.month,
+        "year": start_date.year,
+        "total_working_days": total_working_days,
+        "employees": employees
+    })
+
+
+async def default_company_id(db) -> int:
+    """The company holidays belong to (the first one, as elsewhere)"""
+    company = await execute(db.table("company").select("company_id").order("company_id").limit(1))
+    if not company.data:
+        raise HTTPException(status_code=404, detail="Company not found")
+    return company.data[0]["company_id"]
+
+
+@router.get("/holidays")
+async def get_holidays(
+    year: Optional[int] = Query(None, description="Year (defaults to the current one)"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Company holidays and weekend days for a year"""
+    db = get_db()
+    target_year = year or date.today().year
+    company_id = await default_company_id(db)
+    
+    holidays = await execute(db.table("company_holidays").select("holiday_date, name").eq(
+        "company_id", company_id
+    ).gte("holiday_date", date(target_year, 1, 1).isoformat()).lte(
+        "holiday_date", date(target_year, 12, 31).isoformat()
+    ).order("holiday_date"))
+    calendar = await get_calendar(db, company_id)
+    
+    return {
+        "year": target_year,
+        "weekend_days": sorted(calendar.weekend_days),
+        "working_days": calendar.working_days(date(target_year, 1, 1), date(target_year, 12, 31)),
+        "holidays": holidays.data
+    }
+
+
+@router.post("/holidays")
+async def add_holiday(request: HolidayRequest, current_user: dict = Depends(require_admin_or_hr)):
+    """Add or rename a company holiday (Admin/HR only)"""
+    db = get_db()
+    company_id = await default_company_id(db)
+    
+    await execute(db.table("company_holidays").upsert({
+        "company_id": company_id,
+        "holiday_date": request.holiday_date.isoformat(),
+        "name": request.name
+    }, on_conflict="company_id,holiday_date"))
+    invalidate_calendar(company_id)
+    
+    return {"message": "Holiday saved", "holiday_date": request.holiday_date}
+
+
+@router.delete("/holidays/{holiday_date}")
+async def delete_holiday(holiday_date: date, current_user: dict = Depends(require_admin_or_hr)):
+    """Remove a company holiday (Admin/HR only)"""
+    db = get_db()
+    company_id = await default_company_id(db)
+    
+    await execute(db.table("company_holidays").delete().eq("company_id", company_id).eq(
+        "holiday_date", holiday_date.isoformat()
+    ))
+    invalidate_calendar(company_id)
+    
+    return {"message": "Holiday removed"}
@@ -2,12 +2,14 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from models.schemas import (
     CompanySignupRequest, LoginRequest, TokenResponse, ChangePasswordRequest
 )
-from utils.db import get_db
+from utils.db import get_db, execute
 from utils.auth_utils import (
-    hash_password, verify_password, create_access_token, 
+    hash_password_async, verify_password_async, create_access_token, 
     get_current_user, generate_random_password
 )
 from utils.generators import generate_employee_id
+from utils.profile_cache import load_profile, invalidate_profile
+from utils.write_behind import last_login_updater
 from datetime import datetime
 
 router = APIRouter()
@@ -22,18 +24,21 @@ async def signup_company(request: CompanySignupRequest):
     db = get_db()
     
     # Check if email already exists
-    existing = db.table("users").select("*").eq("email", request.admin_email).execute()
+    existing = await execute(db.table("users").select("*").eq("email", request.admin_email))
     if existing.data:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
+    # Hash up front so a busy password pool fails the request before any writes
+    password_hash = await hash_password_async(request.admin_password)
+    
     # Create company
-    company_result = db.table("company").insert({
+    company_result = await execute(db.table("company").insert({
         "name": request.company_name,
         "prefix": request.company_prefix[:5].upper()
-    }).execute()
+    }))
     
     if not company_result.data:
         raise HTTPException(
@@ -47,16 +52,16 @@ async def signup_company(request: CompanySignupRequest):
     names = request.admin_name.split()
     first_name = names[0]
     last_name = names[-1] if len(names) > 1 else names[0]
-    employee_id = generate_employee_id(request.company_prefix, first_name, last_name)
+    employee_id = await generate_employee_id(request.company_prefix, first_name, last_name)
     
     # Create admin user
-    user_result = db.table("users").insert({
+    user_result = await execute(db.table("users").insert({
         "email": request.admin_email,
         "employee_id": employee_id,
-        "password_hash": hash_password(request.admin_password),
+        "password_hash": password_hash,
         "role": "admin",
         "is_verified": True
-    }).execute()
+    }))
     
     if not user_result.data:
         raise HTTPException(
@@ -67,7 +72,7 @@ async def signup_company(request: CompanySignupRequest):
     user_id = user_result.data[0]["user_id"]
     
     # Create employee profile for admin
-    db.table("employees").insert({
+    await execute(db.table("employees").insert({
         "user_id": user_id,
         "first_name": first_name,
         "last_name": last_name,
@@ -75,7 +80,7 @@ async def signup_company(request: CompanySignupRequest):
         "join_date": datetime.now().date().isoformat(),
         "department": "Administration",
         "job_title": "Administrator"
-    }).execute()
+    }))
     
     # Generate token
     token = create_access_token({
@@ -104,12 +109,13 @@ async def login(request: LoginRequest):
     """
     db = get_db()
     
-    # Try to find user by email or employee_id
+    # Try to find user by email or employee_id, with the employee fields the response needs
     user = None
+    columns = "*, employees(first_name, last_name, profile_picture_url)"
     if "@" in request.identifier:
-        result = db.table("users").select("*").eq("email", request.identifier).execute()
+        result = await execute(db.table("users").select(columns).eq("email", request.identifier))
     else:
-        result = db.table("users").select("*").eq("employee_id", request.identifier.upper()).execute()
+        result = await execute(db.table("users").select(columns).eq("employee_id", request.identifier.upper()))
     
     if result.data:
         user = result.data[0]
@@ -121,18 +127,16 @@ async def login(request: LoginRequest):
         )
     
     # Verify password
-    if not verify_password(request.password, user["password_hash"]):
+    if not await verify_password_async(request.password, user["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
         )
     
-    # Get employee details
-    emp_result = db.table("employees").select("*").eq("user_id", user["user_id"]).execute()
-    employee = emp_result.data[0] if emp_result.data else {}
+    employee = user.get("employees") or {}
     
-    # Update last login
-    db.table("users").update({"last_login": datetime.now().isoformat()}).eq("user_id", user["user_id"]).execute()
+    # Written in the background, batched with other logins
+    last_login_updater.record(user["user_id"])
     
     # Generate token
     token = create_access_token({
@@ -161,14 +165,11 @@ async def get_me(current_user: dict = Depends(get_current_user)):
     """Get current user details from JWT token"""
     db = get_db()
     
-    user_result = db.table("users").select("*").eq("user_id", current_user["user_id"]).execute()
-    if not user_result.data:
+    profile = await load_profile(db, current_user["user_id"])
+    if profile is None:
         raise HTTPException(status_code=404, detail="User not found")
     
-    user = user_result.data[0]
-    
-    emp_result = db.table("employees").select("*").eq("user_id", user["user_id"]).execute()
-    employee = emp_result.data[0] if emp_result.data else {}
+    user, employee = profile["user"], profile["employee"]
     
     return {
         "user_id": user["user_id"],
@@ -186,21 +187,22 @@ async def change_password(request: ChangePasswordRequest, current_user: dict = D
     db = get_db()
     
     # Get current password hash
-    user_result = db.table("users").select("password_hash").eq("user_id", current_user["user_id"]).execute()
+    user_result = await execute(db.table("users").select("password_hash").eq("user_id", current_user["user_id"]))
     if not user_result.data:
         raise HTTPException(status_code=404, detail="User not found")
     
     # Verify current password
-    if not verify_password(request.current_password, user_result.data[0]["password_hash"]):
+    if not await verify_password_async(request.current_password, user_result.data[0]["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
     
     # Update password
-    db.table("users").update({
-        "password_hash": hash_password(request.new_password),
+    await execute(db.table("users").update({
+        "password_hash": await hash_password_async(request.new_password),
         "updated_at": datetime.now().isoformat()
-    }).eq("user_id", current_user["user_id"]).execute()
+    }).eq("user_id", current_user["user_id"]))
+    await invalidate_profile(current_user["user_id"])
     
     return {"message": "Password updated successfully"}
@@ -1,67 +1,122 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
-from models.schemas import CreateEmployeeRequest, EmployeeResponse, UpdateEmployeeRequest
-from utils.db import get_db
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request
+from typing import List, Optional, Set
+from pydantic import ValidationError
+import asyncio
+from models.schemas import CreateEmployeeRequest, EmployeePage, EmployeeList, UpdateEmployeeRequest
+from utils.db import get_db, execute
 from utils.auth_utils import (
-    hash_password, get_current_user, require_admin_or_hr, generate_random_password
+    hash_password_async, hash_passwords_async, get_current_user, require_admin_or_hr,
+    generate_random_password
 )
-from utils.generators import generate_employee_id
+from utils.generators import generate_employee_id, generate_employee_ids
+from utils.write_behind import get_checkin_buffer
+from utils.etag import conditional_response, make_etag, etag_matches, not_modified
+from utils.profile_cache import cached_profile, fetch_profile, invalidate_profile
+from utils.responses import validate_rows
+from utils.importers import ImportRecord, resolve_import_format, iter_records, batched
+from utils.pagination import decode_cursor, after, paginate
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, BULK_IMPORT_BATCH_SIZE
 from datetime import datetime, date
 
 router = APIRouter()
 
 
-@router.get("", response_model=List[EmployeeResponse])
-async def list_employees(current_user: dict = Depends(require_admin_or_hr)):
-    """List all employees with their today's status (Admin/HR only)"""
+async def resolve_today_status(db, target_date: str, user_ids: Optional[List[int]] = None) -> dict:
+    """
+    Resolve present/absent/leave status for many users on one date.
+    Uses one attendance query and one approved-leave query, joined in memory.
+    Users missing from the result are absent.
+    """
+    attendance_query = db.table("attendance").select("user_id, check_in, check_out").eq(
+        "attendance_date", target_date
+    )
+    leave_query = db.table("leave_requests").select("user_id, leave_type").eq(
+        "status", "approved"
+    ).lte("start_date", target_date).gte("end_date", target_date)
+    
+    if user_ids is not None:
+        attendance_query = attendance_query.in_("user_id", user_ids)
+        leave_query = leave_query.in_("user_id", user_ids)
+    
+    attendance, leaves = await asyncio.gather(execute(attendance_query), execute(leave_query))
+    return merge_today_status(target_date, attendance.data, leaves.data, user_ids)
+
+
+def merge_today_status(target_date: str, rows: List[dict], leaves: List[dict],
+                       user_ids: Optional[List[int]] = None) -> dict:
+    """Statuses by user_id from a date's attendance rows and the approved leaves covering it"""
+    # Include check-ins still in the write-behind buffer
+    buffer = get_checkin_buffer()
+    if buffer is not None:
+        wanted = set(user_ids) if user_ids is not None else None
+        rows = [
+            r for r in buffer.buffered(attendance_date=target_date)
+            if wanted is None or r["user_id"] in wanted
+        ] + rows
+    
+    statuses = {}
+    for a in rows:
+        if a.get("check_in") and a["user_id"] not in statuses:
+            statuses[a["user_id"]] = {
+                "status": "present",
+                "check_in": a["check_in"],
+                "check_out": a.get("check_out")
+            }
+    
+    # Approved leave takes precedence over attendance
+    for l in leaves:
+        statuses[l["user_id"]] = {"status": "leave", "leave_type": l.get("leave_type")}
+    
+    return statuses
+
+
+@router.get("", response_model=EmployeePage)
+async def list_employees(
+    http_request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_user: dict = Depends(require_admin_or_hr)
+):
+    """List employees with their today's status, one page at a time (Admin/HR only)"""
     db = get_db()
     
-    # Get all users with their employee details
-    result = db.table("users").select(
+    # Get one page of users with their employee details, plus one row to detect a next page
+    query = db.table("users").select(
         "user_id, employee_id, email, role, "
         "employees(first_name, last_name, phone, department, job_title, profile_picture_url, join_date)"
-    ).neq("role", "admin").execute()
+    ).neq("role", "admin")
+    query = after(query, decode_cursor(cursor), "user_id")
+    result = await execute(query.order("user_id").limit(limit + 1))
     
-    employees = []
-    today = date.today().isoformat()
+    page = paginate(result.data, limit, lambda u: {"user_id": u["user_id"]})
+    statuses = await resolve_today_status(
+        db, date.today().isoformat(), [u["user_id"] for u in page["items"]]
+    )
     
-    for user in result.data:
+    employees = []
+    for user in page["items"]:
         emp = user.get("employees", {}) or {}
+        status_val = statuses.get(user["user_id"], {"status": "absent"})["status"]
         
-        # Get today's attendance status
-        attendance = db.table("attendance").select("check_in, check_out").eq(
-            "user_id", user["user_id"]
-        ).eq("attendance_date", today).execute()
-        
-        # Check if on leave today
-        leave = db.table("leave_requests").select("*").eq(
-            "user_id", user["user_id"]
-        ).eq("status", "approved").lte("start_date", today).gte("end_date", today).execute()
-        
-        # Determine status
-        if leave.data:
-            status_val = "leave"
-        elif attendance.data and attendance.data[0].get("check_in"):
-            status_val = "present"
-        else:
-            status_val = "absent"
-        
-        employees.append(EmployeeResponse(
-            user_id=user["user_id"],
-            employee_id=user["employee_id"],
-            email=user["email"],
-            role=user["role"],
-            first_name=emp.get("first_name", ""),
-            last_name=emp.get("last_name", ""),
-            phone=emp.get("phone"),
-            department=emp.get("department"),
-            job_title=emp.get("job_title"),
-            profile_picture_url=emp.get("profile_picture_url"),
-            join_date=emp.get("join_date"),
-            today_status=status_val
-        ))
+        employees.append({
+            "user_id": user["user_id"],
+            "employee_id": user["employee_id"],
+            "email": user["email"],
+            "role": user["role"],
+            "first_name": emp.get("first_name", ""),
+            "last_name": emp.get("last_name", ""),
+            "phone": emp.get("phone"),
+            "department": emp.get("department"),
+            "job_title": emp.get("job_title"),
+            "profile_picture_url": emp.get("profile_picture_url"),
+            "join_date": emp.get("join_date"),
+            "today_status": status_val
+        })
     
-    return employees
+    return conditional_response(http_request, "GET /employees", {
+        "items": validate_rows(EmployeeList, employees),
+        "next_cursor": page["next_cursor"]
+    })
 
 
 @router.post("", response_model=dict)
@@ -70,7 +125,7 @@ async def create_employee(request: CreateEmployeeRequest, current_user: dict = D
     db = get_db()
     
     # Check if email exists
-    existing = db.table("users").select("*").eq("email", request.email).execute()
+    existing = await execute(db.table("users").select("*").eq("email", request.email))
     if existing.data:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -78,26 +133,27 @@ async def create_employee(request: CreateEmployeeRequest, current_user: dict = D
         )
     
     # Get company prefix for ID generation
-    company = db.table("company").select("prefix").limit(1).execute()
+    company = await execute(db.table("company").select("prefix").limit(1))
     company_prefix = company.data[0]["prefix"] if company.data else "DF"
     
     # Generate employee ID and password
-    employee_id = generate_employee_id(
+    employee_id = await generate_employee_id(
         company_prefix, 
         request.first_name, 
         request.last_name,
         request.join_date.year
     )
     temp_password = generate_random_password()
+    password_hash = await hash_password_async(temp_password)
     
     # Create user
-    user_result = db.table("users").insert({
+    user_result = await execute(db.table("users").insert({
         "email": request.email,
         "employee_id": employee_id,
-        "password_hash": hash_password(temp_password),
+        "password_hash": password_hash,
         "role": request.role.value,
         "is_verified": True
-    }).execute()
+    }))
     
     if not user_result.data:
         raise HTTPException(
@@ -108,7 +164,7 @@ async def create_employee(request: CreateEmployeeRequest, current_user: dict = D
     user_id = user_result.data[0]["user_id"]
     
     # Create employee profile
-    db.table("employees").insert({
+    await execute(db.table("employees").insert({
         "user_id": user_id,
         "first_name": request.first_name,
         "last_name": request.last_name,
@@ -117,7 +173,7 @@ async def create_employee(request: CreateEmployeeRequest, current_user: dict = D
         "job_title": request.job_title,
         "join_date": request.join_date.isoformat(),
         "base_salary": request.base_salary
-    }).execute()
+    }))
     
     return {
         "message": "Employee created successfully",
@@ -127,8 +183,171 @@ async def create_employee(request: CreateEmployeeRequest, current_user: dict = D
     }
 
 
+async def import_employee_batch(db, company_prefix: str, batch: List[ImportRecord], seen_emails: Set[str]) -> List[dict]:
+    """
+    Validate and create one batch of imported employees.
+    Returns one result per record: created, or error with reasons (marked
+    retryable when the batch was turned away before anything was written).
+    """
+    results = {}
+    valid = []
+    
+    for row, data, error in batch:
+        if error:
+            results[row] = {"row": row, "status": "error", "errors": [error]}
+            continue
+        try:
+            employee = CreateEmployeeRequest.model_validate(data)
+        except ValidationError as e:
+            results[row] = {
+                "row": row,
+                "status": "error",
+                "errors": [f"{'.'.join(str(l) for l in err['loc'])}: {err['msg']}" for err in e.errors()]
+            }
+            continue
+        
+        email = employee.email.lower()
+        if email in seen_emails:
+            results[row] = {"row": row, "status": "error", "errors": ["Duplicate email in import"]}
+            continue
+        seen_emails.add(email)
+        valid.append((row, employee))
+    
+    # One lookup for emails that already exist
+    if valid:
+        existing = await execute(db.table("users").select("email").in_(
+            "email", [employee.email for _, employee in valid]
+        ))
+        taken = {u["email"].lower() for u in existing.data}
+        for row, employee in valid:
+            if employee.email.lower() in taken:
+                results[row] = {"row": row, "status": "error", "errors": ["Email already registered"]}
+        valid = [(row, employee) for row, employee in valid if employee.email.lower() not in taken]
+    
+    if valid:
+        try:
+            employee_ids = await generate_employee_ids(company_prefix, [
+                (employee.first_name, employee.last_name, employee.join_date.year) for _, employee in valid
+            ])
+            temp_passwords = [generate_random_password() for _ in valid]
+            password_hashes = await hash_passwords_async(temp_passwords)
+            
+            user_result = await execute(db.table("users").insert([
+                {
+                    "email": employee.email,
+                    "employee_id": employee_id,
+                    "password_hash": password_hash,
+                    "role": employee.role.value,
+                    "is_verified": True
+                }
+                for (_, employee), employee_id, password_hash in zip(valid, employee_ids, password_hashes)
+            ]))
+            user_ids = {u["employee_id"]: u["user_id"] for u in user_result.data}
+            
+            try:
+                await execute(db.table("employees").insert([
+                    {
+                        "user_id": user_ids[employee_id],
+                        "first_name": employee.first_name,
+                        "last_name": employee.last_name,
+                        "phone": employee.phone,
+                        "department": employee.department,
+                        "job_title": employee.job_title,
+                        "join_date": employee.join_date.isoformat(),
+                        "base_salary": employee.base_salary
+                    }
+                    for (_, employee), employee_id in zip(valid, employee_ids)
+                ]))
+            except Exception:
+                # Users without employees would make a retry fail with "Email already registered"
+                await execute(db.table("users").delete().in_("user_id", list(user_ids.values())))
+                raise
+        except HTTPException as e:
+            # Password pool busy: nothing in this batch was written, the rows can be sent again
+            for row, _ in valid:
+                results[row] = {"row": row, "status": "error", "retryable": True, "errors": [e.detail]}
+        except Exception as e:
+            for row, _ in valid:
+                results[row] = {"row": row, "status": "error", "errors": [f"Batch insert failed: {e}"]}
+        else:
+            for (row, employee), employee_id, temp_password in zip(valid, employee_ids, temp_passwords):
+                results[row] = {
+                    "row": row,
+                    "status": "created",
+                    "email": employee.email,
+                    "employee_id": employee_id,
+                    "temporary_password": temp_password
+                }
+    
+    return [results[row] for row, _, _ in batch]
+
+
+@router.post("/bulk")
+async def bulk_create_employees(
+    http_request: Request,
+    format: Optional[str] = Query(None, description="csv or ndjson; defaults to the Content-Type"),
+    current_user: dict = Depends(require_admin_or_hr)
+):
+    """
+    Import many employees from a CSV (with header row) or NDJSON body (Admin/HR only).
+    Each record uses the same fields as POST /employees. The body is parsed as a
+    stream and processed in batches; the response reports the outcome of every row.
+    """
+    fmt = resolve_import_format(format, http_request.headers.get("content-type"))
+    db = get_db()
+    
+    company = await execute(db.table("company").select("prefix").limit(1))
+    company_prefix = company.data[0]["prefix"] if company.data else "DF"
+    
+    results = []
+    seen_emails: Set[str] = set()
+    async for batch in batched(iter_records(http_request.stream(), fmt), BULK_IMPORT_BATCH_SIZE):
+        results.extend(await import_employee_batch(db, company_prefix, batch, seen_emails))
+    
+    created = sum(1 for r in results if r["status"] == "created")
+    return {
+        "message": f"Imported {created} of {len(results)} employees",
+        "total": len(results),
+        "created": created,
+        "failed": len(results) - created,
+        "results": results
+    }
+
+
+@router.get("/status")
+async def get_employees_status(
+    ids: str = Query(..., description="Comma-separated user IDs"),
+    current_user: dict = Depends(require_admin_or_hr)
+):
+    """Get today's status for several employees at once (Admin/HR only)"""
+    try:
+        user_ids = [int(i) for i in ids.split(",") if i.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be a comma-separated list of user IDs"
+        )
+    
+    db = get_db()
+    statuses = await resolve_today_status(db, date.today().isoformat(), user_ids)
+    
+    return [
+        {"user_id": user_id, **statuses.get(user_id, {"status": "absent"})}
+        for user_id in user_ids
+    ]
+
+
+def profile_etag(user_id: int, can_view_salary: bool, user: dict, employee: dict, salary: Optional[dict]) -> str:
+    """ETag for a profile from the updated_at of the rows it is built from"""
+    return make_etag(
+        "employee", user_id, can_view_salary,
+        user.get("updated_at"), employee.get("updated_at"),
+        (salary or {}).get("updated_at") if can_view_salary else None
+    )
+
+
 @router.get("/{user_id}")
-async def get_employee(user_id: int, current_user: dict = Depends(get_current_user)):
+async def get_employee(user_id: int, http_request: Request, current_user: dict = Depends(get_current_user)):
     """Get employee details. Employees can only view their own profile."""
     db = get_db()
     
@@ -139,33 +358,31 @@ async def get_employee(user_id: int, current_user: dict = Depends(get_current_us
             detail="You can only view your own profile"
         )
     
-    # Get user
-    user_result = db.table("users").select("*").eq("user_id", user_id).execute()
-    if not user_result.data:
-        raise HTTPException(status_code=404, detail="User not found")
+    can_view_salary = current_user["role"] in ["admin", "hr"] or current_user["user_id"] == user_id
     
-    user = user_result.data[0]
+    # User, employee and salary rows, from the profile cache or one embedded select
+    profile = cached_profile(user_id)
+    from_cache = profile is not None
+    if not from_cache:
+        profile = await fetch_profile(db, user_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="User not found")
     
-    # Get employee details
-    emp_result = db.table("employees").select("*").eq("user_id", user_id).execute()
-    employee = emp_result.data[0] if emp_result.data else {}
+    user, employee = profile["user"], profile["employee"]
+    salary = profile["salary"] if can_view_salary else None
     
-    # Get salary structure if admin/hr or self
-    salary = None
-    if current_user["role"] in ["admin", "hr"] or current_user["user_id"] == user_id:
-        salary_result = db.table("salary_structure").select("*").eq(
-            "employee_id", employee.get("employee_id")
-        ).execute()
-        salary = salary_result.data[0] if salary_result.data else None
+    etag = profile_etag(user_id, can_view_salary, user, employee, salary)
+    if etag_matches(http_request, etag):
+        return not_modified("GET /employees/{user_id}", etag, query_skipped=from_cache)
     
-    return {
+    return conditional_response(http_request, "GET /employees/{user_id}", {
         "user_id": user["user_id"],
         "email": user["email"],
         "employee_id": user["employee_id"],
         "role": user["role"],
         **employee,
         "salary_structure": salary
-    }
+    }, etag=etag)
 
 
 @router.put("/{user_id}")
@@ -194,7 +411,8 @@ async def update_employee(user_id: int, request: UpdateEmployeeRequest, current_
     
     if update_data:
         update_data["updated_at"] = datetime.now().isoformat()
-        db.table("employees").update(update_data).eq("user_id", user_id).execute()
+        await execute(db.table("employees").update(update_data).eq("user_id", user_id))
+        await invalidate_profile(user_id)
     
     return {"message": "Profile updated successfully"}
 
@@ -203,25 +421,5 @@ async def update_employee(user_id: int, request: UpdateEmployeeRequest, current_
 async def get_employee_status(user_id: int, current_user: dict = Depends(get_current_user)):
     """Get employee's today status (present/absent/leave)"""
     db = get_db()
-    today = date.today().isoformat()
-    
-    # Check attendance
-    attendance = db.table("attendance").select("*").eq(
-        "user_id", user_id
-    ).eq("attendance_date", today).execute()
-    
-    # Check leave
-    leave = db.table("leave_requests").select("*").eq(
-        "user_id", user_id
-    ).eq("status", "approved").lte("start_date", today).gte("end_date", today).execute()
-    
-    if leave.data:
-        return {"status": "leave", "leave_type": leave.data[0].get("leave_type")}
-    elif attendance.data and attendance.data[0].get("check_in"):
-        return {
-            "status": "present",
-            "check_in": attendance.data[0]["check_in"],
-            "check_out": attendance.data[0].get("check_out")
-        }
-    else:
-        return {"status": "absent"}
+    statuses = await resolve_today_status(db, date.today().isoformat(), [user_id])
+    return statuses.get(user_id, {"status": "absent"})
@@ -1,8 +1,13 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request
 from typing import List, Optional
 from models.schemas import CreateLeaveRequest, LeaveResponse
-from utils.db import get_db
+from utils.db import get_db, execute
 from utils.auth_utils import get_current_user, require_admin_or_hr
+from utils.pagination import decode_cursor, after_pair, paginate
+from utils.broadcaster import attendance_events
+from utils.etag import conditional_response
+from utils.workdays import get_calendar
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from datetime import datetime, date
 
 router = APIRouter()
@@ -26,14 +31,20 @@ async def apply_leave(request: CreateLeaveRequest, current_user: dict = Depends(
             detail="Cannot apply for leave in the past"
         )
     
-    # Calculate days
-    days = (request.end_date - request.start_date).days + 1
+    # Count working days only (weekends and company holidays are not leave)
+    calendar = await get_calendar(db)
+    days = calendar.working_days(request.start_date, request.end_date)
+    if days == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Leave range contains no working days"
+        )
     
     # Determine if paid based on leave type
     is_paid = request.leave_type.value != "unpaid"
     
     # Create leave request
-    result = db.table("leave_requests").insert({
+    result = await execute(db.table("leave_requests").insert({
         "user_id": current_user["user_id"],
         "leave_type": request.leave_type.value,
         "start_date": request.start_date.isoformat(),
@@ -42,7 +53,7 @@ async def apply_leave(request: CreateLeaveRequest, current_user: dict = Depends(
         "is_paid": is_paid,
         "description": request.description,
         "status": "pending"
-    }).execute()
+    }))
     
     if not result.data:
         raise HTTPException(
@@ -66,40 +77,62 @@ async def get_leaves(
     if status_filter:
         query = query.eq("status", status_filter)
     
-    result = query.order("created_at", desc=True).execute()
+    result = await execute(query.order("created_at", desc=True))
     
     return result.data
 
 
-@router.get("/pending")
-async def get_pending_leaves(current_user: dict = Depends(require_admin_or_hr)):
-    """Get all pending leave requests (Admin/HR only)"""
-    db = get_db()
-    
-    result = db.table("leave_requests").select(
-        "*, users(employee_id, employees(first_name, last_name))"
-    ).eq("status", "pending").order("created_at", desc=True).execute()
-    
-    leaves = []
-    for leave in result.data:
+def leave_page_key(leave: dict) -> dict:
+    """Keyset position of a leave request in newest-first order"""
+    return {"created_at": leave["created_at"], "leave_id": leave["leave_id"]}
+
+
+def with_employee_names(leaves: List[dict]) -> List[dict]:
+    """Flatten the embedded users/employees relation into name fields"""
+    merged = []
+    for leave in leaves:
         user = leave.get("users", {}) or {}
         emp = user.get("employees", {}) or {}
         
-        leaves.append({
+        merged.append({
             **leave,
             "employee_id": user.get("employee_id"),
             "employee_name": f"{emp.get('first_name', '')} {emp.get('last_name', '')}".strip()
         })
     
-    return leaves
+    return merged
+
+
+@router.get("/pending")
+async def get_pending_leaves(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_user: dict = Depends(require_admin_or_hr)
+):
+    """Get pending leave requests, newest first (Admin/HR only)"""
+    db = get_db()
+    
+    query = db.table("leave_requests").select(
+        "*, users(employee_id, employees(first_name, last_name))"
+    ).eq("status", "pending")
+    query = after_pair(query, decode_cursor(cursor), "created_at", "leave_id")
+    
+    result = await execute(query.order("created_at", desc=True).order("leave_id", desc=True).limit(limit + 1))
+    
+    page = paginate(result.data, limit, leave_page_key)
+    page["items"] = with_employee_names(page["items"])
+    return page
 
 
 @router.get("/all")
 async def get_all_leaves(
+    http_request: Request,
     status_filter: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     current_user: dict = Depends(require_admin_or_hr)
 ):
-    """Get all leave requests (Admin/HR only)"""
+    """Get leave requests, newest first (Admin/HR only)"""
     db = get_db()
     
     query = db.table("leave_requests").select(
@@ -108,21 +141,13 @@ async def get_all_leaves(
     
     if status_filter:
         query = query.eq("status", status_filter)
+    query = after_pair(query, decode_cursor(cursor), "created_at", "leave_id")
     
-    result = query.order("created_at", desc=True).execute()
+    result = await execute(query.order("created_at", desc=True).order("leave_id", desc=True).limit(limit + 1))
     
-    leaves = []
-    for leave in result.data:
-        user = leave.get("users", {}) or {}
-        emp = user.get("employees", {}) or {}
-        
-        leaves.append({
-            **leave,
-            "employee_id": user.get("employee_id"),
-            "employee_name": f"{emp.get('first_name', '')} {emp.get('last_name', '')}".strip()
-        })
-    
-    return leaves
+    page = paginate(result.data, limit, leave_page_key)
+    page["items"] = with_employee_names(page["items"])
+    return conditional_response(http_request, "GET /leaves/all", page)
 
 
 @router.put("/{leave_id}/approve")
@@ -131,7 +156,7 @@ async def approve_leave(leave_id: int, current_user: dict = Depends(require_admi
     db = get_db()
     
     # Check if leave exists and is pending
-    leave = db.table("leave_requests").select("*").eq("leave_id", leave_id).execute()
+    leave = await execute(db.table("leave_requests").select("*").eq("leave_id", leave_id))
     
     if not leave.data:
         raise HTTPException(status_code=404, detail="Leave request not found")
@@ -143,11 +168,19 @@ async def approve_leave(leave_id: int, current_user: dict = Depends(require_admi
         )
     
     # Update status
-    db.table("leave_requests").update({
+    await execute(db.table("leave_requests").update({
         "status": "approved",
         "approver_id": current_user["user_id"],
         "updated_at": datetime.now().isoformat()
-    }).eq("leave_id", leave_id).execute()
+    }).eq("leave_id", leave_id))
+    
+    attendance_events.publish("leave_approved", {
+        "leave_id": leave_id,
+        "user_id": leave.data[0]["user_id"],
+        "leave_type": leave.data[0].get("leave_type"),
+        "start_date": leave.data[0]["start_date"],
+        "end_date": leave.data[0]["end_date"]
+    })
     
     return {"message": "Leave request approved"}
 
@@ -158,7 +191,7 @@ async def reject_leave(leave_id: int, current_user: dict = Depends(require_admin
     db = get_db()
     
     # Check if leave exists and is pending
-    leave = db.table("leave_requests").select("*").eq("leave_id", leave_id).execute()
+    leave = await execute(db.table("leave_requests").select("*").eq("leave_id", leave_id))
     
     if not leave.data:
         raise HTTPException(status_code=404, detail="Leave request not found")
@@ -170,10 +203,18 @@ async def reject_leave(leave_id: int, current_user: dict = Depends(require_admin
         )
     
     # Update status
-    db.table("leave_requests").update({
+    await execute(db.table("leave_requests").update({
         "status": "rejected",
         "approver_id": current_user["user_id"],
         "updated_at": datetime.now().isoformat()
-    }).eq("leave_id", leave_id).execute()
+    }).eq("leave_id", leave_id))
+    
+    attendance_events.publish("leave_rejected", {
+        "leave_id": leave_id,
+        "user_id": leave.data[0]["user_id"],
+        "leave_type": leave.data[0].get("leave_type"),
+        "start_date": leave.data[0]["start_date"],
+        "end_date": leave.data[0]["end_date"]
+    })
     
     return {"message": "Leave request rejected"}
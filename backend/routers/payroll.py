@@ -1,10 +1,35 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Request
+from typing import Dict
 from models.schemas import SalaryStructure, UpdateSalaryRequest
-from utils.db import get_db
+from utils.db import get_db, execute
 from utils.auth_utils import get_current_user, require_admin_or_hr
-from datetime import datetime
+from utils.etag import conditional_response, make_etag, etag_matches, not_modified
+from utils.profile_cache import invalidate_profile
+from utils.query_recorder import spawn
+from config import PAYROLL_BATCH_SIZE, PAYROLL_RUN_STALE_SECONDS
+from datetime import datetime, timedelta
+import asyncio
+import logging
+import re
+import numpy as np
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Runs started by this worker; progress is kept in the payroll_runs table so every worker sees it
+_payroll_tasks: Dict[str, asyncio.Task] = {}
+
+
+# Percentages and professional tax used when a structure doesn't set them
+SALARY_DEFAULTS = {
+    "basic_percent": 50.0,
+    "hra_percent": 50.0,
+    "da_percent": 4.17,
+    "bonus_percent": 8.33,
+    "lta_percent": 8.33,
+    "pf_percent": 12.0,
+    "prof_tax": 200.0,
+}
 
 
 def calculate_salary_components(monthly_wage: float, structure: dict) -> dict:
@@ -56,13 +81,94 @@ def calculate_salary_components(monthly_wage: float, structure: dict) -> dict:
     }
 
 
+def _round2(values: np.ndarray) -> np.ndarray:
+    """
+    Round to 2 decimals exactly like Python's round(x, 2).
+    np.rint(x * 100) / 100 agrees with round() except where x * 100 lands
+    within float error of a .5 tie; those few elements use round() itself.
+    """
+    scaled = values * 100
+    rounded = np.rint(scaled) / 100
+    distance_to_tie = np.abs(scaled - np.floor(scaled) - 0.5)
+    for i in np.flatnonzero(distance_to_tie <= np.abs(scaled) * 1e-12 + 1e-9):
+        rounded.flat[i] = round(float(values.flat[i]), 2)
+    return rounded
+
+
+def calculate_salary_components_batch(
+    monthly_wage,
+    basic_percent=50.0,
+    hra_percent=50.0,
+    da_percent=4.17,
+    bonus_percent=8.33,
+    lta_percent=8.33,
+    pf_percent=12.0,
+    prof_tax=200.0
+) -> Dict[str, np.ndarray]:
+    """
+    Column-wise calculate_salary_components for many employees at once.
+    Takes arrays (or scalars, broadcast) and returns one float64 array per
+    component. Operations run in the same order as the scalar version, so
+    results are bit-identical to it, rounding included.
+    """
+    monthly_wage = np.asarray(monthly_wage, dtype=np.float64)
+    columns = np.broadcast_arrays(
+        monthly_wage, *(np.asarray(v, dtype=np.float64) for v in (
+            basic_percent, hra_percent, da_percent, bonus_percent, lta_percent, pf_percent, prof_tax
+        ))
+    )
+    monthly_wage, basic_percent, hra_percent, da_percent, bonus_percent, lta_percent, pf_percent, prof_tax = (
+        np.array(c) for c in columns
+    )
+    
+    # Calculate amounts
+    basic = monthly_wage * (basic_percent / 100)
+    hra = basic * (hra_percent / 100)
+    da = basic * (da_percent / 100)
+    bonus = basic * (bonus_percent / 100)
+    lta = basic * (lta_percent / 100)
+    
+    # Fixed allowance = wage - all calculated components
+    fixed_allowance = monthly_wage - ((((basic + hra) + da) + bonus) + lta)
+    
+    # Deductions
+    pf_employee = basic * (pf_percent / 100)
+    pf_employer = basic * (pf_percent / 100)
+    
+    # Net salary
+    net_salary = monthly_wage - pf_employee - prof_tax
+    
+    return {
+        "monthly_wage": monthly_wage,
+        "yearly_wage": monthly_wage * 12,
+        "basic_percent": basic_percent,
+        "hra_percent": hra_percent,
+        "da_percent": da_percent,
+        "bonus_percent": bonus_percent,
+        "lta_percent": lta_percent,
+        "pf_percent": pf_percent,
+        "prof_tax": prof_tax,
+        "basic_amount": _round2(basic),
+        "hra_amount": _round2(hra),
+        "da_amount": _round2(da),
+        "bonus_amount": _round2(bonus),
+        "lta_amount": _round2(lta),
+        "fixed_allowance": _round2(np.maximum(fixed_allowance, 0.0)),
+        "pf_employee": _round2(pf_employee),
+        "pf_employer": _round2(pf_employer),
+        "net_salary": _round2(net_salary)
+    }
+
+
 @router.get("/{employee_id}")
-async def get_salary(employee_id: int, current_user: dict = Depends(get_current_user)):
+async def get_salary(employee_id: int, http_request: Request, current_user: dict = Depends(get_current_user)):
     """Get employee's salary structure"""
     db = get_db()
     
-    # Get user_id for the employee
-    emp = db.table("employees").select("user_id, base_salary").eq("employee_id", employee_id).execute()
+    # Get user_id for the employee, with the salary structure embedded
+    emp = await execute(db.table("employees").select(
+        "user_id, base_salary, updated_at, salary_structure(*)"
+    ).eq("employee_id", employee_id))
     
     if not emp.data:
         raise HTTPException(status_code=404, detail="Employee not found")
@@ -76,18 +182,25 @@ async def get_salary(employee_id: int, current_user: dict = Depends(get_current_
             detail="You can only view your own salary"
         )
     
-    # Get salary structure
-    structure = db.table("salary_structure").select("*").eq("employee_id", employee_id).execute()
+    structure = emp.data[0].get("salary_structure")
+    
+    # Both rows carry updated_at, which update_salary bumps
+    etag = make_etag("salary", employee_id, emp.data[0].get("updated_at"), (structure or {}).get("updated_at"))
+    if etag_matches(http_request, etag):
+        return not_modified("GET /salary/{employee_id}", etag)
     
-    if not structure.data:
+    if not structure:
         # Return default structure based on base_salary
         base_salary = emp.data[0].get("base_salary") or 0
-        return SalaryStructure(**calculate_salary_components(base_salary, {}))
+        return conditional_response(
+            http_request, "GET /salary/{employee_id}",
+            SalaryStructure(**calculate_salary_components(base_salary, {})), etag=etag
+        )
     
-    return SalaryStructure(**calculate_salary_components(
-        structure.data[0]["monthly_wage"],
-        structure.data[0]
-    ))
+    return conditional_response(
+        http_request, "GET /salary/{employee_id}",
+        SalaryStructure(**calculate_salary_components(structure["monthly_wage"], structure)), etag=etag
+    )
 
 
 @router.put("/{employee_id}")
@@ -96,7 +209,7 @@ async def update_salary(employee_id: int, request: UpdateSalaryRequest, current_
     db = get_db()
     
     # Check if employee exists
-    emp = db.table("employees").select("*").eq("employee_id", employee_id).execute()
+    emp = await execute(db.table("employees").select("*").eq("employee_id", employee_id))
     
     if not emp.data:
         raise HTTPException(status_code=404, detail="Employee not found")
@@ -116,23 +229,176 @@ async def update_salary(employee_id: int, request: UpdateSalaryRequest, current_
     }
     
     # Check if structure exists
-    existing = db.table("salary_structure").select("id").eq("employee_id", employee_id).execute()
+    existing = await execute(db.table("salary_structure").select("id").eq("employee_id", employee_id))
     
     if existing.data:
         # Update existing
-        db.table("salary_structure").update(salary_data).eq("employee_id", employee_id).execute()
+        await execute(db.table("salary_structure").update(salary_data).eq("employee_id", employee_id))
     else:
         # Insert new
-        db.table("salary_structure").insert(salary_data).execute()
+        await execute(db.table("salary_structure").insert(salary_data))
     
     # Also update base_salary in employees table
-    db.table("employees").update({
+    await execute(db.table("employees").update({
         "base_salary": request.monthly_wage,
         "updated_at": datetime.now().isoformat()
-    }).eq("employee_id", employee_id).execute()
+    }).eq("employee_id", employee_id))
+    await invalidate_profile(emp.data[0]["user_id"])
     
     # Return calculated structure
     return SalaryStructure(**calculate_salary_components(
         request.monthly_wage,
         request.model_dump()
     ))
+
+
+async def run_payroll(pay_period: str, run: dict):
+    """
+    Compute payroll for every salary structure and upsert it for the period.
+    Reads salary_structure one page at a time (keyset on id) and writes each
+    page as one batch, so memory stays bounded by PAYROLL_BATCH_SIZE.
+    Rows already marked paid/processed for the period are left untouched;
+    they are looked up per page, for that page's users.
+    """
+    db = get_db()
+    
+    try:
+        total = await execute(db.table("salary_structure").select("id", count="exact").limit(1))
+        run["total"] = total.count or 0
+        await save_payroll_run(run)
+        
+        last_id = 0
+        while True:
+            page = await execute(db.table("salary_structure").select(
+                "*, employees(user_id)"
+            ).gt("id", last_id).order("id").limit(PAYROLL_BATCH_SIZE))
+            if not page.data:
+                break
+            last_id = page.data[-1]["id"]
+            
+            # Settled rows among this page only, so the lookup is never capped by max-rows
+            user_ids = [(structure.get("employees", {}) or {}).get("user_id") for structure in page.data]
+            settled = await execute(db.table("payroll").select("user_id").eq(
+                "pay_period", pay_period
+            ).neq("status", "pending").in_("user_id", [u for u in user_ids if u is not None]))
+            settled_users = {p["user_id"] for p in settled.data}
+            
+            eligible = []
+            for structure in page.data:
+                emp = structure.get("employees", {}) or {}
+                if emp.get("user_id") is None or emp["user_id"] in settled_users:
+                    run["skipped"] += 1
+                    continue
+                eligible.append((emp["user_id"], structure))
+            
+            components = calculate_salary_components_batch(
+                [structure["monthly_wage"] for _, structure in eligible],
+                **{
+                    # A NULL column falls back like a missing one, instead of turning into NaN
+                    field: [default if structure.get(field) is None else structure[field] for _, structure in eligible]
+                    for field, default in SALARY_DEFAULTS.items()
+                }
+            )
+            deductions = components["pf_employee"] + components["prof_tax"]
+            
+            rows = []
+            for i, (user_id, _) in enumerate(eligible):
+                monthly_wage = float(components["monthly_wage"][i])
+                rows.append({
+                    "user_id": user_id,
+                    "pay_period": pay_period,
+                    "base_salary": monthly_wage,
+                    "gross_salary": monthly_wage,
+                    "deductions": round(float(deductions[i]), 2),
+                    "net_salary": float(components["net_salary"][i]),
+                    "status": "pending",
+                    "updated_at": datetime.now().isoformat()
+                })
+            
+            if rows:
+                await execute(db.table("payroll").upsert(rows, on_conflict="user_id,pay_period"))
+            run["written"] += len(rows)
+            run["processed"] += len(page.data)
+            await save_payroll_run(run)
+        
+        run["status"] = "completed"
+    except Exception as e:
+        run["status"] = "failed"
+        run["error"] = str(e)
+    finally:
+        run["finished_at"] = datetime.now().isoformat()
+        try:
+            await save_payroll_run(run)
+        except Exception:
+            # The row stays "running" until it goes stale, then the period can be run again
+            logger.exception("Could not save the outcome of the %s payroll run", pay_period)
+        _payroll_tasks.pop(pay_period, None)
+
+
+async def save_payroll_run(run: dict) -> None:
+    """Upsert a run's progress; updated_at doubles as the running worker's heartbeat"""
+    await execute(get_db().table("payroll_runs").upsert(
+        {**run, "updated_at": datetime.now().isoformat()},
+        on_conflict="pay_period"
+    ))
+
+
+async def load_payroll_run(pay_period: str):
+    """The latest run for a period as stored, or None"""
+    result = await execute(get_db().table("payroll_runs").select(
+        "pay_period, status, total, processed, written, skipped, error, started_by, started_at, finished_at, "
+        "updated_at"
+    ).eq("pay_period", pay_period))
+    return result.data[0] if result.data else None
+
+
+def is_stale(run: dict) -> bool:
+    """Whether a run still marked running stopped saving progress (its worker is gone)"""
+    updated_at = datetime.fromisoformat(str(run["updated_at"]))
+    return datetime.now() - updated_at > timedelta(seconds=PAYROLL_RUN_STALE_SECONDS)
+
+
+@router.post("/runs/{pay_period}", status_code=status.HTTP_202_ACCEPTED)
+async def start_payroll_run(pay_period: str, current_user: dict = Depends(require_admin_or_hr)):
+    """
+    Start a company-wide payroll run for a period like "2025-12" (Admin/HR only).
+    Re-running a period recomputes its pending rows; if a run for the period is
+    already in progress on any worker, its progress is returned instead of
+    starting another. A run that stopped reporting progress (its worker died)
+    is restarted; writes are upserts, so nothing is paid twice.
+    """
+    if not re.fullmatch(r"\d{4}-(0[1-9]|1[0-2])", pay_period):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="pay_period must look like YYYY-MM"
+        )
+    
+    existing = await load_payroll_run(pay_period)
+    if existing and existing["status"] == "running" and (pay_period in _payroll_tasks or not is_stale(existing)):
+        return existing
+    
+    run = {
+        "pay_period": pay_period,
+        "status": "running",
+        "total": None,
+        "processed": 0,
+        "written": 0,
+        "skipped": 0,
+        "error": None,
+        "started_by": current_user["user_id"],
+        "started_at": datetime.now().isoformat(),
+        "finished_at": None
+    }
+    await save_payroll_run(run)
+    _payroll_tasks[pay_period] = spawn(run_payroll(pay_period, run))
+    
+    return run
+
+
+@router.get("/runs/{pay_period}")
+async def get_payroll_run(pay_period: str, current_user: dict = Depends(require_admin_or_hr)):
+    """Get progress of the latest payroll run for a period (Admin/HR only)"""
+    run = await load_payroll_run(pay_period)
+    if not run:
+        raise HTTPException(status_code=404, detail="No payroll run for this period")
+    return run
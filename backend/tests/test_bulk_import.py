@@ -0,0 +1,83 @@
+import asyncio
+import json
+
+from fastapi import HTTPException
+
+import utils.auth_utils
+from benchmarks.endpoints import token_for
+
+
+def ndjson(count: int, start: int = 0) -> bytes:
+    return "".join(json.dumps({
+        "first_name": f"New{i}", "last_name": "Hire", "email": f"new{i}@bench.in", "join_date": "2025-06-01"
+    }) + "\n" for i in range(start, start + count)).encode()
+
+
+def post_import(client, company, body: bytes):
+    return client.post("/employees/bulk?format=ndjson", content=body, headers=token_for(company["users"][0]))
+
+
+async def fake_hashes(passwords):
+    return [f"hash:{p}" for p in passwords]
+
+
+def test_busy_password_pool_fails_only_its_batch(client, company, monkeypatch):
+    calls = []
+
+    async def hashes(passwords):
+        calls.append(len(passwords))
+        if len(calls) == 2:
+            raise HTTPException(status_code=503, detail="Server busy, please retry")
+        return await fake_hashes(passwords)
+
+    # Batches of 3 stand in for batches of 500; each one costs the same few queries
+    monkeypatch.setattr("routers.employees.BULK_IMPORT_BATCH_SIZE", 3)
+    monkeypatch.setattr("utils.query_recorder.QUERY_BUDGET", 20)
+    monkeypatch.setattr("routers.employees.hash_passwords_async", hashes)
+    response = post_import(client, company, ndjson(8))
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == ["created"] * 3 + ["error"] * 3 + ["created"] * 2
+    assert all(r["retryable"] for r in results[3:6])
+
+
+def test_failed_employee_insert_leaves_no_users(client, company, store, monkeypatch):
+    monkeypatch.setattr("routers.employees.hash_passwords_async", fake_hashes)
+    write = store.write
+
+    def failing_write(table, *args):
+        if table == "employees":
+            raise RuntimeError("employees insert failed")
+        return write(table, *args)
+
+    monkeypatch.setattr(store, "write", failing_write)
+    users = len(store.tables["users"])
+    failed = post_import(client, company, ndjson(3)).json()
+    assert failed["failed"] == 3
+    assert len(store.tables["users"]) == users
+
+    monkeypatch.setattr(store, "write", write)
+    assert post_import(client, company, ndjson(3)).json()["created"] == 3
+
+
+def test_bulk_hashing_leaves_workers_for_logins(monkeypatch):
+    running, peak = 0, 0
+
+    async def job(fn, passwords):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return [f"hash:{p}" for p in passwords]
+
+    monkeypatch.setattr(utils.auth_utils, "_run_password_job", job)
+    monkeypatch.setattr(utils.auth_utils, "_bulk_slots", asyncio.Semaphore(2))
+
+    async def two_imports():
+        return await asyncio.gather(*(utils.auth_utils.hash_passwords_async([str(i)] * 100) for i in range(2)))
+
+    first, second = asyncio.run(two_imports())
+    assert first == ["hash:0"] * 100 and second == ["hash:1"] * 100
+    assert peak == 2
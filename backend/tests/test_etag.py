@@ -0,0 +1,18 @@
+from benchmarks.endpoints import token_for
+from utils.etag import etag_stats
+
+ROUTE = "GET /employees/{user_id}"
+
+
+def test_cached_profile_304_skips_the_query(client, company, query_budget):
+    etag_stats.pop(ROUTE, None)
+    user = company["users"][5]
+    headers = token_for(user)
+    url = f"/employees/{user['user_id']}"
+
+    first = client.get(url, headers=headers)
+    assert first.status_code == 200
+    with query_budget(0):
+        again = client.get(url, headers={**headers, "If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+    assert etag_stats[ROUTE] == {"requests": 2, "not_modified": 1, "query_skipped": 1}
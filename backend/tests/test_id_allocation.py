@@ -0,0 +1,37 @@
+import asyncio
+import random
+
+import pytest
+
+from config import DATABASE_URL
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="needs DATABASE_URL pointing at a Postgres database")
+
+
+def test_concurrent_allocations_never_overlap():
+    asyncpg = pytest.importorskip("asyncpg")
+    from benchmarks.id_allocation import COMPANY, YEAR, install
+
+    prefix = f"{COMPANY}PT{YEAR}"
+    rng = random.Random(7)
+    counts = [rng.randint(1, 20) for _ in range(200)]
+
+    async def scenario():
+        conn = await asyncpg.connect(DATABASE_URL)
+        try:
+            # Also clears this prefix's sequence row, so serials start at 1
+            await install(conn)
+        finally:
+            await conn.close()
+        pool = await asyncpg.create_pool(DATABASE_URL, min_size=1, max_size=20)
+        try:
+            return await asyncio.gather(*(
+                pool.fetchval("SELECT allocate_employee_serials($1, $2)", prefix, count) for count in counts
+            ))
+        finally:
+            await pool.close()
+
+    firsts = asyncio.run(scenario())
+    serials = sorted(s for first, count in zip(firsts, counts) for s in range(first, first + count))
+    assert len(serials) == len(set(serials)), "two callers were handed the same serial"
+    assert serials == list(range(1, sum(counts) + 1))
@@ -0,0 +1,23 @@
+import asyncio
+from datetime import date
+
+from routers.attendance import build_board_snapshot
+from routers.employees import resolve_today_status
+from utils.db import get_db
+
+
+def test_board_snapshot_queries_dont_grow_with_headcount(company, monkeypatch, query_budget):
+    # 100 employees in pages of 7: per-page status lookups would repeat one shape 15 times
+    monkeypatch.setattr("routers.attendance.EXPORT_PAGE_SIZE", 7)
+    today = date.today().isoformat()
+
+    with query_budget(5):
+        board = asyncio.run(build_board_snapshot(today))
+
+    staff = [u["user_id"] for u in company["users"] if u["role"] != "admin"]
+    assert [e["user_id"] for e in board] == staff
+    expected = asyncio.run(resolve_today_status(get_db(), today, staff))
+    assert {e["user_id"]: e["status"] for e in board} == {
+        user_id: expected.get(user_id, {"status": "absent"})["status"] for user_id in staff
+    }
+    assert {e["status"] for e in board} >= {"present", "absent"}
@@ -0,0 +1,20 @@
+from benchmarks.endpoints import token_for
+
+
+def sample(text, line_start):
+    return float(next(line for line in text.splitlines() if line.startswith(line_start)).rsplit(" ", 1)[1])
+
+
+def test_cache_hits_and_misses_are_counters(client, company):
+    user = company["users"][3]
+    before = client.get("/metrics").text
+    assert "# TYPE dayflow_cache_hits_total counter" in before
+    assert "# TYPE dayflow_cache_misses_total counter" in before
+
+    for _ in range(3):
+        assert client.get(f"/employees/{user['user_id']}", headers=token_for(user)).status_code == 200
+    after = client.get("/metrics").text
+
+    hits, misses = 'dayflow_cache_hits_total{cache="profile"}', 'dayflow_cache_misses_total{cache="profile"}'
+    assert sample(after, misses) - sample(before, misses) == 1
+    assert sample(after, hits) - sample(before, hits) == 2
@@ -0,0 +1,40 @@
+import pytest
+
+from benchmarks.endpoints import token_for
+from utils.pagination import encode_cursor
+
+
+@pytest.mark.parametrize("url, key", [
+    ("/employees", {"user_id": "abc"}),
+    ("/employees", {"user_id": True}),
+    ("/employees", {"user_id": [1]}),
+    ("/attendance", {"attendance_date": 20250101.5}),
+    ("/attendance", {"attendance_date": "not a date"}),
+    ("/leaves/all", {"created_at": "2025-01-01T09:00:00", "leave_id": "7"}),
+    ("/leaves/all", {"created_at": "yesterday", "leave_id": 7}),
+    ("/leaves/all", {"created_at": '2025-01-01",leave_id.gt.0', "leave_id": 7}),
+    ("/leaves/all", {"created_at": "2025-01-01T09:00:00\\", "leave_id": 7}),
+    ("/leaves/all", {"created_at": "2025-01-01T09:00:00),or(leave_id.gt.0", "leave_id": 7}),
+])
+def test_malformed_cursors_are_rejected(client, company, url, key):
+    response = client.get(url, params={"cursor": encode_cursor(key)}, headers=token_for(company["users"][0]))
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_cursors_from_a_page_continue_it(client, company):
+    headers = token_for(company["users"][0])
+    first = client.get("/leaves/all", params={"limit": 5}, headers=headers).json()
+    second = client.get("/leaves/all", params={"limit": 5, "cursor": first["next_cursor"]}, headers=headers)
+    assert second.status_code == 200
+    ids = [l["leave_id"] for l in first["items"] + second.json()["items"]]
+    assert len(ids) == len(set(ids)) == 10
+
+
+def test_export_pages_through_every_row(client, company, store, monkeypatch):
+    monkeypatch.setattr("routers.attendance.EXPORT_PAGE_SIZE", 7)
+    days = sorted({str(a["attendance_date"]) for a in store.tables["attendance"]})
+    response = client.get("/attendance/export", params={"start": days[0], "end": days[-1], "format": "ndjson"},
+                          headers=token_for(company["users"][0]))
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == len(store.tables["attendance"]) > 7
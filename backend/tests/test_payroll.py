@@ -0,0 +1,63 @@
+import time
+
+from benchmarks.endpoints import token_for
+
+
+def run_payroll(client, company, pay_period):
+    headers = token_for(company["users"][0])
+    run = client.post(f"/salary/runs/{pay_period}", headers=headers).json()
+    deadline = time.monotonic() + 10
+    while run["status"] == "running" and time.monotonic() < deadline:
+        time.sleep(0.05)
+        run = client.get(f"/salary/runs/{pay_period}", headers=headers).json()
+    return run
+
+
+def test_rerun_leaves_settled_rows_past_max_rows(client, company, store, monkeypatch):
+    monkeypatch.setattr("routers.payroll.PAYROLL_BATCH_SIZE", 10)
+    assert run_payroll(client, company, "2025-12")["written"] == len(company["users"])
+
+    for row in store.tables["payroll"]:
+        row["status"] = "paid"
+    # Fewer rows per response than there are settled employees
+    store.max_rows = 20
+    run = run_payroll(client, company, "2025-12")
+
+    assert run["status"] == "completed", run["error"]
+    assert run["written"] == 0
+    assert run["skipped"] == len(company["users"])
+    assert {row["status"] for row in store.tables["payroll"]} == {"paid"}
+
+
+def test_null_structure_columns_use_the_defaults(client, company, store):
+    from routers.payroll import calculate_salary_components
+
+    structure = store.tables["salary_structure"][0]
+    structure.update(hra_percent=None, pf_percent=None, prof_tax=None)
+    user_id = next(e["user_id"] for e in store.tables["employees"] if e["employee_id"] == structure["employee_id"])
+
+    assert run_payroll(client, company, "2025-11")["status"] == "completed"
+
+    row = next(r for r in store.tables["payroll"] if r["user_id"] == user_id)
+    assert row["net_salary"] == calculate_salary_components(structure["monthly_wage"], {})["net_salary"]
+
+
+def test_run_progress_is_shared_through_the_database(client, company, store):
+    from datetime import datetime, timedelta
+
+    run = run_payroll(client, company, "2025-10")
+    assert run["status"] == "completed"
+    # Any worker answers from the payroll_runs row, not from the one that ran it
+    [stored] = store.tables["payroll_runs"]
+    assert {k: stored[k] for k in ("status", "written", "processed")} == {
+        "status": "completed", "written": len(company["users"]), "processed": len(company["users"])
+    }
+
+    headers = token_for(company["users"][0])
+    # Another worker's run in progress is reported, not started again
+    stored.update(status="running", processed=7, updated_at=datetime.now().isoformat())
+    assert client.post("/salary/runs/2025-10", headers=headers).json()["processed"] == 7
+    # One whose worker stopped saving progress is restarted
+    stored["updated_at"] = (datetime.now() - timedelta(hours=1)).isoformat()
+    assert run_payroll(client, company, "2025-10")["status"] == "completed"
+    assert store.tables["payroll_runs"][0]["processed"] == len(company["users"])
@@ -0,0 +1,79 @@
+import asyncio
+from datetime import date, datetime
+from decimal import Decimal
+
+from utils.postgres import PostgresClient
+
+
+class Recorder(PostgresClient):
+    """Compiles queries like the real client but records them instead of running them"""
+
+    def __init__(self):
+        super().__init__("postgresql://unused")
+        self.catalog = {
+            "attendance": {"user_id": "int8", "attendance_date": "date", "check_in": "timestamp"},
+            "employees": {"skills": "jsonb", "base_salary": "numeric"},
+            "rpc/allocate_employee_serials": {"p_prefix": "text", "p_count": "int4"},
+        }
+        self.statements = []
+
+    async def fetch(self, sql, params):
+        self.statements.append((sql, params))
+        return [{"result": 1}]
+
+
+def run(query):
+    asyncio.run(query.execute_async())
+    return query.client.statements[-1]
+
+
+def test_parameters_are_converted_from_the_catalog():
+    db = Recorder()
+    sql, params = run(db.table("attendance").select("*").eq("user_id", "7").gte(
+        "attendance_date", "2025-01-01"
+    ).in_("user_id", ["1", "2"]).or_('check_in.lt."2025-01-01T09:00:00"').limit(5))
+    assert params == [7, date(2025, 1, 1), [1, 2], datetime(2025, 1, 1, 9), 5]
+    assert sql.endswith("LIMIT $5")
+
+    sql, params = run(db.table("employees").update({"skills": ["py"], "base_salary": 1200.5}).eq("unknown", "x"))
+    assert params == ['["py"]', Decimal("1200.5"), "x"]
+
+    sql, params = run(db.rpc("allocate_employee_serials", {"p_prefix": 12, "p_count": "3"}))
+    assert params == ["12", 3]
+
+
+def test_select_chain_compiles_to_one_statement():
+    db = Recorder()
+    sql, params = run(db.table("attendance").select("user_id, check_in, users(email)").eq(
+        "attendance_date", "2025-01-02"
+    ).in_("user_id", [1, 2, 3]).or_(
+        'check_in.lt."2025-01-02T09:00:00",and(check_in.eq."2025-01-02T09:00:00",user_id.gt.7)'
+    ).order("check_in", desc=True).order("user_id").limit(50))
+
+    assert sql == (
+        'SELECT t."user_id", t."check_in", (SELECT jsonb_build_object(\'email\', e1."email") '
+        'FROM "users" e1 WHERE e1."user_id" = t."user_id" LIMIT 1) AS "users" '
+        'FROM "attendance" t WHERE t."attendance_date" = $1 AND t."user_id" = ANY($2) '
+        'AND (t."check_in" < $3 OR (t."check_in" = $4 AND t."user_id" > $5)) '
+        'ORDER BY t."check_in" DESC, t."user_id" LIMIT $6'
+    )
+    assert params == [date(2025, 1, 2), [1, 2, 3], datetime(2025, 1, 2, 9), datetime(2025, 1, 2, 9), 7, 50]
+
+
+def test_upsert_compiles_to_insert_on_conflict():
+    db = Recorder()
+    rows = [
+        {"user_id": 1, "attendance_date": "2025-01-02", "check_in": "2025-01-02T09:00:00"},
+        {"user_id": "2", "attendance_date": "2025-01-02"},
+    ]
+    sql, params = run(db.table("attendance").upsert(rows, on_conflict="user_id,attendance_date"))
+    assert sql == (
+        'INSERT INTO "attendance" AS t ("user_id", "attendance_date", "check_in") '
+        'VALUES ($1, $2, $3), ($4, $5, DEFAULT) '
+        'ON CONFLICT ("user_id", "attendance_date") DO UPDATE SET "check_in" = EXCLUDED."check_in" '
+        'RETURNING t.*'
+    )
+    assert params == [1, date(2025, 1, 2), datetime(2025, 1, 2, 9), 2, date(2025, 1, 2)]
+
+    sql, _ = run(db.table("attendance").upsert(rows, on_conflict="user_id,attendance_date", ignore_duplicates=True))
+    assert 'ON CONFLICT ("user_id", "attendance_date") DO NOTHING RETURNING t.*' in sql
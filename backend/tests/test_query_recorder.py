@@ -0,0 +1,55 @@
+import time
+
+from benchmarks.endpoints import token_for
+from utils.query_recorder import QueryRecorder, is_page
+
+
+def admin(company):
+    return token_for(company["users"][0])
+
+
+def test_keyset_pages_are_not_repeats():
+    recorder = QueryRecorder()
+    for _ in range(5):
+        recorder.add("salary_structure.select(*, employees(user_id)).gt(id).order(id).limit", 0.0)
+        recorder.add("attendance.select(*).or(attendance_date.gt,attendance_date.eq,attendance_id.gt)"
+                     ".order(attendance_date).order(attendance_id).limit", 0.0)
+    assert recorder.problems(budget=1, repeat_limit=1) == []
+
+    for _ in range(2):
+        recorder.add("employees.select(*).eq(user_id)", 0.0)
+    assert recorder.problems(budget=1, repeat_limit=1) == [
+        "2 queries (budget 1)", "2x employees.select(*).eq(user_id) (repeat limit 1)"
+    ]
+    assert not is_page("employees.select(*).gt(salary).order(user_id)")
+
+
+def test_list_employees_within_budget(client, company, query_budget):
+    with query_budget(3) as recorder:
+        response = client.get("/employees", params={"limit": 50}, headers=admin(company))
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 50
+    assert int(response.headers["x-query-count"]) == recorder.count
+
+
+def test_payroll_run_is_not_charged_to_its_request(client, company, monkeypatch):
+    monkeypatch.setattr("routers.payroll.PAYROLL_BATCH_SIZE", 10)
+    response = client.post("/salary/runs/2025-12", headers=admin(company))
+    assert response.status_code == 202
+
+    deadline = time.monotonic() + 10
+    run = response.json()
+    while run["status"] == "running" and time.monotonic() < deadline:
+        time.sleep(0.05)
+        run = client.get("/salary/runs/2025-12", headers=admin(company)).json()
+    assert run["status"] == "completed", run["error"]
+    assert run["written"] == len(company["users"])
+
+
+def test_export_streams_every_page(client, company, monkeypatch):
+    monkeypatch.setattr("routers.attendance.EXPORT_PAGE_SIZE", 5)
+    today = company["attendance"][0]["attendance_date"].isoformat()
+    response = client.get("/attendance/export", params={"start": today, "end": today, "format": "ndjson"},
+                          headers=admin(company))
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == len(company["attendance"])
@@ -0,0 +1,43 @@
+import random
+
+import numpy as np
+import pytest
+
+from benchmarks.salary_batch import PERCENT_FIELDS, random_structures
+from routers.payroll import _round2, calculate_salary_components, calculate_salary_components_batch
+
+# x.xx5 values, most of which sit just off the tie in binary, and exact ties
+TIES = [k + c / 1000 for k in (0, 1, 2, 10, 1234, 99999) for c in range(5, 1000, 10)] + [0.125, 0.375, 2.5, 0.005]
+
+
+def assert_matches_scalar(structures):
+    columns = {"monthly_wage": [wage for wage, _ in structures]}
+    for field in PERCENT_FIELDS + ("prof_tax",):
+        columns[field] = [structure[field] for _, structure in structures]
+    batch = calculate_salary_components_batch(**columns)
+    for i, (wage, structure) in enumerate(structures):
+        for key, value in calculate_salary_components(wage, structure).items():
+            # Bit-for-bit, so a wrong sign of zero or a 1-ulp drift fails too
+            assert float(value).hex() == float(batch[key][i]).hex(), (i, key, value, batch[key][i])
+
+
+@pytest.mark.parametrize("values", [TIES, [-v for v in TIES]])
+def test_round2_matches_round_on_ties(values):
+    rounded = _round2(np.array(values))
+    assert [float(r).hex() for r in rounded] == [float(round(v, 2)).hex() for v in values]
+
+
+@pytest.mark.parametrize("seed", [1, 7, 42])
+def test_batch_matches_scalar_on_random_structures(seed):
+    assert_matches_scalar(random_structures(5000, random.Random(seed)))
+
+
+def test_batch_matches_scalar_on_zero_negative_and_tie_wages():
+    rng = random.Random(3)
+    wages = [0.0, -0.0, -0.01, -1.005, -2500.5, -99999.995] + TIES + [-w for w in TIES]
+    structures = []
+    for wage in wages:
+        structure = {field: rng.randint(0, 10000) / 100 for field in PERCENT_FIELDS}
+        structure["prof_tax"] = rng.choice([0.0, 200.0])
+        structures.append((wage, structure))
+    assert_matches_scalar(structures)
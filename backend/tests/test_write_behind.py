@@ -0,0 +1,87 @@
+import asyncio
+import fcntl
+import json
+import os
+from datetime import date, datetime
+
+from utils.write_behind import CheckInBuffer
+
+
+def test_duplicate_of_a_stored_check_in_is_rejected(store, tmp_path):
+    today = date.today().isoformat()
+    store.write("attendance", [{"user_id": 1, "attendance_date": today, "check_in": "2025-01-01T09:00:00"}],
+                None, False)
+
+    async def scenario():
+        buffer = CheckInBuffer(str(tmp_path / "journal.ndjson"), 60, 100)
+        await buffer.start()
+        try:
+            now = datetime.now().isoformat()
+            return await buffer.record(1, today, now), await buffer.record(2, today, now)
+        finally:
+            await buffer.stop()
+
+    first, second = asyncio.run(scenario())
+    assert first is False
+    assert second is True
+    assert [row["user_id"] for row in store.tables["attendance"]] == [1, 2]
+
+
+def test_journals_of_other_workers_are_left_alone(store, tmp_path):
+    row = lambda user_id: json.dumps({"user_id": user_id, "attendance_date": "2025-01-02",
+                                      "check_in": "2025-01-02T09:00:00"}) + "\n"
+    (tmp_path / "journal.ndjson").write_text(row(1))
+    (tmp_path / "journal.1.ndjson").write_text(row(2))
+    live = tmp_path / "journal.2.ndjson"
+    live.write_text(row(3))
+
+    async def scenario():
+        buffer = CheckInBuffer(str(tmp_path / "journal.ndjson"), 60, 100)
+        await buffer.start()
+        adopted = sorted(user_id for user_id, _ in buffer.pending)
+        await buffer.stop()
+        return adopted, buffer.journal_path
+
+    with open(live) as f:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        adopted, own = asyncio.run(scenario())
+
+    assert adopted == [1, 2]
+    assert sorted(os.listdir(tmp_path)) == sorted(["journal.2.ndjson", "journal.lock", os.path.basename(own)])
+    assert live.read_text() == row(3)
+    assert sorted(r["user_id"] for r in store.tables["attendance"]) == [1, 2]
+
+
+def test_rejected_rows_are_dead_lettered_and_the_rest_land(store, tmp_path, monkeypatch):
+    from postgrest.exceptions import APIError
+
+    write = store.write
+
+    def write_without_user_5(table, payload, conflict_columns, ignore_duplicates):
+        if table == "attendance" and any(row["user_id"] == 5 for row in payload):
+            raise APIError({"code": "23503", "message": "attendance_user_id_fkey"})
+        return write(table, payload, conflict_columns, ignore_duplicates)
+
+    monkeypatch.setattr(store, "write", write_without_user_5)
+    today = date.today().isoformat()
+
+    async def scenario():
+        buffer = CheckInBuffer(str(tmp_path / "journal.ndjson"), 60, 100)
+        await buffer.start()
+        try:
+            now = datetime.now().isoformat()
+            for user_id in range(1, 9):
+                assert await buffer.record(user_id, today, now)
+            flushed = await buffer.flush()
+            return flushed, buffer.pending, buffer.inflight, buffer.dead_letters, buffer
+        finally:
+            await buffer.stop()
+
+    flushed, pending, inflight, dead_letters, buffer = asyncio.run(scenario())
+    assert flushed is True
+    assert pending == {} and inflight == {}
+    assert sorted(r["user_id"] for r in store.tables["attendance"]) == [1, 2, 3, 4, 6, 7, 8]
+    assert [r["user_id"] for r in dead_letters] == [5]
+    with open(buffer.dead_letter_path) as f:
+        assert [json.loads(line)["user_id"] for line in f] == [5]
+    assert os.path.getsize(buffer.journal_path) == 0
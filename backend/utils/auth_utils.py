@@ -1,5 +1,8 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import hashlib
 from jose import JWTError, jwt
 
 from fastapi import HTTPException, status, Depends
@@ -7,7 +10,12 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import secrets
 import string
 
-from config import JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRATION_HOURS
+from config import (
+    JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRATION_HOURS,
+    BCRYPT_ROUNDS, PASSWORD_WORKERS, PASSWORD_MAX_PENDING, PASSWORD_BULK_WORKERS, PASSWORD_BULK_CHUNK,
+    TOKEN_CACHE_SIZE
+)
+from utils.cache import TTLCache
 
 # Password hashing
 import bcrypt
@@ -15,10 +23,24 @@ import bcrypt
 # Bearer token security
 security = HTTPBearer()
 
+# Process pool for bcrypt work, created on first use
+_password_pool: Optional[ProcessPoolExecutor] = None
+_password_jobs_pending = 0
+# Bulk hashing jobs allowed in the pool at once, across all imports
+_bulk_slots: Optional[asyncio.Semaphore] = None
 
-def hash_password(password: str) -> str:
+# Verified token payloads, keyed by token digest and dropped at "exp"
+token_cache = TTLCache(TOKEN_CACHE_SIZE)
+
+
+def hash_password(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
     """Hash a password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def hash_passwords(passwords: List[str], rounds: int = BCRYPT_ROUNDS) -> List[str]:
+    """Hash several passwords in one call (one pool job for bulk work)"""
+    return [hash_password(password, rounds) for password in passwords]
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -29,6 +51,79 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
+def get_password_pool() -> ProcessPoolExecutor:
+    """Get the process pool used for password hashing"""
+    global _password_pool
+    if _password_pool is None:
+        _password_pool = ProcessPoolExecutor(max_workers=PASSWORD_WORKERS)
+    return _password_pool
+
+
+def shutdown_password_pool() -> None:
+    """Stop the password worker processes"""
+    global _password_pool
+    if _password_pool is not None:
+        _password_pool.shutdown(cancel_futures=True)
+        _password_pool = None
+
+
+def password_queue_depth() -> int:
+    """Number of password jobs running or waiting for a worker"""
+    return _password_jobs_pending
+
+
+async def _run_password_job(fn, *args):
+    """
+    Run a bcrypt call in the process pool.
+    Rejects with 503 instead of queueing once PASSWORD_MAX_PENDING jobs are
+    in flight, so a login storm can't pile up behind the workers.
+    """
+    global _password_jobs_pending
+    if _password_jobs_pending >= PASSWORD_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+    
+    _password_jobs_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_password_pool(), fn, *args)
+    finally:
+        _password_jobs_pending -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password without blocking the event loop"""
+    return await _run_password_job(hash_password, password)
+
+
+async def hash_passwords_async(passwords: List[str]) -> List[str]:
+    """
+    Hash many passwords in the pool without starving logins.
+    Work is split into PASSWORD_BULK_CHUNK-sized jobs, and bulk jobs from
+    all callers together hold at most PASSWORD_BULK_WORKERS workers, so a
+    login never waits behind more than the jobs already running.
+    """
+    global _bulk_slots
+    if _bulk_slots is None:
+        _bulk_slots = asyncio.Semaphore(PASSWORD_BULK_WORKERS)
+    
+    async def run(chunk: List[str]) -> List[str]:
+        async with _bulk_slots:
+            return await _run_password_job(hash_passwords, chunk)
+    
+    chunks = [passwords[i:i + PASSWORD_BULK_CHUNK] for i in range(0, len(passwords), PASSWORD_BULK_CHUNK)]
+    hashed = await asyncio.gather(*(run(chunk) for chunk in chunks))
+    return [h for chunk in hashed for h in chunk]
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password without blocking the event loop"""
+    return await _run_password_job(verify_password, plain_password, hashed_password)
+
+
 def generate_random_password(length: int = 12) -> str:
     """Generate a random password for new employees"""
     alphabet = string.ascii_letters + string.digits + "!@#$%"
@@ -56,10 +151,23 @@ def decode_token(token: str) -> dict:
         )
 
 
+def decode_token_cached(token: str) -> dict:
+    """
+    Decode a JWT, reusing the payload of an already verified token.
+    Only tokens that pass signature and expiry checks are cached.
+    """
+    key = hashlib.sha256(token.encode('utf-8')).digest()
+    payload = token_cache.get(key)
+    if payload is None:
+        payload = decode_token(token)
+        token_cache.set(key, payload, expires_at=payload.get("exp"))
+    return dict(payload)
+
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """Dependency to get current user from JWT token"""
     token = credentials.credentials
-    payload = decode_token(token)
+    payload = decode_token_cached(token)
     user_id = payload.get("user_id")
     if user_id is None:
         raise HTTPException(
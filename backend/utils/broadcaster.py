@@ -0,0 +1,52 @@
+import asyncio
+import json
+import logging
+from typing import Set
+
+logger = logging.getLogger(__name__)
+
+
+class Broadcaster:
+    """
+    In-process fan-out of live events to connected subscribers.
+    Publishing costs one queue put per subscriber, regardless of how often
+    viewers would otherwise poll. A subscriber that falls too far behind is
+    dropped; its stream ends and the client reconnects for a fresh snapshot.
+    """
+
+    def __init__(self, queue_size: int = 256):
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def publish(self, event: str, data: dict) -> None:
+        """Queue an event for every subscriber; never blocks the publisher"""
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait((event, data))
+            except asyncio.QueueFull:
+                logger.warning("Dropping slow live-event subscriber")
+                self._subscribers.discard(queue)
+                # Make room for the sentinel that ends the subscriber's stream
+                queue.get_nowait()
+                queue.put_nowait(None)
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Encode one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+# Attendance and leave changes for the live board
+attendance_events = Broadcaster()
@@ -1,8 +1,61 @@
+import time
+from typing import Optional
+
+from anyio import CapacityLimiter, to_thread
 from supabase import create_client, Client
-from config import SUPABASE_URL, SUPABASE_KEY
+from config import SUPABASE_URL, SUPABASE_KEY, DB_MAX_CONCURRENCY, DB_BACKEND
+from utils.metrics import observe_db_call, query_target
+from utils.query_recorder import RecordingClient, recording
+from utils.postgres import PostgresClient
+
+# Both expose the same table()/rpc() builders; the Postgres pool is opened in open_db()
+if DB_BACKEND == "postgres":
+    supabase = PostgresClient()
+else:
+    supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+# Bounds how many blocking PostgREST calls may be in flight at once
+_limiter: Optional[CapacityLimiter] = None
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 def get_db() -> Client:
-    """Get Supabase client instance"""
+    """Get Supabase client instance (wrapped when the query recorder is on)"""
+    if recording():
+        return RecordingClient(supabase)
     return supabase
+
+
+async def open_db() -> None:
+    """Open the connection pool of the direct Postgres backend (no-op for Supabase)"""
+    if isinstance(supabase, PostgresClient):
+        await supabase.connect()
+
+
+async def close_db() -> None:
+    if isinstance(supabase, PostgresClient):
+        await supabase.close()
+
+
+def get_limiter() -> CapacityLimiter:
+    """Get the shared limiter for database worker threads"""
+    global _limiter
+    if _limiter is None:
+        _limiter = CapacityLimiter(DB_MAX_CONCURRENCY)
+    return _limiter
+
+
+async def execute(query):
+    """
+    Execute a query builder without blocking the event loop.
+    The synchronous Supabase call runs in a worker thread; at most
+    DB_MAX_CONCURRENCY calls run at the same time, the rest wait their turn.
+    Postgres backend queries are awaited directly (the pool bounds them).
+    The recorded latency includes any wait, as the caller experiences it.
+    """
+    start = time.perf_counter()
+    try:
+        if getattr(query, "is_async", False):
+            return await query.execute_async()
+        return await to_thread.run_sync(query.execute, limiter=get_limiter())
+    finally:
+        observe_db_call(query_target(query), time.perf_counter() - start)
@@ -0,0 +1,60 @@
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+from utils.responses import dumps
+
+# Conditional GET counters per route
+etag_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _count(route: str, not_modified: bool = False, query_skipped: bool = False) -> None:
+    stats = etag_stats.setdefault(route, {"requests": 0, "not_modified": 0, "query_skipped": 0})
+    stats["requests"] += 1
+    stats["not_modified"] += not_modified
+    stats["query_skipped"] += query_skipped
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag from a body (bytes) or from row versions (any JSON-able values)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 specifies for it)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = [t.strip().removeprefix("W/") for t in header.split(",")]
+    return etag in tags
+
+
+def not_modified(route: str, etag: str, query_skipped: bool = False) -> Response:
+    """304 response for a matching validator"""
+    _count(route, not_modified=True, query_skipped=query_skipped)
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+
+def conditional_response(request: Request, route: str, payload: Any, etag: Optional[str] = None) -> Response:
+    """
+    Serialize payload once and answer 304 if the client already has it.
+    Without an explicit etag (row versions), the ETag is a hash of the body.
+    """
+    body = dumps(payload)
+    etag = etag or make_etag(body)
+    if etag_matches(request, etag):
+        return not_modified(route, etag)
+    _count(route)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "private, no-cache"}
+    )
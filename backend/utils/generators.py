@@ -1,16 +1,15 @@
+import asyncio
 from datetime import datetime
-from utils.db import get_db
+from typing import Dict, List, Optional, Tuple
+from utils.db import get_db, execute
 
 
-def generate_employee_id(company_prefix: str, first_name: str, last_name: str, join_year: int = None) -> str:
+def employee_id_prefix(company_prefix: str, first_name: str, last_name: str, join_year: Optional[int] = None) -> str:
     """
-    Generate employee ID in format: XXYYZZZZ####
+    Build the serial-less part of an employee ID: XXYYZZZZ
     - XX = Company prefix (2 chars)
     - YY = First letter of first name + first letter of last name
     - ZZZZ = Year of joining
-    - #### = Serial number (0001, 0002, etc.)
-    
-    Example: OIJODO20220001
     """
     if join_year is None:
         join_year = datetime.now().year
@@ -24,13 +23,53 @@ def generate_employee_id(company_prefix: str, first_name: str, last_name: str, j
     # Year as 4 digits
     year_code = str(join_year)
     
-    # Get next serial number for this year
+    return f"{company_code}{name_code}{year_code}"
+
+
+async def allocate_serials(prefix: str, count: int = 1) -> int:
+    """
+    Atomically reserve `count` consecutive serials for a prefix.
+    Returns the first serial of the block. Backed by the
+    allocate_employee_serials function in db/scehma.sql, so concurrent
+    callers never see the same serial.
+    """
     db = get_db()
-    prefix = f"{company_code}{name_code}{year_code}"
+    result = await execute(db.rpc("allocate_employee_serials", {"p_prefix": prefix, "p_count": count}))
+    return int(result.data)
+
+
+async def generate_employee_id(company_prefix: str, first_name: str, last_name: str, join_year: int = None) -> str:
+    """
+    Generate employee ID in format: XXYYZZZZ####
+    - XX = Company prefix (2 chars)
+    - YY = First letter of first name + first letter of last name
+    - ZZZZ = Year of joining
+    - #### = Serial number (0001, 0002, etc.)
+    
+    Example: OIJODO20220001
+    """
+    prefix = employee_id_prefix(company_prefix, first_name, last_name, join_year)
+    serial = await allocate_serials(prefix)
+    return f"{prefix}{str(serial).zfill(4)}"
+
+
+async def generate_employee_ids(company_prefix: str, people: List[Tuple[str, str, int]]) -> List[str]:
+    """
+    Generate IDs for many hires at once, given (first_name, last_name, join_year) tuples.
+    Reserves one block of serials per distinct prefix; IDs come back in input order.
+    """
+    prefixes = [employee_id_prefix(company_prefix, first, last, year) for first, last, year in people]
+    
+    counts: Dict[str, int] = {}
+    for prefix in prefixes:
+        counts[prefix] = counts.get(prefix, 0) + 1
+    
+    firsts = await asyncio.gather(*(allocate_serials(prefix, count) for prefix, count in counts.items()))
+    next_serial: Dict[str, int] = dict(zip(counts, firsts))
     
-    # Count existing employees with same prefix pattern
-    result = db.table("users").select("employee_id").like("employee_id", f"{prefix}%").execute()
-    serial = len(result.data) + 1
-    serial_code = str(serial).zfill(4)
+    employee_ids = []
+    for prefix in prefixes:
+        employee_ids.append(f"{prefix}{str(next_serial[prefix]).zfill(4)}")
+        next_serial[prefix] += 1
     
-    return f"{prefix}{serial_code}"
+    return employee_ids
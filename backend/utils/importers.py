@@ -0,0 +1,107 @@
+import csv
+import json
+from typing import AsyncIterator, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# (row number, parsed record or None, parse error or None)
+ImportRecord = Tuple[int, Optional[dict], Optional[str]]
+
+
+def resolve_import_format(fmt: Optional[str], content_type: Optional[str]) -> str:
+    """Pick csv/ndjson from an explicit format, falling back to Content-Type"""
+    if not fmt and content_type:
+        media_type = content_type.split(";")[0].strip().lower()
+        if media_type in ("text/csv", "application/csv"):
+            fmt = "csv"
+        elif media_type in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+            fmt = "ndjson"
+    
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Send text/csv or application/x-ndjson, or pass ?format=csv|ndjson"
+        )
+    return fmt
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into decoded lines without reading it all into memory"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8-sig").rstrip("\r")
+
+
+async def iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[ImportRecord]:
+    """Parse CSV with a header row; quoted fields may span lines"""
+    header: Optional[List[str]] = None
+    pending = ""
+    row = 0
+    async for line in lines:
+        pending = f"{pending}\n{line}" if pending else line
+        # An odd number of quotes means a quoted field continues on the next line
+        if pending.count('"') % 2:
+            continue
+        text, pending = pending, ""
+        if not text.strip():
+            continue
+        
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+        
+        row += 1
+        if len(values) != len(header):
+            yield row, None, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        # Empty cells mean "not provided" so schema defaults apply
+        yield row, {k: v.strip() for k, v in zip(header, values) if v.strip()}, None
+    
+    if pending.strip():
+        yield row + 1, None, "unterminated quoted field"
+
+
+async def iter_ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[ImportRecord]:
+    """Parse one JSON object per line"""
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield row, None, "expected a JSON object"
+            continue
+        yield row, record, None
+
+
+def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[ImportRecord]:
+    """Stream records out of an uploaded CSV or NDJSON body"""
+    lines = iter_lines(chunks)
+    if fmt == "csv":
+        return iter_csv_records(lines)
+    return iter_ndjson_records(lines)
+
+
+async def batched(records: AsyncIterator[ImportRecord], size: int) -> AsyncIterator[List[ImportRecord]]:
+    """Group a record stream into lists of at most `size`"""
+    batch: List[ImportRecord] = []
+    async for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,213 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from starlette.routing import Mount
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Supabase calls made while serving one request
+DB_CALL_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram; observe() is a bisect and two additions"""
+
+    def __init__(self, buckets: Iterable[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+
+class HistogramFamily:
+    """One histogram per combination of label values"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets: Iterable[float]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self.children: Dict[Tuple[str, ...], Histogram] = {}
+
+    def labels(self, *values: str) -> Histogram:
+        histogram = self.children.get(values)
+        if histogram is None:
+            histogram = self.children[values] = Histogram(self.buckets)
+        return histogram
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for values, histogram in sorted(self.children.items()):
+            key = tuple(zip(self.label_names, values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), histogram.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{format_labels(key + (('le', le),))} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(key)} {histogram.sum:.6f}")
+            lines.append(f"{self.name}_count{format_labels(key)} {cumulative}")
+        return lines
+
+
+class CounterFamily:
+    """Monotonic counters per combination of label values"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *values: str, amount: float = 1) -> None:
+        self.values[values] = self.values.get(values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        lines.extend(
+            f"{self.name}{format_labels(tuple(zip(self.label_names, values)))} {value:g}"
+            for values, value in sorted(self.values.items())
+        )
+        return lines
+
+
+def format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34)).replace(chr(10), " ")}"'
+        for k, v in labels
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def gauge(name: str, help_text: str, samples: Iterable[Tuple[Labels, float]]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    lines.extend(f"{name}{format_labels(labels)} {value:g}" for labels, value in samples)
+    return lines
+
+
+def counter(name: str, help_text: str, samples: Iterable[Tuple[Labels, float]]) -> List[str]:
+    """Render counters kept elsewhere (e.g. a cache's own hit count)"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+    lines.extend(f"{name}{format_labels(labels)} {value:g}" for labels, value in samples)
+    return lines
+
+
+request_latency = HistogramFamily(
+    "dayflow_request_duration_seconds", "Request latency by route template",
+    ("method", "route"), LATENCY_BUCKETS
+)
+requests_total = CounterFamily(
+    "dayflow_requests_total", "Requests by route template and status code", ("method", "route", "status")
+)
+db_calls_per_request = HistogramFamily(
+    "dayflow_db_calls_per_request", "Supabase calls made while serving a request",
+    ("method", "route"), DB_CALL_BUCKETS
+)
+db_latency = HistogramFamily(
+    "dayflow_db_call_duration_seconds", "Supabase call latency by table or rpc function",
+    ("target",), LATENCY_BUCKETS
+)
+requests_in_flight = 0
+
+# Supabase calls made by the current request (a one-item list so worker code can bump it)
+_db_calls: ContextVar[Optional[List[int]]] = ContextVar("db_calls", default=None)
+
+
+def query_target(query) -> str:
+    """Table (or rpc/<function>) a query builder points at"""
+    target = getattr(query, "target", None)
+    if target is not None:
+        return target
+    path = getattr(getattr(query, "request", None), "path", None)
+    if path is None:
+        return "unknown"
+    return str(path).rsplit("/rest/v1/", 1)[-1]
+
+
+def observe_db_call(target: str, seconds: float) -> None:
+    """Record one Supabase call against its table and the current request"""
+    db_latency.labels(target).observe(seconds)
+    calls = _db_calls.get()
+    if calls is not None:
+        calls[0] += 1
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the matched route, so /employees/42 is reported as /employees/{user_id}"""
+    route = scope.get("route")
+    # Mounted apps (static files) report the mount point only
+    if route is None or isinstance(route, Mount):
+        return scope.get("root_path") if "endpoint" in scope and scope.get("root_path") else "unmatched"
+    # Routes of included routers carry their own path; recover the prefix from the request path
+    path_format = getattr(route, "path_format", route.path)
+    concrete = path_format.format(**scope.get("path_params", {}))
+    path = scope["path"]
+    prefix = path[:len(path) - len(concrete)] if path.endswith(concrete) else ""
+    return prefix + path_format
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware; per request it costs a few dict lookups and
+    bisects (single-digit microseconds), so it stays on in production.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        global requests_in_flight
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        calls = [0]
+        token = _db_calls.set(calls)
+        requests_in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            requests_in_flight -= 1
+            _db_calls.reset(token)
+            route = route_template(scope)
+            method = scope["method"]
+            request_latency.labels(method, route).observe(elapsed)
+            requests_total.inc(method, route, str(status_code))
+            db_calls_per_request.labels(method, route).observe(calls[0])
+
+
+def render_metrics(extra: Iterable[List[str]] = ()) -> str:
+    """Prometheus text exposition of every metric above plus caller-supplied gauges"""
+    lines = [
+        *gauge("dayflow_requests_in_flight", "Requests currently being served", [((), requests_in_flight)]),
+        *request_latency.render(),
+        *requests_total.render(),
+        *db_calls_per_request.render(),
+        *db_latency.render(),
+    ]
+    for block in extra:
+        lines.extend(block)
+    return "\n".join(lines) + "\n"
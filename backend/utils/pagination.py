@@ -0,0 +1,111 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Callable, List, Optional
+
+from fastapi import HTTPException, status
+
+# Type of each column endpoints page on; cursor values are checked against it
+KEY_TYPES = {
+    "user_id": int,
+    "attendance_id": int,
+    "leave_id": int,
+    "attendance_date": date,
+    "created_at": datetime,
+}
+
+# Characters with a meaning inside an or_() filter string
+_RESERVED = set('",()\\')
+
+
+def encode_cursor(key: dict) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor"""
+    raw = json.dumps(key, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[dict]:
+    """Decode a cursor produced by encode_cursor"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        key = None
+    if not isinstance(key, dict):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return key
+
+
+def require_keys(key: dict, *names: str) -> None:
+    """Reject cursors that don't carry the columns an endpoint sorts on"""
+    if any(name not in key for name in names):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def key_value(key: dict, column: str) -> Any:
+    """
+    A cursor's value for a column, checked against the column's type so a
+    hand-made cursor fails with 400 instead of reaching the database.
+    Dates and timestamps come back as ISO strings.
+    """
+    value, kind = key[column], KEY_TYPES[column]
+    if kind is int:
+        valid = isinstance(value, int) and not isinstance(value, bool)
+    elif isinstance(value, str):
+        try:
+            kind.fromisoformat(value)
+            valid = not _RESERVED.intersection(value)
+        except ValueError:
+            valid = False
+    else:
+        # Cursors built in-process from result rows may hold date/datetime objects
+        valid = isinstance(value, kind) and (kind is datetime or not isinstance(value, datetime))
+        value = value.isoformat() if valid else value
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return value
+
+
+def after(query, cursor: Optional[dict], column: str, desc: bool = False):
+    """Continue an ascending/descending keyset on a single unique column"""
+    if cursor is None:
+        return query
+    require_keys(cursor, column)
+    value = key_value(cursor, column)
+    if desc:
+        return query.lt(column, value)
+    return query.gt(column, value)
+
+
+def after_pair(query, cursor: Optional[dict], column: str, tiebreaker: str, desc: bool = True):
+    """Continue a keyset on (column, tiebreaker) for non-unique columns"""
+    if cursor is None:
+        return query
+    require_keys(cursor, column, tiebreaker)
+    # Both end up inside the filter string; key_value() rejects its syntax characters
+    value, tie = key_value(cursor, column), key_value(cursor, tiebreaker)
+    op = "lt" if desc else "gt"
+    return query.or_(
+        f'{column}.{op}."{value}",and({column}.eq."{value}",{tiebreaker}.{op}.{tie})'
+    )
+
+
+def paginate(rows: List[dict], limit: int, key: Callable[[dict], dict]) -> dict:
+    """
+    Split a result fetched with limit + 1 rows into a page.
+    The extra row only signals that another page exists.
+    """
+    items = rows[:limit]
+    next_cursor = encode_cursor(key(items[-1])) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
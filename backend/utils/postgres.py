@@ -0,0 +1,468 @@
+"""
+Direct PostgreSQL backend (DB_BACKEND=postgres).
+
+PostgresClient exposes the same table()/rpc() query-builder surface the
+routers already use on the Supabase client, but compiles each query to one
+parameterized SQL statement and runs it on an asyncpg connection pool.
+Statements are prepared once per connection and reused (asyncpg's statement
+cache, off with DB_STATEMENT_CACHE_SIZE=0 behind a transaction pooler), and
+results come back in the shapes PostgREST returns: embedded relations as
+nested objects, dates and timestamps as ISO strings, numerics as floats.
+
+Parameters are converted to the Python type asyncpg wants for their column
+or function argument using a catalog of those types read once at connect(),
+so no statement has to be prepared just to learn its parameter types.
+
+Only the PostgREST subset the routers use is supported; anything else raises
+ValueError rather than silently running a different query.
+"""
+
+import json
+import re
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import (
+    DATABASE_URL, DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_STATEMENT_CACHE_SIZE
+)
+
+# (table, embedded table) -> (local column, remote column), following the foreign keys in db/scehma.sql
+RELATIONS = {
+    ("users", "employees"): ("user_id", "user_id"),
+    ("employees", "users"): ("user_id", "user_id"),
+    ("employees", "salary_structure"): ("employee_id", "employee_id"),
+    ("salary_structure", "employees"): ("employee_id", "employee_id"),
+    ("attendance", "users"): ("user_id", "user_id"),
+    ("leave_requests", "users"): ("user_id", "user_id"),
+    ("payroll", "users"): ("user_id", "user_id"),
+}
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_EMBED = re.compile(r"^(\w+)(?:!\w+)?\((.*)\)$", re.S)
+_OPERATORS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=", "like": "LIKE"}
+
+
+class Result:
+    """Same fields as a postgrest APIResponse"""
+
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+def quote(identifier: str) -> str:
+    identifier = identifier.strip()
+    if not _IDENTIFIER.match(identifier):
+        raise ValueError(f"Unsupported identifier: {identifier!r}")
+    return f'"{identifier}"'
+
+
+def split_top_level(text: str) -> List[str]:
+    """Split on commas that are not inside parentheses"""
+    parts, depth, current = [], 0, []
+    for ch in text:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    if "".join(current).strip():
+        parts.append("".join(current).strip())
+    return parts
+
+
+# ============ Parameter coercion ============
+# PostgREST receives every value as text; asyncpg wants the Python type of the column.
+
+def _coerce_scalar(type_name: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if type_name == "date":
+        return date.fromisoformat(value[:10]) if isinstance(value, str) else value
+    if type_name in ("timestamp", "timestamptz"):
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        elif isinstance(value, date) and not isinstance(value, datetime):
+            value = datetime.combine(value, time())
+        return value.replace(tzinfo=None) if type_name == "timestamp" else value
+    if type_name in ("int2", "int4", "int8"):
+        return int(value)
+    if type_name == "numeric":
+        return Decimal(str(value))
+    if type_name in ("float4", "float8"):
+        return float(value)
+    if type_name == "bool":
+        return value.lower() == "true" if isinstance(value, str) else bool(value)
+    if type_name in ("json", "jsonb"):
+        return value if isinstance(value, str) else json.dumps(value, default=str)
+    if type_name in ("text", "varchar", "bpchar") and not isinstance(value, str):
+        return str(value)
+    return value
+
+
+def coerce(type_name: Optional[str], value: Any) -> Any:
+    """Convert a value for a column/argument of pg_type.typname type_name (None if unknown)"""
+    if type_name is None:
+        return value
+    # A list is an array column's value, or the values of an in_() filter on a scalar column
+    if isinstance(value, (list, tuple)) and type_name not in ("json", "jsonb"):
+        element = type_name[1:] if type_name.startswith("_") else type_name
+        return [_coerce_scalar(element, v) for v in value]
+    return _coerce_scalar(type_name, value)
+
+
+# Column types of the tables and argument types of the functions in the current schema
+CATALOG_SQL = """
+SELECT c.relname AS name, a.attname AS arg, t.typname AS type
+FROM pg_attribute a
+JOIN pg_class c ON c.oid = a.attrelid
+JOIN pg_namespace n ON n.oid = c.relnamespace
+JOIN pg_type t ON t.oid = a.atttypid
+WHERE n.nspname = current_schema() AND c.relkind IN ('r', 'p', 'v', 'm')
+  AND a.attnum > 0 AND NOT a.attisdropped
+UNION ALL
+SELECT 'rpc/' || p.proname, arg.name, t.typname
+FROM pg_proc p
+JOIN pg_namespace n ON n.oid = p.pronamespace
+CROSS JOIN LATERAL unnest(p.proargnames, p.proargtypes::oid[]) AS arg(name, type_oid)
+JOIN pg_type t ON t.oid = arg.type_oid
+WHERE n.nspname = current_schema() AND p.proargnames IS NOT NULL
+"""
+
+
+# ============ Result conversion ============
+
+def to_json_value(value: Any) -> Any:
+    """Convert a column value to what PostgREST's JSON would have decoded to"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, list):
+        return [to_json_value(v) for v in value]
+    return value
+
+
+def to_row(record, json_columns: Tuple[str, ...] = ()) -> dict:
+    row = {}
+    for key, value in record.items():
+        if key in json_columns and isinstance(value, str):
+            value = json.loads(value)
+        row[key] = to_json_value(value)
+    return row
+
+
+class PostgresQuery:
+    """Mirrors the postgrest request builder for the operations the routers use"""
+
+    is_async = True
+
+    def __init__(self, client: "PostgresClient", table: str):
+        self.client = client
+        self.table = table
+        self.target = table
+        self.op = "select"
+        self.columns = "*"
+        self.count: Optional[str] = None
+        self.payload: Any = None
+        self.on_conflict: Optional[str] = None
+        self.ignore_duplicates = False
+        self.where: List[Tuple[str, List[Any]]] = []
+        self.orders: List[Tuple[str, bool]] = []
+        self.row_limit: Optional[int] = None
+
+    # Operations
+    def select(self, columns: str = "*", count: Optional[str] = None) -> "PostgresQuery":
+        self.columns, self.count = columns, count
+        return self
+
+    def insert(self, rows) -> "PostgresQuery":
+        self.op, self.payload = "insert", rows
+        return self
+
+    def upsert(self, rows, on_conflict: Optional[str] = None, ignore_duplicates: bool = False) -> "PostgresQuery":
+        if not on_conflict:
+            raise ValueError("upsert needs on_conflict with the postgres backend")
+        self.op, self.payload = "upsert", rows
+        self.on_conflict, self.ignore_duplicates = on_conflict, ignore_duplicates
+        return self
+
+    def update(self, values: dict) -> "PostgresQuery":
+        self.op, self.payload = "update", values
+        return self
+
+    def delete(self) -> "PostgresQuery":
+        self.op = "delete"
+        return self
+
+    def _param(self, params: List[Any], column: str, value: Any) -> str:
+        """Add a value for one of this table's columns; returns its placeholder"""
+        params.append(coerce(self.client.column_type(self.target, column), value))
+        return f"${len(params)}"
+
+    # Filters; "{}" marks where the next parameter goes, paired with its column
+    def _filter(self, column: str, op: str, value: Any) -> "PostgresQuery":
+        self.where.append((f"t.{quote(column)} {_OPERATORS[op]} {{}}", [(column, value)]))
+        return self
+
+    def eq(self, column: str, value) -> "PostgresQuery":
+        return self._filter(column, "eq", value)
+
+    def neq(self, column: str, value) -> "PostgresQuery":
+        return self._filter(column, "neq", value)
+
+    def gt(self, column: str, value) -> "PostgresQuery":
+        return self._filter(column, "gt", value)
+
+    def gte(self, column: str, value) -> "PostgresQuery":
+        return self._filter(column, "gte", value)
+
+    def lt(self, column: str, value) -> "PostgresQuery":
+        return self._filter(column, "lt", value)
+
+    def lte(self, column: str, value) -> "PostgresQuery":
+        return self._filter(column, "lte", value)
+
+    def like(self, column: str, pattern: str) -> "PostgresQuery":
+        return self._filter(column, "like", pattern)
+
+    def in_(self, column: str, values) -> "PostgresQuery":
+        self.where.append((f"t.{quote(column)} = ANY({{}})", [(column, [*values])]))
+        return self
+
+    def is_(self, column: str, value) -> "PostgresQuery":
+        if value in (None, "null"):
+            self.where.append((f"t.{quote(column)} IS NULL", []))
+            return self
+        return self.eq(column, value)
+
+    def or_(self, expr: str) -> "PostgresQuery":
+        clause, values = _parse_logic("OR", expr)
+        # Parenthesized, since filters are joined with AND
+        self.where.append((f"({clause})", values))
+        return self
+
+    # Modifiers
+    def order(self, column: str, desc: bool = False) -> "PostgresQuery":
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, size: int) -> "PostgresQuery":
+        self.row_limit = int(size)
+        return self
+
+    def execute(self):
+        raise RuntimeError("Postgres queries are async; run them with `await utils.db.execute(query)`")
+
+    async def execute_async(self) -> Result:
+        params: List[Any] = []
+
+        if self.op == "select":
+            columns, json_columns = select_list(self.table, self.columns, "t")
+            sql = f"SELECT {columns} FROM {quote(self.table)} t{self._where_sql(params)}"
+            if self.orders:
+                sql += " ORDER BY " + ", ".join(
+                    f"t.{quote(column)}{' DESC' if desc else ''}" for column, desc in self.orders
+                )
+            if self.row_limit is not None:
+                params.append(self.row_limit)
+                sql += f" LIMIT ${len(params)}"
+            rows = [to_row(r, json_columns) for r in await self.client.fetch(sql, params)]
+            count = None
+            if self.count:
+                count_params: List[Any] = []
+                count_sql = f"SELECT count(*) FROM {quote(self.table)} t{self._where_sql(count_params)}"
+                count = (await self.client.fetch(count_sql, count_params))[0][0]
+            return Result(rows, count)
+
+        if self.op == "update":
+            assignments = []
+            for column, value in self.payload.items():
+                assignments.append(f"{quote(column)} = {self._param(params, column, value)}")
+            sql = (f"UPDATE {quote(self.table)} t SET {', '.join(assignments)}"
+                   f"{self._where_sql(params)} RETURNING t.*")
+            return Result([to_row(r) for r in await self.client.fetch(sql, params)])
+
+        if self.op == "delete":
+            sql = f"DELETE FROM {quote(self.table)} t{self._where_sql(params)} RETURNING t.*"
+            return Result([to_row(r) for r in await self.client.fetch(sql, params)])
+
+        return Result([to_row(r) for r in await self.client.fetch(*self._insert_sql())])
+
+    def _where_sql(self, params: List[Any]) -> str:
+        clauses = []
+        for template, values in self.where:
+            placeholders = [self._param(params, column, value) for column, value in values]
+            clauses.append(template.format(*placeholders))
+        return " WHERE " + " AND ".join(clauses) if clauses else ""
+
+    def _insert_sql(self) -> Tuple[str, List[Any]]:
+        rows = self.payload if isinstance(self.payload, list) else [self.payload]
+        if not rows:
+            return f"SELECT * FROM {quote(self.table)} WHERE false", []
+        columns: List[str] = []
+        for row in rows:
+            columns.extend(c for c in row if c not in columns)
+
+        params: List[Any] = []
+        values = []
+        for row in rows:
+            cells = []
+            for column in columns:
+                if column in row:
+                    cells.append(self._param(params, column, row[column]))
+                else:
+                    cells.append("DEFAULT")
+            values.append(f"({', '.join(cells)})")
+
+        sql = (f"INSERT INTO {quote(self.table)} AS t ({', '.join(quote(c) for c in columns)}) "
+               f"VALUES {', '.join(values)}")
+        if self.op == "upsert":
+            conflict = [c.strip() for c in self.on_conflict.split(",")]
+            updates = [c for c in columns if c not in conflict]
+            sql += f" ON CONFLICT ({', '.join(quote(c) for c in conflict)})"
+            if self.ignore_duplicates or not updates:
+                sql += " DO NOTHING"
+            else:
+                sql += " DO UPDATE SET " + ", ".join(f"{quote(c)} = EXCLUDED.{quote(c)}" for c in updates)
+        return sql + " RETURNING t.*", params
+
+
+def _parse_logic(kind: str, expr: str) -> Tuple[str, List[Any]]:
+    """Compile an or_()/and() filter string such as 'a.lt.1,and(a.eq.1,b.lt."x")'"""
+    clauses, values = [], []
+    for part in split_top_level(expr):
+        nested = re.fullmatch(r"(and|or)\((.*)\)", part, re.S)
+        if nested:
+            clause, nested_values = _parse_logic(nested.group(1).upper(), nested.group(2))
+            clauses.append(f"({clause})")
+            values.extend(nested_values)
+            continue
+        column, op, value = part.split(".", 2)
+        if op not in _OPERATORS:
+            raise ValueError(f"Unsupported operator in or_(): {op}")
+        if len(value) >= 2 and value[0] == value[-1] == '"':
+            value = value[1:-1]
+        clauses.append(f"t.{quote(column)} {_OPERATORS[op]} {{}}")
+        values.append((column, value))
+    return f" {kind} ".join(clauses), values
+
+
+def select_list(table: str, columns: str, alias: str, depth: int = 0) -> Tuple[str, Tuple[str, ...]]:
+    """Top-level select list; embedded relations become correlated jsonb subqueries"""
+    parts, json_columns = [], []
+    for part in split_top_level(columns):
+        embed = _EMBED.match(part)
+        if embed:
+            name = embed.group(1)
+            parts.append(f"({embed_subquery(table, name, embed.group(2), alias, depth + 1)}) AS {quote(name)}")
+            json_columns.append(name)
+        elif part == "*":
+            parts.append(f"{alias}.*")
+        else:
+            parts.append(f"{alias}.{quote(part)}")
+    return ", ".join(parts), tuple(json_columns)
+
+
+def embed_subquery(table: str, name: str, columns: str, parent_alias: str, depth: int) -> str:
+    """SELECT one related row as a jsonb object (all embeds used are to-one)"""
+    if (table, name) not in RELATIONS:
+        raise ValueError(f"No relation from {table} to {name}")
+    local, remote = RELATIONS[(table, name)]
+    alias = f"e{depth}"
+
+    star, pairs = False, []
+    for part in split_top_level(columns):
+        embed = _EMBED.match(part)
+        if embed:
+            nested = embed.group(1)
+            pairs.append(f"'{nested}', ({embed_subquery(name, nested, embed.group(2), alias, depth + 1)})")
+        elif part == "*":
+            star = True
+        else:
+            pairs.append(f"'{part.strip()}', {alias}.{quote(part)}")
+
+    obj = f"jsonb_build_object({', '.join(pairs)})" if pairs else "'{}'::jsonb"
+    if star:
+        obj = f"to_jsonb({alias}.*) || {obj}" if pairs else f"to_jsonb({alias}.*)"
+    return (f"SELECT {obj} FROM {quote(name)} {alias} "
+            f"WHERE {alias}.{quote(remote)} = {parent_alias}.{quote(local)} LIMIT 1")
+
+
+class PostgresRpc:
+    """SELECT fn(p_a => $1, ...); the scalar result is returned as data, as PostgREST does"""
+
+    is_async = True
+
+    def __init__(self, client: "PostgresClient", fn: str, params: Optional[dict]):
+        self.client = client
+        self.fn = fn
+        self.target = f"rpc/{fn}"
+        self.params = params or {}
+
+    def execute(self):
+        raise RuntimeError("Postgres queries are async; run them with `await utils.db.execute(query)`")
+
+    async def execute_async(self) -> Result:
+        args = ", ".join(f"{quote(name)} => ${i}" for i, name in enumerate(self.params, start=1))
+        values = [coerce(self.client.column_type(self.target, name), value) for name, value in self.params.items()]
+        rows = await self.client.fetch(f"SELECT {quote(self.fn)}({args}) AS result", values)
+        return Result(to_json_value(rows[0]["result"]) if rows else None)
+
+
+class PostgresClient:
+    """
+    Stands in for the Supabase client. The pool is opened by connect() at
+    startup (see utils.db.open_db) and closed by close().
+    """
+
+    def __init__(self, dsn: str = DATABASE_URL):
+        self.dsn = dsn
+        self.pool = None
+        # "table" or "rpc/function" -> {column or argument: pg_type.typname}, loaded by connect()
+        self.catalog: Dict[str, Dict[str, str]] = {}
+
+    async def connect(self) -> None:
+        try:
+            import asyncpg
+        except ImportError:
+            raise RuntimeError("DB_BACKEND=postgres needs the asyncpg package (pip install asyncpg)")
+        if not self.dsn:
+            raise RuntimeError("DB_BACKEND=postgres needs DATABASE_URL")
+        self.pool = await asyncpg.create_pool(
+            self.dsn,
+            min_size=DB_POOL_MIN_SIZE,
+            max_size=DB_POOL_MAX_SIZE,
+            statement_cache_size=DB_STATEMENT_CACHE_SIZE
+        )
+        catalog: Dict[str, Dict[str, str]] = {}
+        for row in await self.pool.fetch(CATALOG_SQL):
+            catalog.setdefault(row["name"], {})[row["arg"]] = row["type"]
+        self.catalog = catalog
+
+    async def close(self) -> None:
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    def table(self, name: str) -> PostgresQuery:
+        return PostgresQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[dict] = None) -> PostgresRpc:
+        return PostgresRpc(self, fn, params)
+
+    def column_type(self, target: str, name: str) -> Optional[str]:
+        return self.catalog.get(target, {}).get(name.strip())
+
+    async def fetch(self, sql: str, params: List[Any]) -> list:
+        """Run one statement with parameters already converted by the query compiler"""
+        if self.pool is None:
+            raise RuntimeError("Postgres pool is not open")
+        return await self.pool.fetch(sql, *params)
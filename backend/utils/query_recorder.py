@@ -0,0 +1,242 @@
+import asyncio
+import contextvars
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Coroutine, Iterator, List, Optional, Tuple, TypeVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import QUERY_RECORDER, QUERY_BUDGET, QUERY_REPEAT_LIMIT
+
+logger = logging.getLogger(__name__)
+
+# Builder methods whose arguments are values, not shape
+_VALUELESS = {"insert", "upsert", "update", "delete", "limit", "range", "offset", "single", "maybe_single"}
+_OR_COLUMN = re.compile(r"(\w+)\.(\w+)\.")
+# gt(col)/lt(col), or the first column of an after_pair() or(col.gt,...)
+_KEYSET = re.compile(r"\b(?:gt|lt)\((\w+)\)|\bor\((\w+)\.(?:gt|lt),")
+
+T = TypeVar("T")
+
+
+def is_page(shape: str) -> bool:
+    """
+    Whether a shape continues a keyset scan: a gt/lt on a column it also
+    orders by. Walking a large table repeats such a shape once per page,
+    which is pagination, not N+1.
+    """
+    return any(f"order({a or b})" in shape for a, b in _KEYSET.findall(shape))
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in QUERY_RECORDER=raise mode when a request goes over its query budget"""
+
+
+class QueryRecorder:
+    """Queries issued while serving one request (or inside a test block)"""
+
+    def __init__(self):
+        self.queries: List[Tuple[str, float]] = []
+
+    def add(self, shape: str, seconds: float) -> None:
+        self.queries.append((shape, seconds))
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    def problems(self, budget: int, repeat_limit: int) -> List[str]:
+        """Why this request looks wasteful, if it does (keyset pages count for neither limit)"""
+        found = []
+        shapes = Counter(shape for shape, _ in self.queries if not is_page(shape))
+        if sum(shapes.values()) > budget:
+            found.append(f"{sum(shapes.values())} queries (budget {budget})")
+        for shape, times in shapes.items():
+            if times > repeat_limit:
+                found.append(f"{times}x {shape} (repeat limit {repeat_limit})")
+        return found
+
+    def trace(self, limit: int = 15) -> str:
+        """One line per distinct query shape, in first-issued order"""
+        totals = {}
+        for shape, seconds in self.queries:
+            times, elapsed = totals.get(shape, (0, 0.0))
+            totals[shape] = (times + 1, elapsed + seconds)
+        lines = [f"  {times:>4}x {elapsed * 1000:8.1f} ms  {shape}" for shape, (times, elapsed) in totals.items()]
+        if len(lines) > limit:
+            lines = lines[:limit] + [f"  ... {len(lines) - limit} more shapes"]
+        return "\n".join(lines)
+
+
+# Recorder of the request being served
+_current: ContextVar[Optional[QueryRecorder]] = ContextVar("query_recorder", default=None)
+# Recorders opened by record_queries(); they see queries from every request
+_active: List[QueryRecorder] = []
+
+
+def recording() -> bool:
+    """Whether get_db() should hand out a recording client"""
+    return QUERY_RECORDER != "off" or bool(_active)
+
+
+def describe(method: str, args: tuple) -> str:
+    """A builder call without its values, e.g. eq(user_id) or select(*)"""
+    if method in _VALUELESS or not args or not isinstance(args[0], str):
+        return method
+    if method == "or_":
+        return "or(" + ",".join(f"{col}.{op}" for col, op in _OR_COLUMN.findall(args[0])) + ")"
+    return f"{method}({args[0]})"
+
+
+def _record(shape: str, seconds: float) -> None:
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.add(shape, seconds)
+        if QUERY_RECORDER == "raise":
+            problems = recorder.problems(QUERY_BUDGET, QUERY_REPEAT_LIMIT)
+            if problems:
+                raise QueryBudgetExceeded("; ".join(problems) + "\n" + recorder.trace())
+    for active in list(_active):
+        active.add(shape, seconds)
+
+
+def spawn(coro: Coroutine) -> asyncio.Task:
+    """
+    create_task() for work that outlives the request starting it. Tasks copy
+    the caller's context, so without this the request's recorder would keep
+    collecting (and in raise mode, failing) the task's queries.
+    """
+    context = contextvars.copy_context()
+    context.run(_current.set, None)
+    return asyncio.create_task(coro, context=context)
+
+
+async def detach(iterator: AsyncIterator[T]) -> AsyncIterator[T]:
+    """
+    Iterate a streaming response body outside the request's recorder. The
+    response has started by the time the body runs, so its queries can't be
+    reported in X-Query-Count or stopped by raise mode anyway.
+    """
+    while True:
+        token = _current.set(None)
+        try:
+            item = await iterator.__anext__()
+        except StopAsyncIteration:
+            return
+        finally:
+            _current.reset(token)
+        yield item
+
+
+class RecordingQuery:
+    """Wraps a PostgREST query builder, tracking the shape of the calls made on it"""
+
+    def __init__(self, query, shape: List[str]):
+        self._query = query
+        self._shape = shape
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._query, name)
+        if not callable(attr):
+            # Properties such as not_ return the builder itself
+            return RecordingQuery(attr, self._shape + [name]) if hasattr(attr, "execute") else attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if hasattr(result, "execute"):
+                return RecordingQuery(result, self._shape + [describe(name, args)])
+            return result
+        return call
+
+    def execute(self):
+        start = time.perf_counter()
+        try:
+            return self._query.execute()
+        finally:
+            _record(".".join(self._shape), time.perf_counter() - start)
+
+    async def execute_async(self):
+        start = time.perf_counter()
+        try:
+            return await self._query.execute_async()
+        finally:
+            _record(".".join(self._shape), time.perf_counter() - start)
+
+
+class RecordingClient:
+    """Wraps the Supabase client so every query it builds is recorded"""
+
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, name: str) -> RecordingQuery:
+        return RecordingQuery(self._client.table(name), [name])
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[dict] = None, *args, **kwargs) -> RecordingQuery:
+        return RecordingQuery(self._client.rpc(fn, params, *args, **kwargs), [f"rpc:{fn}"])
+
+    def __getattr__(self, name: str):
+        return getattr(self._client, name)
+
+
+class QueryRecorderMiddleware:
+    """
+    Records the queries of each request. Requests over QUERY_BUDGET, or that
+    repeat one query shape more than QUERY_REPEAT_LIMIT times, are logged
+    with a compact trace. The count is also sent as X-Query-Count.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        recorder = QueryRecorder()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-query-count", str(recorder.count).encode())
+                ]
+            await send(message)
+
+        token = _current.set(recorder)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            problems = recorder.problems(QUERY_BUDGET, QUERY_REPEAT_LIMIT)
+            if problems:
+                logger.warning(
+                    "%s %s: %s\n%s", scope["method"], scope["path"], "; ".join(problems), recorder.trace()
+                )
+
+
+@contextmanager
+def record_queries() -> Iterator[QueryRecorder]:
+    """Record every query issued inside the block, whichever request issues it"""
+    recorder = QueryRecorder()
+    _active.append(recorder)
+    try:
+        yield recorder
+    finally:
+        _active.remove(recorder)
+
+
+@contextmanager
+def assert_query_budget(max_queries: int, max_repeats: int = QUERY_REPEAT_LIMIT) -> Iterator[QueryRecorder]:
+    """Fail with a trace if the block issues more queries than allowed"""
+    with record_queries() as recorder:
+        yield recorder
+    problems = recorder.problems(max_queries, max_repeats)
+    if problems:
+        raise AssertionError("; ".join(problems) + "\n" + recorder.trace())
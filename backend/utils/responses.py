@@ -0,0 +1,34 @@
+from decimal import Decimal
+from typing import Any, List
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+
+def _default(obj: Any) -> Any:
+    """Types orjson doesn't serialize natively (dates, datetimes and UUIDs it does)"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError
+
+
+def dumps(payload: Any) -> bytes:
+    """Serialize a response body with orjson"""
+    return orjson.dumps(payload, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONResponse(JSONResponse):
+    """App-wide JSON response rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def validate_rows(adapter: TypeAdapter, rows: List[dict]) -> List[dict]:
+    """Validate a list of rows in one call and return them as JSON-ready dicts"""
+    return adapter.dump_python(adapter.validate_python(rows), mode="json")
@@ -0,0 +1,66 @@
+import mimetypes
+import re
+from typing import Set
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.types import Scope
+
+# Assets named <name>.<10 hex digits>.<ext> by build_static.py never change
+HASHED_NAME = re.compile(r"\.[0-9a-f]{10}\.\w+$")
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Preferred first
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def accepted_encodings(scope: Scope) -> Set[str]:
+    """Codings the client accepts (ignoring any with q=0)"""
+    accepted = set()
+    for item in Headers(scope=scope).get("accept-encoding", "").split(","):
+        coding, _, params = item.partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if coding.strip():
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves build-time `.br` / `.gz` siblings when the client
+    accepts them, and marks content-hashed assets as immutable. Everything
+    else (the HTML entry points) is revalidated on each load.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        accepted = accepted_encodings(scope)
+        for coding, suffix in ENCODINGS:
+            if coding not in accepted:
+                continue
+            try:
+                response = await super().get_response(path + suffix, scope)
+            except HTTPException:
+                continue
+            if response.status_code in (200, 304):
+                media_type, _ = mimetypes.guess_type(path)
+                if media_type:
+                    response.headers["content-type"] = (
+                        f"{media_type}; charset=utf-8" if media_type.startswith("text/") else media_type
+                    )
+                response.headers["content-encoding"] = coding
+                return self.with_cache_headers(path, response)
+
+        response = await super().get_response(path, scope)
+        return self.with_cache_headers(path, response)
+
+    @staticmethod
+    def with_cache_headers(path: str, response: Response) -> Response:
+        if response.status_code in (200, 304):
+            response.headers["cache-control"] = IMMUTABLE if HASHED_NAME.search(path) else REVALIDATE
+            response.headers["vary"] = "Accept-Encoding"
+        return response
@@ -0,0 +1,95 @@
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import FrozenSet, Iterable, Optional
+
+from config import CALENDAR_CACHE_TTL, DEFAULT_WEEKEND_DAYS
+from utils.cache import TTLCache
+from utils.db import execute
+
+# Days either side of the requested dates covered when the prefix sums are (re)built
+SPAN_MARGIN = 366 * 2
+
+
+class WorkCalendar:
+    """
+    Working days for one company: every day except its weekend days
+    (date.weekday() numbers, 0 = Monday) and its holidays.
+
+    Keeps a prefix sum of working days over a span of dates, so counting the
+    working days in any range inside it is two lookups. Ranges outside the
+    span rebuild it wider first.
+    """
+
+    def __init__(self, weekend_days: Iterable[int], holidays: Iterable[date] = ()):
+        self.weekend_days: FrozenSet[int] = frozenset(weekend_days)
+        self.holidays: FrozenSet[date] = frozenset(holidays)
+        self._origin = date.today()
+        self._prefix = [0]
+        self._build(self._origin - timedelta(days=SPAN_MARGIN), self._origin + timedelta(days=SPAN_MARGIN))
+
+    def _build(self, start: date, end: date) -> None:
+        # _prefix[i] = working days in [start, start + i)
+        days = (end - start).days + 1
+        self._origin = start
+        self._prefix = [0, *accumulate(
+            self.is_working_day(start + timedelta(days=i)) for i in range(days)
+        )]
+
+    def is_working_day(self, day: date) -> bool:
+        return day.weekday() not in self.weekend_days and day not in self.holidays
+
+    def working_days(self, start: date, end: date) -> int:
+        """Working days from start to end, both inclusive (0 if end < start)"""
+        if end < start:
+            return 0
+        first = (start - self._origin).days
+        last = (end - self._origin).days + 1
+        if first < 0 or last >= len(self._prefix):
+            self._build(
+                min(start, self._origin) - timedelta(days=SPAN_MARGIN),
+                max(end, self._origin + timedelta(days=len(self._prefix) - 2)) + timedelta(days=SPAN_MARGIN)
+            )
+            first = (start - self._origin).days
+            last = (end - self._origin).days + 1
+        return self._prefix[last] - self._prefix[first]
+
+
+# company_id (None for the default company) -> WorkCalendar
+calendar_cache = TTLCache(64, ttl=CALENDAR_CACHE_TTL)
+
+
+async def get_calendar(db, company_id: Optional[int] = None) -> WorkCalendar:
+    """
+    Working-day calendar of a company, or of the first company when none is
+    given (the single-company setup the rest of the app assumes). Cached until
+    invalidated or CALENDAR_CACHE_TTL passes.
+    """
+    cached = calendar_cache.get(company_id)
+    if cached is not None:
+        return cached
+
+    query = db.table("company").select("company_id, weekend_days")
+    if company_id is None:
+        query = query.order("company_id").limit(1)
+    else:
+        query = query.eq("company_id", company_id)
+    company = await execute(query)
+    if not company.data:
+        return WorkCalendar(DEFAULT_WEEKEND_DAYS)
+
+    weekend_days = company.data[0].get("weekend_days")
+    holidays = await execute(db.table("company_holidays").select("holiday_date").eq(
+        "company_id", company.data[0]["company_id"]
+    ))
+    calendar = WorkCalendar(
+        DEFAULT_WEEKEND_DAYS if weekend_days is None else weekend_days,
+        (date.fromisoformat(str(h["holiday_date"])) for h in holidays.data)
+    )
+    calendar_cache.set(company_id, calendar)
+    return calendar
+
+
+def invalidate_calendar(company_id: int) -> None:
+    """Drop a company's calendar after its holidays or weekend change"""
+    calendar_cache.invalidate(company_id)
+    calendar_cache.invalidate(None)
@@ -0,0 +1,459 @@
+import asyncio
+import glob
+import json
+import logging
+import os
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks (Windows): every other journal is taken to be orphaned
+    fcntl = None
+
+from anyio import to_thread
+
+from config import (
+    ATTENDANCE_WRITE_BEHIND, ATTENDANCE_JOURNAL_PATH,
+    ATTENDANCE_FLUSH_INTERVAL_MS, ATTENDANCE_FLUSH_BATCH_SIZE, LAST_LOGIN_FLUSH_INTERVAL_MS
+)
+from utils.db import get_db, execute
+from utils.query_recorder import spawn
+
+logger = logging.getLogger(__name__)
+
+# (user_id, attendance_date)
+CheckInKey = Tuple[int, str]
+
+
+def _rejected(error: Exception) -> bool:
+    """
+    Whether the database refused the rows themselves (SQLSTATE class 22 bad
+    value or 23 constraint violation), so retrying them can never succeed
+    """
+    code = getattr(error, "sqlstate", None) or getattr(error, "code", None)
+    return isinstance(code, str) and code[:2] in ("22", "23")
+
+
+class CheckInBuffer:
+    """
+    Write-behind buffer for check-ins.
+
+    A check-in is acknowledged once the database has no check-in for that
+    user and day and it is appended and fsynced to a local NDJSON journal.
+    Concurrent lookups share one query, and concurrent appends share one
+    fsync (group commit). A background task inserts pending check-ins into
+    `attendance` in batches with ON CONFLICT DO NOTHING, so replaying the
+    journal after a crash is harmless. The journal is truncated whenever
+    the buffer drains. Rows the database rejects are moved to a dead-letter
+    file so they don't hold up the rest.
+
+    Each process journals to its own file (the configured path suffixed with
+    its pid) and holds a lock on it. At startup, journals whose lock is free
+    were left by processes that are gone; their check-ins are adopted.
+    """
+
+    def __init__(self, journal_path: str, flush_interval: float, batch_size: int):
+        base, ext = os.path.splitext(journal_path)
+        self.journal_path = f"{base}.{os.getpid()}{ext}"
+        self._journal_glob = f"{glob.escape(base)}.*{ext}"
+        self._legacy_path = journal_path
+        self._startup_lock_path = f"{base}.lock"
+        self.dead_letter_path = f"{base}.rejected"
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.pending: Dict[CheckInKey, dict] = {}
+        self.inflight: Dict[CheckInKey, dict] = {}
+        # Check-ins the database refused, also appended to dead_letter_path
+        self.dead_letters: List[dict] = []
+        # Check-ins already flushed today, so repeats are still rejected
+        self._flushed: Set[CheckInKey] = set()
+        self._flushed_date: Optional[str] = None
+        self._journal = None
+        self._journal_lock = asyncio.Lock()
+        self._appends: List[Tuple[str, asyncio.Future]] = []
+        self._lookup_task: Optional[asyncio.Task] = None
+        self._lookups: List[Tuple[CheckInKey, asyncio.Future]] = []
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Adopt journals left by earlier processes and start flushing"""
+        os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+        # Workers starting together take turns, so none adopts a journal its owner hasn't locked yet
+        with open(self._startup_lock_path, "a") as startup_lock:
+            if fcntl is not None:
+                fcntl.flock(startup_lock, fcntl.LOCK_EX)
+            self._adopt_journals()
+        if self.pending:
+            logger.info("Replaying %d journaled check-ins", len(self.pending))
+        self._task = asyncio.create_task(self._run())
+
+    def _adopt_journals(self) -> None:
+        self._journal = open(self.journal_path, "a+", encoding="utf-8")
+        if fcntl is not None:
+            fcntl.flock(self._journal, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        # Our own file has rows only if an earlier process had the same pid
+        self._journal.seek(0)
+        self._replay(self._journal.read().splitlines())
+
+        orphans = []
+        ours = {self.journal_path, self._startup_lock_path, self.dead_letter_path}
+        for path in sorted({self._legacy_path, *glob.glob(self._journal_glob)} - ours):
+            try:
+                f = open(path, "r", encoding="utf-8")
+            except FileNotFoundError:
+                continue
+            if fcntl is not None:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    # Another live worker's journal
+                    f.close()
+                    continue
+            orphans.append((path, f, self._replay(f.read().splitlines())))
+
+        # Copy adopted check-ins into our journal before their files go away
+        adopted = [row for _, _, rows in orphans for row in rows]
+        if adopted:
+            self._write([json.dumps(row) for row in adopted])
+        for path, f, _ in orphans:
+            os.remove(path)
+            f.close()
+
+    def _replay(self, journal: Iterable[str]) -> List[dict]:
+        """Queue the check-ins of a journal; returns them"""
+        rows = []
+        for line in journal:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                # A torn final line from a crash mid-write was never acknowledged
+                continue
+            self.pending.setdefault((row["user_id"], row["attendance_date"]), row)
+            rows.append(row)
+        return rows
+
+    async def stop(self) -> None:
+        """Stop the flusher and write out everything still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self.pending:
+            if not await self.flush():
+                break
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def contains(self, user_id: int, attendance_date: str) -> bool:
+        """Whether a check-in for this user and day has been accepted"""
+        key = (user_id, attendance_date)
+        return key in self.pending or key in self.inflight or (
+            attendance_date == self._flushed_date and key in self._flushed
+        )
+
+    def buffered(self, attendance_date: Optional[str] = None, user_id: Optional[int] = None) -> List[dict]:
+        """Accepted check-ins not yet confirmed in the database"""
+        rows = list(self.inflight.values()) + list(self.pending.values())
+        return [
+            r for r in rows
+            if (attendance_date is None or r["attendance_date"] == attendance_date)
+            and (user_id is None or r["user_id"] == user_id)
+        ]
+
+    async def record(self, user_id: int, attendance_date: str, check_in: str) -> bool:
+        """
+        Accept a check-in once it is durable in the journal.
+        Returns False if this user already checked in that day, whether
+        through this buffer or already in the database (written by another
+        worker, an earlier process, or the rpc).
+        """
+        if self.contains(user_id, attendance_date):
+            return False
+
+        key = (user_id, attendance_date)
+        stored = await self._lookup(key)
+        if stored is not None and stored.get("check_in"):
+            self._mark_flushed([key])
+            return False
+        if stored is not None:
+            # The buffered insert would be ignored for a row without check_in; fill it in now
+            result = await execute(get_db().rpc("attendance_check_in", {
+                "p_user_id": user_id,
+                "p_date": attendance_date,
+                "p_time": check_in
+            }))
+            self._mark_flushed([key])
+            return result.data == "checked_in"
+        # Another request for the same key may have been accepted while we waited
+        if self.contains(user_id, attendance_date):
+            return False
+
+        row = {"user_id": user_id, "attendance_date": attendance_date, "check_in": check_in}
+        self.pending[key] = row
+        try:
+            await self._append(json.dumps(row))
+        except Exception:
+            self.pending.pop(key, None)
+            raise
+        return True
+
+    async def _lookup(self, key: CheckInKey) -> Optional[dict]:
+        """
+        The stored attendance row for a key, if any. Lookups that arrive
+        while one is running are answered together by the next query.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._lookups.append((key, future))
+        if self._lookup_task is None or self._lookup_task.done():
+            self._lookup_task = spawn(self._run_lookups())
+        return await future
+
+    async def _run_lookups(self) -> None:
+        # Callers only wait for their own answer, never for later batches
+        while self._lookups:
+            batch, self._lookups = self._lookups, []
+            try:
+                found = await self._fetch_stored([k for k, _ in batch])
+            except Exception as e:
+                for _, f in batch:
+                    if not f.done():
+                        f.set_exception(e)
+            else:
+                for k, f in batch:
+                    # A caller that disconnected has cancelled its future
+                    if not f.done():
+                        f.set_result(found.get(k))
+
+    async def _fetch_stored(self, keys: List[CheckInKey]) -> Dict[CheckInKey, dict]:
+        by_date: Dict[str, List[int]] = {}
+        for user_id, attendance_date in keys:
+            by_date.setdefault(attendance_date, []).append(user_id)
+        found = {}
+        db = get_db()
+        for attendance_date, user_ids in by_date.items():
+            for i in range(0, len(user_ids), self.batch_size):
+                result = await execute(db.table("attendance").select("user_id, check_in").eq(
+                    "attendance_date", attendance_date
+                ).in_("user_id", user_ids[i:i + self.batch_size]))
+                found.update(((row["user_id"], attendance_date), row) for row in result.data)
+        return found
+
+    async def _append(self, line: str) -> None:
+        """Queue a journal line and wait until it (and its batch) is fsynced"""
+        future = asyncio.get_running_loop().create_future()
+        self._appends.append((line, future))
+        async with self._journal_lock:
+            batch, self._appends = self._appends, []
+            if batch:
+                try:
+                    await to_thread.run_sync(self._write, [l for l, _ in batch])
+                except Exception as e:
+                    for _, f in batch:
+                        f.set_exception(e)
+                else:
+                    for _, f in batch:
+                        f.set_result(None)
+        await future
+
+    def _write(self, lines: List[str]) -> None:
+        self._journal.write("".join(f"{l}\n" for l in lines))
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    async def flush(self) -> bool:
+        """Insert up to batch_size pending check-ins; returns False if the write failed"""
+        async with self._flush_lock:
+            if not self.pending:
+                return True
+            keys = list(self.pending)[:self.batch_size]
+            for key in keys:
+                self.inflight[key] = self.pending.pop(key)
+
+            try:
+                await self._insert(list(self.inflight.values()))
+            except Exception:
+                logger.exception("Check-in flush failed; will retry")
+                self.pending = {**self.inflight, **self.pending}
+                self.inflight = {}
+                return False
+
+            if not self.pending:
+                await self._truncate_journal()
+            return True
+
+    async def _insert(self, rows: List[dict]) -> None:
+        """
+        Insert in-flight rows. When the database rejects a batch, it is split
+        in halves until the rows at fault are found and dead-lettered; any
+        other error is raised with the unwritten rows still in flight.
+        """
+        try:
+            await execute(get_db().table("attendance").upsert(
+                rows,
+                on_conflict="user_id,attendance_date",
+                ignore_duplicates=True
+            ))
+        except Exception as e:
+            if not _rejected(e):
+                raise
+            if len(rows) == 1:
+                await self._dead_letter(rows[0], e)
+                return
+            middle = len(rows) // 2
+            await self._insert(rows[:middle])
+            await self._insert(rows[middle:])
+            return
+
+        keys = [(row["user_id"], row["attendance_date"]) for row in rows]
+        self._mark_flushed(keys)
+        for key in keys:
+            self.inflight.pop(key, None)
+
+    async def _dead_letter(self, row: dict, error: Exception) -> None:
+        logger.error("Check-in rejected by the database, moved to %s: %s (%s)", self.dead_letter_path, row, error)
+        await to_thread.run_sync(self._write_dead_letter, json.dumps(row))
+        self.dead_letters.append(row)
+        self.inflight.pop((row["user_id"], row["attendance_date"]), None)
+
+    def _write_dead_letter(self, line: str) -> None:
+        with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+            f.write(f"{line}\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _mark_flushed(self, keys: Iterable[CheckInKey]) -> None:
+        """Remember today's check-ins known to be in the database"""
+        today = date.today().isoformat()
+        if self._flushed_date != today:
+            self._flushed, self._flushed_date = set(), today
+        self._flushed.update(k for k in keys if k[1] == today)
+
+    async def _truncate_journal(self) -> None:
+        async with self._journal_lock:
+            # A check-in may have arrived while waiting for the lock
+            if not self.pending and not self._appends:
+                self._journal.truncate(0)
+                self._journal.seek(0)
+
+    async def flush_key(self, user_id: int, attendance_date: str) -> bool:
+        """Flush until one user's buffered check-in is in the database"""
+        key = (user_id, attendance_date)
+        while key in self.pending or key in self.inflight:
+            if not await self.flush():
+                return False
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            # Keep going without sleeping while full batches are waiting
+            while await self.flush() and len(self.pending) >= self.batch_size:
+                pass
+
+
+checkin_buffer: Optional[CheckInBuffer] = None
+
+
+def get_checkin_buffer() -> Optional[CheckInBuffer]:
+    """The active write-behind buffer, or None when write-behind is off"""
+    return checkin_buffer
+
+
+async def start_checkin_buffer() -> None:
+    """Create and start the buffer if ATTENDANCE_WRITE_BEHIND is enabled"""
+    global checkin_buffer
+    if ATTENDANCE_WRITE_BEHIND and checkin_buffer is None:
+        checkin_buffer = CheckInBuffer(
+            ATTENDANCE_JOURNAL_PATH,
+            ATTENDANCE_FLUSH_INTERVAL_MS / 1000,
+            ATTENDANCE_FLUSH_BATCH_SIZE
+        )
+        await checkin_buffer.start()
+
+
+async def stop_checkin_buffer() -> None:
+    """Flush and stop the buffer"""
+    global checkin_buffer
+    if checkin_buffer is not None:
+        await checkin_buffer.stop()
+        checkin_buffer = None
+
+
+class LastLoginUpdater:
+    """
+    Coalesces users.last_login writes off the login path.
+    Logins only record a timestamp in memory; a background task writes them
+    every flush interval, one UPDATE per distinct second (usually one or two
+    per flush, however many users logged in). Only the latest login per user
+    is kept. Nothing is journaled: a crash loses at most one interval of
+    last_login values, which are informational.
+    """
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self.pending: Dict[int, str] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, user_id: int, when: Optional[datetime] = None) -> None:
+        self.pending[user_id] = (when or datetime.now()).replace(microsecond=0).isoformat()
+
+    async def flush(self) -> bool:
+        """Write everything pending; returns False if a write failed"""
+        async with self._flush_lock:
+            if not self.pending:
+                return True
+            batch, self.pending = self.pending, {}
+
+            by_time: Dict[str, List[int]] = {}
+            for user_id, when in batch.items():
+                by_time.setdefault(when, []).append(user_id)
+
+            db = get_db()
+            for when, user_ids in sorted(by_time.items()):
+                try:
+                    await execute(db.table("users").update({"last_login": when}).in_("user_id", user_ids))
+                except Exception:
+                    logger.exception("last_login flush failed; will retry")
+                    # Keep newer logins recorded since the batch was taken
+                    for user_id in user_ids:
+                        self.pending.setdefault(user_id, when)
+                    return False
+            return True
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+
+last_login_updater = LastLoginUpdater(LAST_LOGIN_FLUSH_INTERVAL_MS / 1000)
+
+
+async def start_last_login_updater() -> None:
+    await last_login_updater.start()
+
+
+async def stop_last_login_updater() -> None:
+    """Stop the updater and write out pending last_login values"""
+    await last_login_updater.stop()
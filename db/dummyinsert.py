@@ -55,6 +55,12 @@ def clear_tables():
         ('company', 'company_id')
     ]
     
+    try:
+        supabase.table('employee_id_sequences').delete().neq('prefix', '').execute()
+        print("   ✓ Cleared employee_id_sequences")
+    except Exception as e:
+        print(f"   ⏭ Skipped employee_id_sequences ({str(e)[:60]})")
+    
     for table, pk in tables_with_pk:
         try:
             # Delete all records using the correct primary key
@@ -216,6 +222,27 @@ def create_users_and_employees():
     return created_users
 
 
+def sync_employee_id_sequences(users):
+    """Point the employee ID allocator past the hard-coded sample IDs"""
+    print("\n🔢 Syncing employee ID sequences...")
+    
+    last_serials = {}
+    for user in users:
+        prefix, serial = user['employee_id_str'][:-4], int(user['employee_id_str'][-4:])
+        last_serials[prefix] = max(serial, last_serials.get(prefix, 0))
+    
+    try:
+        supabase.table('employee_id_sequences').upsert([
+            {'prefix': prefix, 'last_serial': serial} for prefix, serial in last_serials.items()
+        ]).execute()
+        print(f"   ✓ Synced {len(last_serials)} prefixes")
+    except Exception as e:
+        if 'PGRST205' in str(e):
+            print("   ⏭ Skipped (employee_id_sequences table not found)")
+            return
+        raise
+
+
 def create_attendance(users):
     """Create attendance records for the past 10 days"""
     print("\n📅 Creating attendance records...")
@@ -359,6 +386,7 @@ def main():
         users = create_users_and_employees()
         
         if users:
+            sync_employee_id_sequences(users)
             create_attendance(users)
             create_leave_requests(users)
             create_salary_structure(users)
@@ -139,3 +139,214 @@ ALTER TABLE employees ADD COLUMN IF NOT EXISTS ifsc_code VARCHAR(20);
 ALTER TABLE employees ADD COLUMN IF NOT EXISTS emp_code VARCHAR(20);
 ALTER TABLE employees ADD COLUMN IF NOT EXISTS bank_name VARCHAR(100);
 
+-- 12. Keyset Pagination Indexes (newest-first leave listings)
+CREATE INDEX IF NOT EXISTS idx_leave_created ON leave_requests(created_at DESC, leave_id DESC);
+CREATE INDEX IF NOT EXISTS idx_leave_status_created ON leave_requests(status, created_at DESC, leave_id DESC);
+
+-- 13. Employee ID Serials (one row per XXYYZZZZ prefix)
+CREATE TABLE IF NOT EXISTS employee_id_sequences (
+    prefix          VARCHAR(20) PRIMARY KEY,
+    last_serial     INTEGER NOT NULL DEFAULT 0
+);
+
+-- Seed from existing IDs (serial = last 4 characters)
+INSERT INTO employee_id_sequences (prefix, last_serial)
+SELECT left(employee_id, length(employee_id) - 4), max(right(employee_id, 4)::INTEGER)
+FROM users
+WHERE employee_id ~ '[0-9]{4}$'
+GROUP BY 1
+ON CONFLICT (prefix) DO NOTHING;
+
+-- Reserve p_count serials in one statement; returns the first one
+CREATE OR REPLACE FUNCTION allocate_employee_serials(p_prefix TEXT, p_count INTEGER DEFAULT 1)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    INSERT INTO employee_id_sequences AS s (prefix, last_serial)
+    VALUES (p_prefix, p_count)
+    ON CONFLICT (prefix) DO UPDATE SET last_serial = s.last_serial + EXCLUDED.last_serial
+    RETURNING last_serial - p_count + 1;
+$$;
+
+-- 14. One payroll row per employee per period (lets payroll runs upsert)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_payroll_user_period_unique ON payroll(user_id, pay_period);
+
+-- 15. Check-in / Check-out (one conditional write each; returns the outcome)
+CREATE OR REPLACE FUNCTION attendance_check_in(p_user_id BIGINT, p_date DATE, p_time TIMESTAMP)
+RETURNS TEXT
+LANGUAGE sql
+AS $$
+    WITH applied AS (
+        INSERT INTO attendance AS a (user_id, attendance_date, check_in)
+        VALUES (p_user_id, p_date, p_time)
+        ON CONFLICT (user_id, attendance_date) DO UPDATE SET check_in = EXCLUDED.check_in
+        WHERE a.check_in IS NULL
+        RETURNING 1
+    )
+    SELECT CASE WHEN EXISTS (SELECT 1 FROM applied) THEN 'checked_in' ELSE 'already_checked_in' END;
+$$;
+
+CREATE OR REPLACE FUNCTION attendance_check_out(p_user_id BIGINT, p_date DATE, p_time TIMESTAMP)
+RETURNS TEXT
+LANGUAGE sql
+AS $$
+    WITH applied AS (
+        UPDATE attendance SET check_out = p_time
+        WHERE user_id = p_user_id AND attendance_date = p_date
+          AND check_in IS NOT NULL AND check_out IS NULL
+        RETURNING 1
+    )
+    -- The outer query sees the row as it was before the update
+    SELECT CASE
+        WHEN EXISTS (SELECT 1 FROM applied) THEN 'checked_out'
+        WHEN EXISTS (
+            SELECT 1 FROM attendance
+            WHERE user_id = p_user_id AND attendance_date = p_date AND check_out IS NOT NULL
+        ) THEN 'already_checked_out'
+        ELSE 'not_checked_in'
+    END;
+$$;
+
+-- 16. Date-range scans (exports, org-wide reports)
+CREATE INDEX IF NOT EXISTS idx_attendance_date_id ON attendance(attendance_date, attendance_id);
+
+-- 17. Working-day calendar (weekend days use 0 = Monday ... 6 = Sunday)
+ALTER TABLE company ADD COLUMN IF NOT EXISTS weekend_days SMALLINT[] NOT NULL DEFAULT '{5,6}';
+
+CREATE TABLE IF NOT EXISTS company_holidays (
+    company_id      BIGINT NOT NULL REFERENCES company(company_id) ON DELETE CASCADE,
+    holiday_date    DATE NOT NULL,
+    name            VARCHAR(200) NOT NULL,
+    PRIMARY KEY (company_id, holiday_date)
+);
+
+-- 18. Monthly attendance rollup per user (stats read one row instead of a month of records)
+-- Kept current by triggers on attendance and leave_requests; attendance_rollup_rebuild() recomputes it
+CREATE TABLE IF NOT EXISTS attendance_monthly (
+    user_id         BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    month           DATE NOT NULL,                    -- first day of the month
+    days_present    INTEGER NOT NULL DEFAULT 0,
+    work_hours      NUMERIC(10,4) NOT NULL DEFAULT 0, -- checked-out days only
+    leave_days      NUMERIC(6,1) NOT NULL DEFAULT 0,  -- approved leaves, by start month
+    overtime_hours  NUMERIC(10,4) GENERATED ALWAYS AS (GREATEST(work_hours - days_present * 8, 0)) STORED,
+    updated_at      TIMESTAMP DEFAULT now(),
+    PRIMARY KEY (user_id, month)
+);
+
+CREATE OR REPLACE FUNCTION attendance_work_hours(p_check_in TIMESTAMP, p_check_out TIMESTAMP)
+RETURNS NUMERIC
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT COALESCE(round(extract(epoch FROM p_check_out - p_check_in) / 3600, 4), 0);
+$$;
+
+CREATE OR REPLACE FUNCTION attendance_rollup_add(
+    p_user_id BIGINT, p_date DATE, p_days_present INTEGER, p_work_hours NUMERIC, p_leave_days NUMERIC
+)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO attendance_monthly AS m (user_id, month, days_present, work_hours, leave_days)
+    VALUES (p_user_id, date_trunc('month', p_date)::date, p_days_present, p_work_hours, p_leave_days)
+    ON CONFLICT (user_id, month) DO UPDATE SET
+        days_present = m.days_present + EXCLUDED.days_present,
+        work_hours = m.work_hours + EXCLUDED.work_hours,
+        leave_days = m.leave_days + EXCLUDED.leave_days,
+        updated_at = now();
+$$;
+
+-- Take back the old row's contribution and add the new one's; skipped while a user is being deleted
+CREATE OR REPLACE FUNCTION attendance_rollup_on_attendance()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' AND OLD.check_in IS NOT NULL
+       AND EXISTS (SELECT 1 FROM users WHERE user_id = OLD.user_id) THEN
+        PERFORM attendance_rollup_add(
+            OLD.user_id, OLD.attendance_date, -1, -attendance_work_hours(OLD.check_in, OLD.check_out), 0
+        );
+    END IF;
+    IF TG_OP <> 'DELETE' AND NEW.check_in IS NOT NULL THEN
+        PERFORM attendance_rollup_add(
+            NEW.user_id, NEW.attendance_date, 1, attendance_work_hours(NEW.check_in, NEW.check_out), 0
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION attendance_rollup_on_leave()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' AND OLD.status = 'approved'
+       AND EXISTS (SELECT 1 FROM users WHERE user_id = OLD.user_id) THEN
+        PERFORM attendance_rollup_add(OLD.user_id, OLD.start_date, 0, 0, -OLD.days_requested);
+    END IF;
+    IF TG_OP <> 'DELETE' AND NEW.status = 'approved' THEN
+        PERFORM attendance_rollup_add(NEW.user_id, NEW.start_date, 0, 0, NEW.days_requested);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS attendance_rollup ON attendance;
+CREATE TRIGGER attendance_rollup
+AFTER INSERT OR DELETE OR UPDATE OF user_id, attendance_date, check_in, check_out ON attendance
+FOR EACH ROW EXECUTE FUNCTION attendance_rollup_on_attendance();
+
+DROP TRIGGER IF EXISTS leave_rollup ON leave_requests;
+CREATE TRIGGER leave_rollup
+AFTER INSERT OR DELETE OR UPDATE OF user_id, start_date, days_requested, status ON leave_requests
+FOR EACH ROW EXECUTE FUNCTION attendance_rollup_on_leave();
+
+-- Recompute one month (or every month) from scratch; writers wait until it finishes
+CREATE OR REPLACE FUNCTION attendance_rollup_rebuild(p_month DATE DEFAULT NULL)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    target DATE := date_trunc('month', p_month)::date;
+    rebuilt INTEGER;
+BEGIN
+    LOCK TABLE attendance, leave_requests IN SHARE MODE;
+    DELETE FROM attendance_monthly WHERE target IS NULL OR month = target;
+    INSERT INTO attendance_monthly (user_id, month, days_present, work_hours, leave_days)
+    SELECT user_id, month, sum(days_present), sum(work_hours), sum(leave_days)
+    FROM (
+        SELECT user_id, date_trunc('month', attendance_date)::date AS month, 1 AS days_present,
+               attendance_work_hours(check_in, check_out) AS work_hours, 0 AS leave_days
+        FROM attendance
+        WHERE check_in IS NOT NULL
+        UNION ALL
+        SELECT user_id, date_trunc('month', start_date)::date, 0, 0, days_requested
+        FROM leave_requests
+        WHERE status = 'approved'
+    ) contributions
+    WHERE target IS NULL OR month = target
+    GROUP BY user_id, month;
+    GET DIAGNOSTICS rebuilt = ROW_COUNT;
+    RETURN rebuilt;
+END;
+$$;
+
+-- Populate from existing records
+SELECT attendance_rollup_rebuild();
+
+-- 19. Payroll run progress, shared by all workers (updated_at is the running worker's heartbeat)
+CREATE TABLE IF NOT EXISTS payroll_runs (
+    pay_period      VARCHAR(7) PRIMARY KEY,       -- YYYY-MM
+    status          VARCHAR(20) NOT NULL,         -- running, completed, failed
+    total           INTEGER,
+    processed       INTEGER NOT NULL DEFAULT 0,
+    written         INTEGER NOT NULL DEFAULT 0,
+    skipped         INTEGER NOT NULL DEFAULT 0,
+    error           TEXT,
+    started_by      BIGINT REFERENCES users(user_id) ON DELETE SET NULL,
+    started_at      TIMESTAMP,
+    finished_at     TIMESTAMP,
+    updated_at      TIMESTAMP DEFAULT now()
+);
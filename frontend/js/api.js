@@ -51,6 +51,42 @@ class Api {
         }
     }
 
+    // Server-sent events over fetch, so the bearer token can be sent as a header
+    static async stream(endpoint, onEvent) {
+        const response = await fetch(`${API_BASE_URL}${endpoint}`, { headers: this.headers });
+
+        if (response.status === 401) {
+            this.clearToken();
+            window.location.href = 'index.html';
+            throw new Error('Unauthorized');
+        }
+        if (!response.ok) {
+            throw new Error('Stream Request Failed');
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) return;
+            buffer += decoder.decode(value, { stream: true });
+
+            const messages = buffer.split('\n\n');
+            buffer = messages.pop();
+            for (const message of messages) {
+                let event = 'message';
+                let data = '';
+                for (const line of message.split('\n')) {
+                    if (line.startsWith('event: ')) event = line.slice(7);
+                    else if (line.startsWith('data: ')) data += line.slice(6);
+                }
+                if (data) onEvent(event, JSON.parse(data));
+            }
+        }
+    }
+
     // Auth
     static login(identifier, password) {
         return this.request('/auth/login', {
@@ -71,8 +107,8 @@ class Api {
     }
 
     // Employees
-    static getEmployees() {
-        return this.request('/employees');
+    static getEmployees(cursor = null) {
+        return this.request(cursor ? `/employees?cursor=${encodeURIComponent(cursor)}` : '/employees');
     }
 
     // Attendance
@@ -87,4 +123,8 @@ class Api {
     static getTodayAttendance() {
         return this.request('/attendance/today');
     }
+
+    static streamAttendance(onEvent) {
+        return this.stream('/attendance/live', onEvent);
+    }
 }
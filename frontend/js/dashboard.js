@@ -13,6 +13,7 @@ document.addEventListener('DOMContentLoaded', async () => {
     const checkOutBtn = document.getElementById('check-out-btn');
     const statusMsg = document.getElementById('status-msg');
     const employeeList = document.getElementById('employee-list');
+    const loadMoreEmployeesBtn = document.getElementById('load-more-employees');
     const attendanceList = document.getElementById('attendance-list');
     const leaveList = document.getElementById('leave-list');
     const addEmployeeBtn = document.getElementById('add-employee-btn');
@@ -30,7 +31,11 @@ document.addEventListener('DOMContentLoaded', async () => {
 
     // Initial Data Load
     loadCheckInStatus();
-    loadEmployees();
+    loadEmployees().then(() => {
+        if (userData.role === 'admin' || userData.role === 'hr') {
+            subscribeLiveBoard();
+        }
+    });
     loadAttendance();
     loadLeaves();
 
@@ -121,21 +126,44 @@ document.addEventListener('DOMContentLoaded', async () => {
         } catch (e) { console.error(e); }
     }
 
-    async function loadEmployees() {
+    // Employees come one page at a time; "Load more" follows next_cursor
+    let employeesCursor = null;
+
+    loadMoreEmployeesBtn.onclick = async () => {
+        loadMoreEmployeesBtn.disabled = true;
         try {
-            const employees = await Api.getEmployees();
-            employeeList.innerHTML = employees.map(emp => `
-                <div class="border p-4 rounded flex justify-between items-center ${emp.today_status === 'present' ? 'border-l-4 border-l-green-500' : ''}">
+            await loadEmployees(employeesCursor);
+        } finally {
+            loadMoreEmployeesBtn.disabled = false;
+        }
+    };
+
+    async function loadEmployees(cursor = null) {
+        try {
+            const { items: employees, next_cursor } = await Api.getEmployees(cursor);
+            const cards = employees.map(emp => `
+                <div data-user-id="${emp.user_id}" class="border p-4 rounded flex justify-between items-center ${emp.today_status === 'present' ? 'border-l-4 border-l-green-500' : ''}">
                     <div>
                         <h3 class="font-bold">${emp.first_name} ${emp.last_name}</h3>
                         <p class="text-sm text-gray-600">${emp.job_title || 'Employee'}</p>
                     </div>
-                    <span class="px-2 py-1 text-xs rounded ${getStatusColor(emp.today_status)}">
+                    <span data-status class="px-2 py-1 text-xs rounded ${getStatusColor(emp.today_status)}">
                         ${emp.today_status || 'Unknown'}
                     </span>
                 </div>
             `).join('');
+            if (cursor) {
+                employeeList.insertAdjacentHTML('beforeend', cards);
+            } else {
+                employeeList.innerHTML = cards;
+            }
+            employeesCursor = next_cursor;
+            loadMoreEmployeesBtn.classList.toggle('hidden', !next_cursor);
         } catch (e) {
+            if (cursor) {
+                alert(e.message);
+                return;
+            }
             // If not admin, show just self
             employeeList.innerHTML = '<p class="text-gray-500">Employee list only visible to Admin/HR</p>';
         }
@@ -143,7 +171,7 @@ document.addEventListener('DOMContentLoaded', async () => {
 
     async function loadAttendance() {
         try {
-            const data = await Api.request('/attendance');
+            const { items: data } = await Api.request('/attendance');
             attendanceList.innerHTML = data.map(r => `
                 <tr class="border-b">
                     <td class="p-2">${r.attendance_date}</td>
@@ -175,6 +203,37 @@ document.addEventListener('DOMContentLoaded', async () => {
         } catch (e) { console.error(e); }
     }
 
+    // Live board: one snapshot on connect, then check-in/out and leave events
+    async function subscribeLiveBoard(retryDelay = 1000) {
+        try {
+            await Api.streamAttendance((event, data) => {
+                if (event === 'snapshot') {
+                    data.employees.forEach(emp => setEmployeeStatus(emp.user_id, emp.status));
+                } else if (event === 'check_in') {
+                    setEmployeeStatus(data.user_id, 'present');
+                } else if (event === 'leave_approved') {
+                    const today = new Date().toISOString().slice(0, 10);
+                    if (data.start_date <= today && today <= data.end_date) {
+                        setEmployeeStatus(data.user_id, 'leave');
+                    }
+                }
+            });
+            retryDelay = 1000;
+        } catch (e) { console.error(e); }
+        // Stream ended (server restart, slow consumer): reconnect with backoff
+        setTimeout(() => subscribeLiveBoard(Math.min(retryDelay * 2, 30000)), retryDelay);
+    }
+
+    function setEmployeeStatus(userId, status) {
+        const card = employeeList.querySelector(`[data-user-id="${userId}"]`);
+        if (!card) return;
+        card.classList.toggle('border-l-4', status === 'present');
+        card.classList.toggle('border-l-green-500', status === 'present');
+        const badge = card.querySelector('[data-status]');
+        badge.className = `px-2 py-1 text-xs rounded ${getStatusColor(status)}`;
+        badge.textContent = status;
+    }
+
     function getStatusColor(status) {
         if (status === 'present') return 'bg-green-100 text-green-800';
         if (status === 'absent') return 'bg-red-100 text-red-800';